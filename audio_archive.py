@@ -0,0 +1,307 @@
+import argparse
+import concurrent.futures
+import csv
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+import numpy as np
+from audio_utils import pcm_to_wav_bytes
+
+class AudioArchive:
+    def __init__(self, directory="audio_archive", segment_bytes=64 * 1024 * 1024, compression_level=6,
+                 queue_size=32):
+        """녹음 원본을 압축해 크기별로 나뉜 세그먼트 파일에 이어 쓰는 보관소
+
+        클립마다 독립적으로 압축하고 (세그먼트, 위치, 길이)를 색인에 기록하므로
+        어떤 클립이든 한 번의 seek로 읽을 수 있습니다. 압축/기록은 백그라운드 스레드에서 합니다.
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.compression_level = compression_level
+        os.makedirs(directory, exist_ok=True)
+
+        self.index_path = os.path.join(directory, "index.db")
+        self.reader = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.reader.execute("PRAGMA journal_mode=WAL")
+        self.reader.execute("""CREATE TABLE IF NOT EXISTS clips (
+            id INTEGER PRIMARY KEY,
+            timestamp REAL NOT NULL,
+            spreadsheet TEXT,
+            sheet TEXT,
+            cell TEXT,
+            text TEXT,
+            confidence REAL,
+            rate INTEGER,
+            channels INTEGER,
+            duration REAL,
+            segment INTEGER,
+            offset INTEGER,
+            length INTEGER)""")
+        self.reader.execute("CREATE INDEX IF NOT EXISTS clips_timestamp ON clips (timestamp)")
+        self.reader.execute("CREATE INDEX IF NOT EXISTS clips_target ON clips (spreadsheet, sheet, cell)")
+        self.reader.commit()
+        self.read_lock = threading.Lock()
+
+        row = self.reader.execute("SELECT MAX(segment) FROM clips").fetchone()
+        self.segment = row[0] or 1
+        self.stats = {'archived': 0, 'dropped': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+
+        self.pending = queue.Queue(maxsize=queue_size)
+        self.running = True
+        self.writer = threading.Thread(target=self.write_loop, daemon=True, name="audio-archive")
+        self.writer.start()
+
+    @classmethod
+    def from_settings(cls, settings_manager):
+        """app_settings.json의 audio_archive 항목으로 생성 (사용 안 함이면 None)"""
+        config = settings_manager.get_setting("audio_archive", {}) if settings_manager else {}
+        if not config.get("enabled", False):
+            return None
+        return cls(directory=config.get("directory", "audio_archive"),
+                   segment_bytes=int(config.get("segment_mb", 64) * 1024 * 1024),
+                   compression_level=config.get("compression_level", 6))
+
+    def segment_path(self, segment):
+        return os.path.join(self.directory, f"segment_{segment:05d}.bin")
+
+    def submit(self, audio, text, confidence, target=None, rate=16000, channels=1):
+        """클립 보관 요청 (즉시 반환, 대기열이 가득 차면 버림)
+
+        audio는 PCM bytes/memoryview 또는 AudioSpool이며, 스풀은 기록 후 보관소가 닫습니다.
+        """
+        target = target or {}
+        meta = {'timestamp': time.time(), 'spreadsheet': target.get('spreadsheet', ''),
+                'sheet': target.get('sheet', ''), 'cell': target.get('cell', ''), 'text': text,
+                'confidence': confidence or 0.0, 'rate': rate, 'channels': channels}
+        try:
+            self.pending.put_nowait((audio, meta))
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            if hasattr(audio, 'close'):
+                audio.close()
+            print("⚠️ 오디오 보관 대기열이 가득 차 클립을 보관하지 못했습니다")
+            return False
+
+    def write_loop(self):
+        connection = sqlite3.connect(self.index_path)
+        while self.running or not self.pending.empty():
+            try:
+                audio, meta = self.pending.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self.write_clip(connection, audio, meta)
+            except Exception as e:
+                print(f"오디오 보관 오류: {e}")
+            finally:
+                if hasattr(audio, 'close'):
+                    audio.close()
+        connection.close()
+
+    def write_clip(self, connection, audio, meta):
+        """클립 하나를 차분 부호화 + zlib 압축해 현재 세그먼트에 추가하고 색인에 기록"""
+        compressor = zlib.compressobj(self.compression_level)
+        chunks = []
+        raw_bytes = 0
+        previous = np.int16(0)
+        views = audio.iter_views() if hasattr(audio, 'iter_views') else [memoryview(audio)]
+        for view in views:
+            samples = np.frombuffer(view, dtype=np.int16)
+            if len(samples) == 0:
+                continue
+            # 인접 샘플 차이를 저장하면 일반 PCM보다 압축이 잘 됨 (int16 범위에서 순환)
+            delta = np.diff(samples, prepend=previous)
+            previous = samples[-1]
+            chunks.append(compressor.compress(delta.tobytes()))
+            raw_bytes += len(samples) * 2
+        chunks.append(compressor.flush())
+        data = b''.join(chunks)
+
+        path = self.segment_path(self.segment)
+        if os.path.exists(path) and os.path.getsize(path) + len(data) > self.segment_bytes:
+            self.segment += 1
+            path = self.segment_path(self.segment)
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(data)
+
+        meta.update(duration=raw_bytes / (meta['rate'] * 2 * meta['channels']), segment=self.segment,
+                    offset=offset, length=len(data))
+        connection.execute(
+            "INSERT INTO clips (timestamp, spreadsheet, sheet, cell, text, confidence, rate, channels, duration, "
+            "segment, offset, length) VALUES (:timestamp, :spreadsheet, :sheet, :cell, :text, :confidence, :rate, "
+            ":channels, :duration, :segment, :offset, :length)", meta)
+        connection.commit()
+        self.stats['archived'] += 1
+        self.stats['raw_bytes'] += raw_bytes
+        self.stats['stored_bytes'] += len(data)
+
+    def query(self, since=None, until=None, spreadsheet=None, sheet=None, cell=None, limit=None):
+        """조건에 맞는 클립 색인 목록 (시간순)"""
+        conditions = []
+        params = []
+        for column, operator, value in (('timestamp', '>=', since), ('timestamp', '<', until),
+                                        ('spreadsheet', '=', spreadsheet), ('sheet', '=', sheet),
+                                        ('cell', '=', cell)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        sql = "SELECT * FROM clips"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self.read_lock:
+            cursor = self.reader.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_clip(self, clip_id):
+        """번호로 색인 항목 조회"""
+        with self.read_lock:
+            cursor = self.reader.execute("SELECT * FROM clips WHERE id = ?", (clip_id,))
+            columns = [c[0] for c in cursor.description]
+            row = cursor.fetchone()
+        if row is None:
+            raise KeyError(f"보관된 클립이 없습니다: {clip_id}")
+        return dict(zip(columns, row))
+
+    def read_clip(self, clip):
+        """색인 항목(또는 번호)의 PCM 복원 (seek 한 번)"""
+        if not isinstance(clip, dict):
+            clip = self.get_clip(clip)
+        with open(self.segment_path(clip['segment']), 'rb') as f:
+            f.seek(clip['offset'])
+            data = f.read(clip['length'])
+        delta = np.frombuffer(zlib.decompress(data), dtype=np.int16)
+        return np.cumsum(delta, dtype=np.int16).tobytes()
+
+    def iter_clips(self, clips):
+        """클립을 하나씩 읽어 (색인, PCM) 순회 (메모리에는 한 클립씩만)"""
+        for clip in clips:
+            yield clip, self.read_clip(clip)
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['queued'] = self.pending.qsize()
+        stats['ratio'] = stats['stored_bytes'] / stats['raw_bytes'] if stats['raw_bytes'] else 0.0
+        return stats
+
+    def close(self):
+        """남은 클립 기록 후 종료"""
+        self.running = False
+        self.writer.join(timeout=30)
+        with self.read_lock:
+            self.reader.close()
+
+def parse_time(value):
+    """'YYYY-MM-DD' 또는 'YYYY-MM-DD HH:MM' → 타임스탬프"""
+    if value is None:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"날짜 형식 오류: {value}")
+
+def retranscribe(archive, voice_processor, clips, output_path, workers=4):
+    """보관된 클립을 스트리밍으로 다시 인식해 기존/새 결과를 CSV로 저장"""
+    from longform import MemoryAudio
+
+    def run(clip, pcm):
+        if clip['duration'] > voice_processor.longform.max_seconds:
+            result = voice_processor.longform.transcribe(MemoryAudio(pcm, clip['rate'], clip['channels']),
+                                                         priority='batch')
+            return clip, result['text'], result['confidence'], result['success']
+        wav = pcm_to_wav_bytes(pcm, clip['rate'], clip['channels'])
+        text, confidence, success = voice_processor.transcribe(wav, timeout=max(30, clip['duration'] * 2),
+                                                               priority='batch')
+        return clip, text, confidence, success
+
+    done = 0
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as f, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        writer = csv.writer(f)
+        writer.writerow(['번호', '시간', '스프레드시트', '시트', '셀', '기존 텍스트', '새 텍스트', '새 신뢰도', '성공'])
+        in_flight = deque()
+        clip_iter = archive.iter_clips(clips)
+
+        def write_result(future):
+            clip, text, confidence, success = future.result()
+            writer.writerow([clip['id'], datetime.fromtimestamp(clip['timestamp']).strftime("%Y-%m-%d %H:%M:%S"),
+                             clip['spreadsheet'], clip['sheet'], clip['cell'], clip['text'], text,
+                             f"{confidence:.2f}", success])
+
+        # 동시 작업 수만큼만 클립을 읽어 메모리 사용을 제한
+        for clip, pcm in clip_iter:
+            in_flight.append(executor.submit(run, clip, pcm))
+            if len(in_flight) >= workers * 2:
+                write_result(in_flight.popleft())
+                done += 1
+                print(f"  {done}/{len(clips)}")
+        while in_flight:
+            write_result(in_flight.popleft())
+            done += 1
+            print(f"  {done}/{len(clips)}")
+    return done
+
+def main():
+    """보관소 명령행: list / export / retranscribe"""
+    parser = argparse.ArgumentParser(description="녹음 보관소 조회 및 일괄 재인식")
+    parser.add_argument("--directory", default=None, help="보관소 폴더 (기본: 설정값)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("list", "retranscribe"):
+        command = sub.add_parser(name)
+        command.add_argument("--since", type=parse_time)
+        command.add_argument("--until", type=parse_time)
+        command.add_argument("--spreadsheet")
+        command.add_argument("--sheet")
+        command.add_argument("--cell")
+        command.add_argument("--limit", type=int)
+    sub.choices["retranscribe"].add_argument("--output", default="retranscribe.csv")
+    sub.choices["retranscribe"].add_argument("--workers", type=int, default=4)
+    sub.choices["retranscribe"].add_argument("--api-url", help="인식 서버 URL (기본: 설정값)")
+    export = sub.add_parser("export")
+    export.add_argument("clip_id", type=int)
+    export.add_argument("output")
+    args = parser.parse_args()
+
+    from main import SettingsManager
+    settings_manager = SettingsManager()
+    config = settings_manager.get_setting("audio_archive", {})
+    archive = AudioArchive(directory=args.directory or config.get("directory", "audio_archive"))
+    try:
+        if args.command == "export":
+            clip = archive.get_clip(args.clip_id)
+            with open(args.output, 'wb') as f:
+                f.write(pcm_to_wav_bytes(archive.read_clip(clip), clip['rate'], clip['channels']))
+            print(f"✅ 클립 {args.clip_id} → {args.output}")
+            return
+
+        clips = archive.query(args.since, args.until, args.spreadsheet, args.sheet, args.cell, args.limit)
+        if args.command == "list":
+            for clip in clips:
+                print(f"{clip['id']:6d}  {datetime.fromtimestamp(clip['timestamp']):%Y-%m-%d %H:%M:%S}  "
+                      f"{clip['duration']:6.1f}초  {clip['spreadsheet']}/{clip['sheet']}!{clip['cell']}  {clip['text']}")
+            print(f"총 {len(clips)}개 클립")
+            return
+
+        from speechtext import SimpleVoiceProcessor
+        voice_processor = SimpleVoiceProcessor(api_url=args.api_url)
+        voice_processor.set_settings_manager(settings_manager)
+        print(f"🔁 {len(clips)}개 클립 재인식 → {args.output}")
+        count = retranscribe(archive, voice_processor, clips, args.output, args.workers)
+        print(f"✅ 재인식 완료: {count}개")
+    finally:
+        archive.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import time
+from datetime import datetime
+import numpy as np
+
+PA_INPUT_OVERFLOWED = -9981
+DEFAULT_CHUNK_SIZES = (256, 512, 1024, 2048, 4096)
+
+def list_input_devices(audio):
+    """입력 장치 목록 [{'index', 'name', 'host_api', 'channels', 'default_rate'}]"""
+    devices = []
+    for index in range(audio.get_device_count()):
+        info = audio.get_device_info_by_index(index)
+        if info.get('maxInputChannels', 0) <= 0:
+            continue
+        host_api = audio.get_host_api_info_by_index(info['hostApi'])['name']
+        devices.append({'index': index, 'name': info['name'], 'host_api': host_api,
+                        'channels': info['maxInputChannels'], 'default_rate': info.get('defaultSampleRate')})
+    return devices
+
+def same_device(name, other):
+    # MME는 장치 이름을 31자로 자르므로 앞부분으로 비교
+    return name[:31] == other[:31]
+
+def find_device(devices, name, host_api=None):
+    """이름(과 호스트 API)으로 현재 장치 번호 찾기 (재부팅 후 번호가 바뀌어도 같은 장치 선택)"""
+    for device in devices:
+        if same_device(device['name'], name) and (host_api is None or device['host_api'] == host_api):
+            return device
+    return None
+
+def measure(audio, device, chunk, rate=16000, channels=1, seconds=2.0):
+    """장치 하나를 주어진 청크 크기로 열어 읽기 성능 측정"""
+    import pyaudio
+    result = {'device_index': device['index'], 'host_api': device['host_api'], 'chunk': chunk}
+    started = time.perf_counter()
+    try:
+        stream = audio.open(format=pyaudio.paInt16, channels=channels, rate=rate, input=True,
+                            input_device_index=device['index'], frames_per_buffer=chunk)
+    except Exception as e:
+        result['error'] = str(e)[:80]
+        return result
+    result['open_ms'] = (time.perf_counter() - started) * 1000
+
+    expected = chunk / rate
+    reads = max(4, int(seconds / expected))
+    intervals = []
+    overflows = 0
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    try:
+        # 첫 읽기는 장치 시작 지연이 섞이므로 간격 측정에서 제외
+        stream.read(chunk, exception_on_overflow=False)
+        previous = time.perf_counter()
+        for _ in range(reads):
+            try:
+                stream.read(chunk, exception_on_overflow=True)
+            except OSError as e:
+                if getattr(e, 'errno', None) != PA_INPUT_OVERFLOWED:
+                    raise
+                overflows += 1
+            now = time.perf_counter()
+            intervals.append(now - previous)
+            previous = now
+        input_latency = stream.get_input_latency() if hasattr(stream, 'get_input_latency') else 0.0
+    except Exception as e:
+        result['error'] = str(e)[:80]
+        return result
+    finally:
+        stream.stop_stream()
+        stream.close()
+
+    wall = time.perf_counter() - wall_started
+    jitter = np.abs(np.array(intervals) - expected) * 1000
+    result.update(
+        reads=reads,
+        overflow_rate=overflows / reads,
+        jitter_p95_ms=float(np.percentile(jitter, 95)),
+        jitter_max_ms=float(jitter.max()),
+        cpu_percent=(time.process_time() - cpu_started) / wall * 100,
+        latency_ms=expected * 1000 + input_latency * 1000)
+    return result
+
+def score(result):
+    """작을수록 좋음: 넘침이 없는 설정 중 지연 + 흔들림이 작은 것"""
+    return (result['overflow_rate'] > 0, result['overflow_rate'],
+            result['latency_ms'] + 2 * result['jitter_p95_ms'] + result['cpu_percent'])
+
+def choose_best(results):
+    usable = [r for r in results if 'error' not in r]
+    return min(usable, key=score) if usable else None
+
+def calibrate(device_name=None, device_index=None, rate=16000, channels=1, chunk_sizes=DEFAULT_CHUNK_SIZES,
+              seconds=2.0):
+    """장치(같은 이름의 모든 호스트 API)와 청크 크기 조합을 측정해 (장치 이름, 결과 목록, 최적 결과) 반환"""
+    import pyaudio
+    audio = pyaudio.PyAudio()
+    try:
+        devices = list_input_devices(audio)
+        if device_index is not None:
+            target = next((d for d in devices if d['index'] == device_index), None)
+        elif device_name:
+            target = find_device(devices, device_name)
+        else:
+            default = audio.get_default_input_device_info()
+            target = next((d for d in devices if d['index'] == default['index']), None)
+        if target is None:
+            raise ValueError("보정할 입력 장치를 찾을 수 없습니다")
+
+        candidates = [d for d in devices if same_device(d['name'], target['name'])]
+        results = []
+        for device in candidates:
+            for chunk in chunk_sizes:
+                print(f"  측정 중: {device['host_api']} / 청크 {chunk}")
+                results.append(measure(audio, device, chunk, rate, channels, seconds))
+        return target['name'], results, choose_best(results)
+    finally:
+        audio.terminate()
+
+def format_report(device_name, results, best):
+    """지원용 요약 보고서"""
+    lines = [f"🎚️ 오디오 장치 보정: {device_name}",
+             f"{'호스트 API':16s} {'청크':>5s} {'열기':>7s} {'지연':>7s} {'흔들림95':>8s} {'넘침':>6s} {'CPU':>5s}"]
+    for r in results:
+        if 'error' in r:
+            lines.append(f"{r['host_api'][:16]:16s} {r['chunk']:5d}  열기 실패: {r['error']}")
+            continue
+        mark = " ◀" if r is best else ""
+        lines.append(f"{r['host_api'][:16]:16s} {r['chunk']:5d} {r['open_ms']:6.0f}ms {r['latency_ms']:6.0f}ms "
+                     f"{r['jitter_p95_ms']:6.1f}ms {r['overflow_rate'] * 100:5.1f}% {r['cpu_percent']:4.1f}%{mark}")
+    if best:
+        lines.append(f"✅ 선택: {best['host_api']} / 청크 {best['chunk']} (지연 {best['latency_ms']:.0f}ms)")
+    else:
+        lines.append("❌ 사용할 수 있는 설정이 없습니다")
+    return "\n".join(lines)
+
+def to_setting(best):
+    """app_settings.json의 audio_devices 항목에 저장할 값"""
+    return {'chunk': best['chunk'], 'host_api': best['host_api'],
+            'latency_ms': round(best['latency_ms'], 1), 'overflow_rate': round(best['overflow_rate'], 4),
+            'calibrated_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
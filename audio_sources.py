@@ -0,0 +1,391 @@
+import mmap
+import os
+import socket
+import struct
+import sys
+import time
+import wave
+import numpy as np
+
+MAX_READ_ERRORS = 5  # 마이크 연속 읽기 오류 한도 (넘으면 장치가 끊긴 것으로 보고 입력 종료)
+READ_ERROR_DELAY = 0.05
+MAX_CONCEAL_SECONDS = 0.3  # RTP 패킷 유실을 무음으로 메우는 최대 길이 (넘으면 송신측 재시작으로 보고 재동기화)
+MAX_MISORDER = 100  # 이 개수 이내로 뒤처진 RTP 순번은 늦게 온 패킷으로 버림
+
+class AudioSource:
+    def __init__(self, rate=16000, channels=1, block_frames=1024, speed=None):
+        """녹음 단계가 읽는 오디오 입력 (고정 크기 PCM 블록 단위)
+
+        speed가 1.0이면 실시간 속도, 2.0이면 두 배 속도, 0이면 최대한 빠르게 전달합니다.
+        None이면 입력 자체의 속도(마이크, 네트워크)를 따릅니다.
+        """
+        self.rate = rate
+        self.channels = channels
+        self.block_frames = block_frames
+        self.block_bytes = block_frames * 2 * channels
+        self.speed = speed
+        self.bytes_read = 0
+        self.blocks = 0
+        self.started_at = None
+
+    def open(self):
+        return self
+
+    def read_raw(self):
+        """블록 하나 읽기 (하위 클래스 구현, 끝이면 None)"""
+        raise NotImplementedError
+
+    def read_block(self):
+        """PCM 블록 하나 반환 (지정 속도에 맞춰 대기, 입력이 끝나면 None)"""
+        if self.started_at is None:
+            self.started_at = time.time()
+        block = self.read_raw()
+        if block is None:
+            return None
+        self.bytes_read += len(block)
+        self.blocks += 1
+        if self.speed:
+            due = self.started_at + self.audio_seconds() / self.speed
+            delay = due - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        return block
+
+    def audio_seconds(self):
+        return self.bytes_read / (self.rate * 2 * self.channels)
+
+    def get_stats(self):
+        """처리량 (오디오 길이, 경과 시간, 실시간 대비 배속, 초당 바이트)"""
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            'source': type(self).__name__,
+            'blocks': self.blocks,
+            'audio_seconds': round(self.audio_seconds(), 2),
+            'wall_seconds': round(elapsed, 2),
+            'realtime_factor': round(self.audio_seconds() / elapsed, 2) if elapsed else 0.0,
+            'bytes_per_second': round(self.bytes_read / elapsed) if elapsed else 0
+        }
+
+    def close(self):
+        pass
+
+class PyAudioSource(AudioSource):
+    def __init__(self, rate=16000, channels=1, block_frames=1024, device_index=None):
+        """마이크 입력 (PyAudio)"""
+        super().__init__(rate, channels, block_frames)
+        self.device_index = device_index
+        self.audio = None
+        self.stream = None
+        self.read_errors = 0
+
+    def open(self):
+        import pyaudio
+        self.audio = pyaudio.PyAudio()
+        self.stream = self.audio.open(format=pyaudio.paInt16, channels=self.channels, rate=self.rate,
+                                      input=True, input_device_index=self.device_index,
+                                      frames_per_buffer=self.block_frames)
+        return self
+
+    def read_raw(self):
+        for attempt in range(1, MAX_READ_ERRORS + 1):
+            try:
+                return self.stream.read(self.block_frames, exception_on_overflow=False)
+            except Exception as read_error:
+                self.read_errors += 1
+                print(f"오디오 읽기 오류 ({attempt}/{MAX_READ_ERRORS}): {read_error}")
+                if attempt < MAX_READ_ERRORS:
+                    time.sleep(READ_ERROR_DELAY)
+        print("❌ 오디오 읽기 오류가 계속되어 입력을 종료합니다 (장치 연결 확인)")
+        return None
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self.audio is not None:
+            self.audio.terminate()
+            self.audio = None
+
+class FileSource(AudioSource):
+    def __init__(self, path, rate=16000, channels=1, block_frames=1024, speed=1.0, loop=False):
+        """WAV 또는 raw PCM(16비트) 파일 입력, 메모리 매핑으로 복사 없이 블록 전달"""
+        super().__init__(rate, channels, block_frames, speed)
+        self.path = path
+        self.loop = loop
+        self.file = None
+        self.map = None
+        self.view = None
+        self.start = 0
+        self.end = 0
+        self.position = 0
+
+    def open(self):
+        self.start, self.end = 0, os.path.getsize(self.path)
+        if self.path.lower().endswith(".wav"):
+            with wave.open(self.path, 'rb') as wf:
+                if (wf.getframerate(), wf.getnchannels(), wf.getsampwidth()) != (self.rate, self.channels, 2):
+                    raise ValueError(f"WAV 형식 불일치: {wf.getframerate()}Hz/{wf.getnchannels()}ch/"
+                                     f"{wf.getsampwidth() * 8}bit (필요: {self.rate}Hz/{self.channels}ch/16bit)")
+                frames = wf.getnframes()
+            self.start = self.find_data_offset()
+            self.end = self.start + frames * 2 * self.channels
+        self.file = open(self.path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self.position = self.start
+        return self
+
+    def find_data_offset(self):
+        """WAV 'data' 청크의 시작 위치"""
+        with open(self.path, 'rb') as f:
+            f.seek(12)
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError("WAV data 청크를 찾을 수 없습니다")
+                chunk_id, size = struct.unpack('<4sI', header)
+                if chunk_id == b'data':
+                    return f.tell()
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+    def read_raw(self):
+        if self.position >= self.end:
+            if not self.loop or self.end == self.start:
+                return None
+            self.position = self.start
+        block = self.view[self.position:min(self.position + self.block_bytes, self.end)]
+        self.position += len(block)
+        return block
+
+    def close(self):
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                pass  # 아직 사용 중인 블록이 있으면 가비지 컬렉션에 맡김
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class PipeSource(AudioSource):
+    def __init__(self, stream=None, rate=16000, channels=1, block_frames=1024, speed=0, path=None):
+        """파이프(표준 입력 등)에서 raw PCM(16비트 little-endian) 읽기
+
+        path를 주면 open()에서 그 파일(명명된 파이프 등)을 열고 close()에서 닫습니다."""
+        super().__init__(rate, channels, block_frames, speed)
+        self.path = path
+        self.stream = stream
+        self.owns_stream = False
+
+    def open(self):
+        if self.stream is None:
+            if self.path:
+                self.stream = open(self.path, 'rb')
+                self.owns_stream = True
+            else:
+                self.stream = sys.stdin.buffer
+        return self
+
+    def read_raw(self):
+        buffer = bytearray(self.block_bytes)
+        view = memoryview(buffer)
+        filled = 0
+        while filled < self.block_bytes:
+            count = self.stream.readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+        if filled == 0:
+            return None
+        return bytes(view[:filled - filled % 2])
+
+    def close(self):
+        if self.owns_stream and self.stream is not None:
+            self.stream.close()
+            self.stream = None
+            self.owns_stream = False
+
+class NetworkSource(AudioSource):
+    def __init__(self, host="0.0.0.0", port=5004, protocol="tcp", rate=16000, channels=1, block_frames=1024,
+                 idle_timeout=5.0):
+        """네트워크 스트림 입력
+
+        tcp: 연결 하나에서 raw PCM(16비트 little-endian, rate/channels 동일)을 받음
+        rtp: UDP RTP 패킷(PCMU/PCMA 8kHz, L16)을 받아 디코딩/리샘플링하고 손실 패킷은 무음으로 채움
+        """
+        super().__init__(rate, channels, block_frames)
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.idle_timeout = idle_timeout
+        self.socket = None
+        self.connection = None
+        self.pending = bytearray()
+        self.expected_sequence = None
+        self.packets = 0
+        self.lost_packets = 0
+        self.late_packets = 0
+        self.resyncs = 0
+
+    def open(self):
+        if self.protocol == "rtp":
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.socket.bind((self.host, self.port))
+        else:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.socket.bind((self.host, self.port))
+            self.socket.listen(1)
+        self.socket.settimeout(self.idle_timeout)
+        print(f"📡 {self.protocol.upper()} 오디오 수신 대기: {self.host}:{self.socket.getsockname()[1]}")
+        return self
+
+    def read_raw(self):
+        while len(self.pending) < self.block_bytes:
+            data = self.receive()
+            if data is None:
+                break
+            self.pending += data
+        if not self.pending:
+            return None
+        block = bytes(self.pending[:self.block_bytes])
+        del self.pending[:self.block_bytes]
+        return block
+
+    def receive(self):
+        """데이터 수신 (연결 종료/수신 없음이면 None)"""
+        try:
+            if self.protocol == "rtp":
+                packet = self.socket.recv(4096)
+                return self.decode_rtp(packet)
+            if self.connection is None:
+                self.connection, address = self.socket.accept()
+                self.connection.settimeout(self.idle_timeout)
+                print(f"📡 오디오 스트림 연결: {address[0]}:{address[1]}")
+            data = self.connection.recv(65536)
+            return data or None
+        except socket.timeout:
+            return None
+
+    def decode_rtp(self, packet):
+        """RTP 패킷 → 16비트 PCM (순서가 늦은 패킷은 버리고, 빠진 패킷은 MAX_CONCEAL_SECONDS까지 무음)
+
+        순번이 그보다 크게 건너뛰거나 크게 뒤로 가면(송신측 재시작 등) 무음을 넣지 않고 새 순번에 맞춥니다."""
+        if len(packet) < 12 or packet[0] >> 6 != 2:
+            return b''
+        csrc_count = packet[0] & 0x0F
+        has_extension = packet[0] & 0x10
+        payload_type = packet[1] & 0x7F
+        sequence = struct.unpack('!H', packet[2:4])[0]
+        offset = 12 + csrc_count * 4
+        if has_extension and len(packet) >= offset + 4:
+            offset += 4 + struct.unpack('!H', packet[offset + 2:offset + 4])[0] * 4
+        payload = packet[offset:]
+        if packet[0] & 0x20 and payload:
+            payload = payload[:-payload[-1]]  # 패딩 제거
+
+        self.packets += 1
+        gap = 0
+        if self.expected_sequence is not None:
+            difference = (sequence - self.expected_sequence) & 0xFFFF
+            if difference >= 0x10000 - MAX_MISORDER:
+                self.late_packets += 1
+                return b''
+            gap = difference
+        self.expected_sequence = (sequence + 1) & 0xFFFF
+
+        if payload_type == 0:
+            samples, source_rate = ulaw_to_linear(payload), 8000
+        elif payload_type == 8:
+            samples, source_rate = alaw_to_linear(payload), 8000
+        elif payload_type == 10:
+            # L16 스테레오 44.1kHz (RFC 3551): 좌우 채널을 평균해 모노로
+            stereo = np.frombuffer(payload[:len(payload) // 4 * 4], dtype='>i2').reshape(-1, 2)
+            samples, source_rate = stereo.mean(axis=1).astype(np.int16), 44100
+        elif payload_type == 11:
+            samples, source_rate = np.frombuffer(payload, dtype='>i2').astype(np.int16), 44100
+        else:
+            # 동적 페이로드는 설정된 형식의 L16으로 간주
+            samples, source_rate = np.frombuffer(payload, dtype='>i2').astype(np.int16), self.rate
+        samples = resample(samples, source_rate, self.rate)
+        if gap:
+            if gap * len(samples) > MAX_CONCEAL_SECONDS * self.rate:
+                # 송신측 재시작/순번 점프: 몇 분 분량의 가짜 무음을 넣지 않고 새 순번부터 이어 받음
+                self.resyncs += 1
+                print(f"⚠️ RTP 순번 점프({gap}개) - 재동기화합니다")
+            else:
+                self.lost_packets += gap
+                samples = np.concatenate([np.zeros(gap * len(samples), dtype=np.int16), samples])
+        return samples.tobytes()
+
+    def get_stats(self):
+        stats = super().get_stats()
+        if self.protocol == "rtp":
+            stats.update(packets=self.packets, lost_packets=self.lost_packets, late_packets=self.late_packets,
+                         resyncs=self.resyncs)
+        return stats
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+def build_g711_tables():
+    """G.711 μ-law/A-law → 16비트 선형 변환표"""
+    codes = np.arange(256)
+    ulaw = ~codes & 0xFF
+    exponent = (ulaw >> 4) & 0x07
+    mantissa = ulaw & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    ulaw_table = np.where(ulaw & 0x80, -magnitude, magnitude).astype(np.int16)
+
+    alaw = codes ^ 0x55
+    exponent = (alaw >> 4) & 0x07
+    mantissa = alaw & 0x0F
+    magnitude = np.where(exponent == 0, (mantissa << 4) + 8, ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0))
+    alaw_table = np.where(alaw & 0x80, magnitude, -magnitude).astype(np.int16)
+    return ulaw_table, alaw_table
+
+ULAW_TABLE, ALAW_TABLE = build_g711_tables()
+
+def ulaw_to_linear(payload):
+    return ULAW_TABLE[np.frombuffer(payload, dtype=np.uint8)]
+
+def alaw_to_linear(payload):
+    return ALAW_TABLE[np.frombuffer(payload, dtype=np.uint8)]
+
+def resample(samples, source_rate, target_rate):
+    """선형 보간 리샘플링 (전화 음성 8kHz → 16kHz 등)"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    count = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(count) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+
+def open_source(spec, rate=16000, channels=1, block_frames=1024, speed=None):
+    """문자열 지정으로 입력 생성
+
+    mic, mic:장치번호, file:경로(.wav/.raw), pipe, pipe:경로, tcp:호스트:포트, rtp:호스트:포트
+    """
+    kind, _, target = (spec or "mic").partition(":")
+    if kind == "mic":
+        source = PyAudioSource(rate, channels, block_frames, device_index=int(target) if target else None)
+    elif kind == "file":
+        source = FileSource(target, rate, channels, block_frames, 1.0 if speed is None else speed)
+    elif kind == "pipe":
+        path = target if target and target != "-" else None
+        source = PipeSource(None, rate, channels, block_frames, 0 if speed is None else speed, path=path)
+    elif kind in ("tcp", "rtp"):
+        host, _, port = target.rpartition(":")
+        source = NetworkSource(host or "0.0.0.0", int(port), kind, rate, channels, block_frames)
+    else:
+        raise ValueError(f"알 수 없는 오디오 입력: {spec}")
+    return source.open()
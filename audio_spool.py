@@ -0,0 +1,98 @@
+import mmap
+import os
+import tempfile
+
+class AudioSpool:
+    def __init__(self, segment_bytes=4 * 1024 * 1024, directory=None, rate=16000, channels=1, sample_width=2):
+        """녹음 PCM을 고정 크기 세그먼트 단위로 메모리 매핑 파일에 이어 쓰는 스풀
+
+        쓰기 중인 세그먼트 하나만 매핑해 두므로 녹음 길이와 관계없이 상주 메모리가 일정합니다.
+        """
+        granularity = mmap.ALLOCATIONGRANULARITY
+        self.segment_bytes = max(granularity, segment_bytes // granularity * granularity)
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+
+        fd, self.path = tempfile.mkstemp(prefix="voice_spool_", suffix=".pcm", dir=directory)
+        self.file = os.fdopen(fd, 'r+b')
+        self.size = 0  # 기록된 PCM 바이트 수
+        self.write_index = -1  # 현재 매핑된 쓰기 세그먼트 번호
+        self.write_map = None
+
+    def map_segment(self, index, access=mmap.ACCESS_WRITE):
+        """세그먼트 하나를 매핑"""
+        return mmap.mmap(self.file.fileno(), self.segment_bytes, access=access,
+                         offset=index * self.segment_bytes)
+
+    def append(self, data):
+        """PCM 데이터 추가"""
+        data = memoryview(data)
+        while len(data) > 0:
+            index, offset = divmod(self.size, self.segment_bytes)
+            if index != self.write_index:
+                # 이전 세그먼트 매핑 해제 후 파일을 늘리고 다음 세그먼트 매핑
+                if self.write_map is not None:
+                    self.write_map.flush()
+                    self.release(self.write_map)
+                self.file.truncate((index + 1) * self.segment_bytes)
+                self.write_map = self.map_segment(index)
+                self.write_index = index
+            count = min(len(data), self.segment_bytes - offset)
+            self.write_map[offset:offset + count] = data[:count]
+            self.size += count
+            data = data[count:]
+
+    def duration(self):
+        """녹음 길이(초)"""
+        return self.size / (self.rate * self.channels * self.sample_width)
+
+    def byte_offset(self, seconds):
+        """초 단위 위치를 샘플 경계에 맞춘 바이트 위치로 변환"""
+        frame = self.channels * self.sample_width
+        return min(self.size, int(seconds * self.rate) * frame)
+
+    def iter_views(self, start=0, end=None):
+        """[start, end) 바이트 구간을 세그먼트별 메모리뷰로 순회 (복사 없음)
+
+        반환된 뷰는 다음 뷰를 요청하기 전까지만 유효합니다.
+        """
+        end = self.size if end is None else min(end, self.size)
+        position = start
+        while position < end:
+            index, offset = divmod(position, self.segment_bytes)
+            count = min(end - position, self.segment_bytes - offset)
+            if index == self.write_index:
+                yield memoryview(self.write_map)[offset:offset + count]
+            else:
+                segment = self.map_segment(index, mmap.ACCESS_READ)
+                view = memoryview(segment)
+                try:
+                    yield view[offset:offset + count]
+                finally:
+                    view.release()
+                    self.release(segment)
+            position += count
+
+    def read(self, start, end):
+        """[start, end) 구간을 bytes로 복사 (구간 크기만큼만 메모리 사용)"""
+        return b''.join(bytes(view) for view in self.iter_views(start, end))
+
+    def release(self, segment):
+        """매핑 해제 (아직 참조 중인 뷰가 있으면 가비지 컬렉션에 맡김)"""
+        try:
+            segment.close()
+        except BufferError:
+            pass
+
+    def close(self):
+        """매핑 해제 및 스풀 파일 삭제"""
+        if self.write_map is not None:
+            self.release(self.write_map)
+            self.write_map = None
+            self.write_index = -1
+        try:
+            self.file.close()
+            os.remove(self.path)
+        except Exception as e:
+            print(f"스풀 파일 삭제 오류: {e}")
@@ -0,0 +1,53 @@
+import io
+import struct
+import wave
+import numpy as np
+
+def pcm_to_wav_bytes(pcm, rate=16000, channels=1, sample_width=2):
+    """PCM 데이터를 메모리 상의 WAV 바이트로 변환 (임시 파일 없이)"""
+    buffer = io.BytesIO()
+    wf = wave.open(buffer, 'wb')
+    wf.setnchannels(channels)
+    wf.setsampwidth(sample_width)
+    wf.setframerate(rate)
+    wf.writeframes(pcm)
+    wf.close()
+    return buffer.getvalue()
+
+def wav_header(data_size, rate=16000, channels=1, sample_width=2):
+    """data_size 바이트 PCM 앞에 붙일 44바이트 WAV 헤더 (PCM을 따로 읽어 이어 보낼 때)"""
+    return struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1, channels, rate,
+                       rate * channels * sample_width, channels * sample_width, sample_width * 8, b'data', data_size)
+
+def wav_bytes_to_pcm(wav_data):
+    """WAV 바이트에서 (PCM, 샘플링 레이트, 채널 수) 추출"""
+    wf = wave.open(io.BytesIO(wav_data), 'rb')
+    try:
+        return wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels()
+    finally:
+        wf.close()
+
+def frame_rms(pcm, rate=16000, frame_ms=30):
+    """16비트 모노 PCM을 frame_ms 단위로 나눠 프레임별 RMS 배열 반환"""
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    frame_len = max(1, int(rate * frame_ms / 1000))
+    count = len(samples) // frame_len
+    if count == 0:
+        return np.zeros(0)
+    frames = samples[:count * frame_len].astype(np.float32).reshape(count, frame_len)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+def trim_silence(pcm, rate=16000, threshold=300, frame_ms=30, padding_ms=300):
+    """앞뒤 무음 구간 제거 (음성이 전혀 없으면 빈 바이트 반환)"""
+    rms = frame_rms(pcm, rate, frame_ms)
+    voiced = np.nonzero(rms >= threshold)[0]
+    if len(voiced) == 0:
+        return b''
+
+    frame_bytes = int(rate * frame_ms / 1000) * 2
+    padding_frames = int(padding_ms / frame_ms)
+    start = max(0, voiced[0] - padding_frames) * frame_bytes
+    end = min(len(rms), voiced[-1] + 1 + padding_frames) * frame_bytes
+    if voiced[-1] + 1 + padding_frames >= len(rms):
+        end = len(pcm)
+    return pcm[start:end]
@@ -0,0 +1,190 @@
+import json
+import math
+import os
+import threading
+from datetime import datetime
+
+class UsageAccountant:
+    def __init__(self, settings_manager=None, usage_file="stt_usage.json", save_seconds=None):
+        """Speech-to-Text 전송 오디오 시간, 과금 시간, 일/월 비용을 기록하는 회계 모듈
+
+        사용량은 메모리에서 누적하고 save_seconds마다(바뀐 경우만)와 종료(close) 시 파일에 저장합니다."""
+        config = settings_manager.get_setting("stt_billing", {}) if settings_manager else {}
+        self.price_per_minute = config.get("price_per_minute", 0.006)
+        self.increment_seconds = config.get("billing_increment_seconds", 15)
+        self.free_minutes_per_month = config.get("free_minutes_per_month", 60)
+        self.daily_budget = config.get("daily_budget_usd")
+        self.monthly_budget = config.get("monthly_budget_usd")
+        self.block_when_over_budget = config.get("block_when_over_budget", False)
+
+        self.usage_file = usage_file
+        self.lock = threading.Lock()
+        self.usage = self.load_usage()
+        self.dirty = False
+
+        if save_seconds is None:
+            save_seconds = config.get("save_seconds", 10.0)
+        self.stop_event = threading.Event()
+        self.saver = threading.Thread(target=self.save_loop, args=(save_seconds,), daemon=True, name="usage-saver")
+        self.saver.start()
+
+    def load_usage(self):
+        """사용량 파일 불러오기"""
+        try:
+            if os.path.exists(self.usage_file):
+                with open(self.usage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"❌ 사용량 파일 불러오기 실패: {e}")
+        return {"days": {}, "months": {}}
+
+    def save_usage(self):
+        """바뀐 사용량을 파일에 저장"""
+        with self.lock:
+            if not self.dirty:
+                return
+            text = json.dumps(self.usage, ensure_ascii=False, indent=2)
+            self.dirty = False
+        try:
+            with open(self.usage_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+        except Exception as e:
+            print(f"❌ 사용량 파일 저장 실패: {e}")
+            with self.lock:
+                self.dirty = True
+
+    def save_loop(self, interval):
+        while not self.stop_event.wait(interval):
+            self.save_usage()
+
+    def close(self):
+        """주기 저장 중지 후 마지막 사용량 저장"""
+        self.stop_event.set()
+        self.save_usage()
+
+    def billed_seconds(self, audio_seconds):
+        """요청 한 건의 과금 시간 (과금 단위로 올림, 최소 1단위)"""
+        increments = max(1, math.ceil(audio_seconds / self.increment_seconds))
+        return increments * self.increment_seconds
+
+    def record(self, audio_seconds, utterances=1):
+        """인식 요청 한 건 기록"""
+        billed = self.billed_seconds(audio_seconds)
+        now = datetime.now()
+        with self.lock:
+            for bucket, key in (("days", now.strftime("%Y-%m-%d")), ("months", now.strftime("%Y-%m"))):
+                entry = self.usage[bucket].setdefault(key, {
+                    "requests": 0, "utterances": 0, "audio_seconds": 0.0, "billed_seconds": 0
+                })
+                entry["requests"] += 1
+                entry["utterances"] += utterances
+                entry["audio_seconds"] = round(entry["audio_seconds"] + audio_seconds, 3)
+                entry["billed_seconds"] += billed
+            self.dirty = True
+        print(f"💰 오디오 {audio_seconds:.1f}초 전송 (과금 {billed}초, 발화 {utterances}개)")
+        self.warn_if_near_budget()
+
+    def get_summary(self):
+        """오늘/이번 달 사용량과 예상 비용"""
+        now = datetime.now()
+        with self.lock:
+            day = dict(self.usage["days"].get(now.strftime("%Y-%m-%d"), {}))
+            month = dict(self.usage["months"].get(now.strftime("%Y-%m"), {}))
+
+        day_minutes = day.get("billed_seconds", 0) / 60.0
+        month_minutes = month.get("billed_seconds", 0) / 60.0
+        return {
+            "today": day,
+            "month": month,
+            "today_cost_usd": round(day_minutes * self.price_per_minute, 4),
+            "month_cost_usd": round(max(0.0, month_minutes - self.free_minutes_per_month) * self.price_per_minute, 4),
+            "free_minutes_left": round(max(0.0, self.free_minutes_per_month - month_minutes), 2),
+            "daily_budget_usd": self.daily_budget,
+            "monthly_budget_usd": self.monthly_budget
+        }
+
+    def is_over_budget(self):
+        """일/월 예산 초과 여부"""
+        summary = self.get_summary()
+        if self.daily_budget is not None and summary["today_cost_usd"] >= self.daily_budget:
+            return True
+        if self.monthly_budget is not None and summary["month_cost_usd"] >= self.monthly_budget:
+            return True
+        return False
+
+    def warn_if_near_budget(self):
+        """예산의 80% 이상 사용 시 경고 출력"""
+        summary = self.get_summary()
+        for cost, budget, name in ((summary["today_cost_usd"], self.daily_budget, "일"),
+                                   (summary["month_cost_usd"], self.monthly_budget, "월")):
+            if budget and cost >= budget * 0.8:
+                print(f"⚠️ {name} 예산의 {cost / budget * 100:.0f}% 사용 (${cost:.3f} / ${budget:.2f})")
+
+    def format_summary(self):
+        """GUI 표시용 한 줄 요약"""
+        summary = self.get_summary()
+        text = f"STT 이번 달 {summary['month'].get('billed_seconds', 0) / 60.0:.1f}분 (${summary['month_cost_usd']:.3f}"
+        if self.monthly_budget is not None:
+            text += f" / ${self.monthly_budget:.2f}"
+        return text + ")"
+
+class UtterancePacker:
+    def __init__(self, rate=16000, max_utterance_seconds=5.0, max_pack_seconds=50.0,
+                 max_utterances=8, separator_seconds=0.6):
+        """짧은 발화 여러 개를 무음 구분자로 이어 붙여 한 번에 인식 요청하는 패킹 도구"""
+        self.rate = rate
+        self.max_utterance_seconds = max_utterance_seconds
+        self.max_pack_seconds = max_pack_seconds
+        self.max_utterances = max_utterances
+        self.separator_seconds = separator_seconds
+        self.supported = True  # 서버가 단어 시간 정보를 주지 않으면 False로 전환
+
+    @classmethod
+    def from_settings(cls, settings_manager, rate=16000):
+        """stt_billing.packing 설정으로 생성 (비활성화면 None)"""
+        config = settings_manager.get_setting("stt_billing", {}).get("packing", {}) if settings_manager else {}
+        if not config.get("enabled", False):
+            return None
+        return cls(rate=rate,
+                   max_utterance_seconds=config.get("max_utterance_seconds", 5.0),
+                   max_pack_seconds=config.get("max_pack_seconds", 50.0),
+                   max_utterances=config.get("max_utterances", 8),
+                   separator_seconds=config.get("separator_seconds", 0.6))
+
+    def duration(self, pcm):
+        """16비트 모노 PCM 길이(초)"""
+        return len(pcm) / (self.rate * 2)
+
+    def is_packable(self, pcm):
+        return self.supported and self.duration(pcm) <= self.max_utterance_seconds
+
+    def pack(self, pcm_list):
+        """PCM 목록을 무음 구분자로 연결, (PCM, 발화별 (시작, 끝) 초) 반환"""
+        separator = b'\x00\x00' * int(self.rate * self.separator_seconds)
+        parts = []
+        boundaries = []
+        position = 0.0
+        for index, pcm in enumerate(pcm_list):
+            if index > 0:
+                parts.append(separator)
+                position += self.separator_seconds
+            start = position
+            parts.append(pcm)
+            position += self.duration(pcm)
+            boundaries.append((start, position))
+        return b''.join(parts), boundaries
+
+    def split(self, words, boundaries):
+        """단어 시작 시각으로 발화별 텍스트 복원
+
+        words: [{'word': '...', 'start': 초, 'end': 초}, ...]
+        """
+        texts = [[] for _ in boundaries]
+        half_gap = self.separator_seconds / 2
+        for word in words:
+            start = float(word.get('start', 0.0))
+            for index, (_, end) in enumerate(boundaries):
+                if start < end + half_gap or index == len(boundaries) - 1:
+                    texts[index].append(word.get('word', ''))
+                    break
+        return [" ".join(t) for t in texts]
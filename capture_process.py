@@ -0,0 +1,190 @@
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+HEADER_BYTES = 64
+# 헤더 필드 (int64 배열 인덱스)
+WRITE_POS, READ_POS, RECORDING, RUNNING, OVERFLOWS, DROPPED_BYTES, READY = range(7)
+
+PA_INPUT_OVERFLOWED = -9981
+
+def write_ring(header, ring, capacity, data):
+    """링 버퍼에 청크 기록 (끝에 닿으면 앞으로 이어 씀), 읽는 쪽이 밀려 자리가 없으면 버리고 False"""
+    size = len(data)
+    write_pos = int(header[WRITE_POS])
+    if write_pos + size - int(header[READ_POS]) > capacity:
+        # 덮어쓰지 않고 이번 청크를 버림
+        header[DROPPED_BYTES] += size
+        return False
+    offset = write_pos % capacity
+    first = min(size, capacity - offset)
+    ring[offset:offset + first] = data[:first]
+    if first < size:
+        ring[:size - first] = data[first:]
+    header[WRITE_POS] = write_pos + size  # 데이터 기록 후 위치 갱신
+    return True
+
+def capture_main(shm_name, capacity, rate, channels, chunk, device_index):
+    """캡처 프로세스 본체: PyAudio 읽기 루프만 실행하며 공유 메모리 링에 기록"""
+    import pyaudio
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    header = np.ndarray((8,), dtype=np.int64, buffer=shm.buf[:HEADER_BYTES])
+    ring = shm.buf[HEADER_BYTES:HEADER_BYTES + capacity]
+    audio = pyaudio.PyAudio()
+    stream = None
+    try:
+        stream = audio.open(format=pyaudio.paInt16, channels=channels, rate=rate, input=True,
+                            input_device_index=device_index, frames_per_buffer=chunk, start=False)
+        header[READY] = 1
+        frame_bytes = 2 * channels
+        while header[RUNNING]:
+            if not header[RECORDING]:
+                if stream.is_active():
+                    stream.stop_stream()
+                time.sleep(0.01)
+                continue
+            if not stream.is_active():
+                stream.start_stream()
+            try:
+                data = stream.read(chunk, exception_on_overflow=True)
+            except OSError as e:
+                # 입력 버퍼 넘침: 해당 구간은 유실되므로 횟수와 바이트 수를 기록
+                if getattr(e, 'errno', None) == PA_INPUT_OVERFLOWED:
+                    header[OVERFLOWS] += 1
+                    header[DROPPED_BYTES] += chunk * frame_bytes
+                    continue
+                raise
+
+            write_ring(header, ring, capacity, data)
+    except Exception as e:
+        print(f"❌ 캡처 프로세스 오류: {e}")
+        header[READY] = -1
+    finally:
+        if stream is not None:
+            stream.close()
+        audio.terminate()
+        del header
+        ring.release()
+        shm.close()
+
+class CaptureProcess:
+    def __init__(self, rate=16000, channels=1, chunk=1024, ring_seconds=30, device_index=None):
+        """별도 프로세스에서 마이크를 읽고 공유 메모리 링 버퍼로 전달 (GIL 경합과 분리)"""
+        self.rate = rate
+        self.channels = channels
+        self.chunk = chunk
+        self.device_index = device_index
+        self.capacity = int(rate * ring_seconds) * 2 * channels
+        self.shm = None
+        self.header = None
+        self.ring = None
+        self.process = None
+        self.last_counts = (0, 0)
+
+    @classmethod
+    def from_settings(cls, voice_processor, settings_manager):
+        """app_settings.json의 capture_process 항목으로 생성 (사용 안 함이면 None)"""
+        config = settings_manager.get_setting("capture_process", {}) if settings_manager else {}
+        if not config.get("enabled", False):
+            return None
+        return cls(voice_processor.RATE, voice_processor.CHANNELS, voice_processor.CHUNK,
+                   ring_seconds=config.get("ring_seconds", 30),
+                   device_index=config.get("device_index", voice_processor.mic_device_index()))
+
+    def open_ring(self):
+        """공유 메모리(헤더 + 링 버퍼) 생성"""
+        self.shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + self.capacity)
+        self.header = np.ndarray((8,), dtype=np.int64, buffer=self.shm.buf[:HEADER_BYTES])
+        self.header[:] = 0
+        self.header[RUNNING] = 1
+        self.ring = self.shm.buf[HEADER_BYTES:HEADER_BYTES + self.capacity]
+
+    def start(self, timeout=5):
+        """캡처 프로세스 시작, 장치 열기에 실패하면 False"""
+        self.open_ring()
+        self.process = multiprocessing.Process(
+            target=capture_main, daemon=True, name="audio-capture",
+            args=(self.shm.name, self.capacity, self.rate, self.channels, self.chunk, self.device_index))
+        self.process.start()
+
+        deadline = time.time() + timeout
+        while self.header[READY] == 0 and time.time() < deadline and self.process.is_alive():
+            time.sleep(0.02)
+        if self.header[READY] != 1:
+            print("❌ 캡처 프로세스 시작 실패 - 기존 방식으로 녹음합니다")
+            self.stop()
+            return False
+        print(f"✅ 캡처 프로세스 시작 (링 버퍼 {self.capacity // 1024}KB)")
+        return True
+
+    @property
+    def alive(self):
+        return bool(self.process is not None and self.process.is_alive() and self.header[READY] == 1)
+
+    def begin(self):
+        """녹음 시작: 이전 데이터는 건너뛰고 기록 시작"""
+        self.header[READ_POS] = self.header[WRITE_POS]
+        self.last_counts = (int(self.header[OVERFLOWS]), int(self.header[DROPPED_BYTES]))
+        self.header[RECORDING] = 1
+
+    def end(self):
+        """녹음 중지, 이번 녹음의 (넘침 횟수, 유실 프레임 수) 반환"""
+        self.header[RECORDING] = 0
+        overflows = int(self.header[OVERFLOWS]) - self.last_counts[0]
+        dropped_frames = (int(self.header[DROPPED_BYTES]) - self.last_counts[1]) // (2 * self.channels)
+        return overflows, dropped_frames
+
+    def read_views(self, timeout=0.05):
+        """새로 기록된 구간을 공유 메모리 뷰로 반환 (복사 없음, 1~2개)
+
+        뷰를 다 사용한 뒤 advance()를 호출해야 해당 구간을 다시 쓸 수 있습니다.
+        """
+        deadline = time.time() + timeout
+        while self.header[WRITE_POS] == self.header[READ_POS] and time.time() < deadline:
+            time.sleep(0.01)
+        start = int(self.header[READ_POS])
+        end = int(self.header[WRITE_POS])
+        if end == start:
+            return [], start
+        offset = start % self.capacity
+        size = end - start
+        first = min(size, self.capacity - offset)
+        views = [self.ring[offset:offset + first]]
+        if first < size:
+            views.append(self.ring[:size - first])
+        return views, end
+
+    def advance(self, position):
+        """읽은 위치 갱신"""
+        self.header[READ_POS] = position
+
+    def get_stats(self):
+        if self.header is None:
+            return {}
+        return {
+            'alive': self.alive,
+            'captured_seconds': int(self.header[WRITE_POS]) / (self.rate * 2 * self.channels),
+            'buffered_bytes': int(self.header[WRITE_POS] - self.header[READ_POS]),
+            'overflows': int(self.header[OVERFLOWS]),
+            'dropped_frames': int(self.header[DROPPED_BYTES]) // (2 * self.channels)
+        }
+
+    def stop(self):
+        """캡처 프로세스 종료 및 공유 메모리 해제"""
+        if self.header is not None:
+            self.header[RECORDING] = 0
+            self.header[RUNNING] = 0
+        if self.process is not None:
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        if self.shm is not None:
+            self.header = None
+            self.ring.release()
+            self.ring = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
@@ -0,0 +1,335 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def parse_cell(cell):
+    """셀 주소를 (열 문자, 행 번호)로 분리 (A12 -> ('A', 12))"""
+    match = re.match(r'([A-Z]+)(\d+)$', cell.strip().upper())
+    if not match:
+        raise ValueError(f"셀 주소 형식 오류: {cell}")
+    return match.group(1), int(match.group(2))
+
+def cursor_key(spreadsheet, sheet, column):
+    """스프레드시트/시트/열 단위 커서 키"""
+    return f"{spreadsheet}/{sheet}/{column}"
+
+def lock_file(handle):
+    """파일 첫 바이트를 비차단 단독 잠금 (이미 잠겨 있으면 OSError)"""
+    handle.seek(0)
+    if os.name == 'nt':
+        import msvcrt
+        msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+def unlock_file(handle):
+    handle.seek(0)
+    if os.name == 'nt':
+        import msvcrt
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+class CursorTable:
+    def __init__(self, state=None):
+        """키별 다음 빈 행 번호 표 (조정 서비스와 파일 잠금 방식이 같은 규칙을 사용)"""
+        self.cursors = dict(state or {})
+
+    def lease(self, key, count, start_row=1):
+        """count개 행 블록을 할당해 (첫 행, 마지막 행) 반환 (start_row보다 앞 행은 주지 않음)"""
+        first = max(self.cursors.get(key, 1), start_row)
+        last = first + count - 1
+        self.cursors[key] = last + 1
+        return first, last
+
+    def release(self, key, first, last):
+        """쓰지 않은 행 반환 (그 뒤로 다른 할당이 없었을 때만 커서를 되돌림)"""
+        if self.cursors.get(key) == last + 1:
+            self.cursors[key] = first
+            return True
+        return False
+
+class LocalCoordinator:
+    def __init__(self, state_file=None):
+        """프로세스 안 조정자 (조정 서비스 내부 또는 단일 PC/테스트용 대역)"""
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        state = {}
+        if state_file and os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except Exception as e:
+                print(f"⚠️ 커서 상태 파일 읽기 실패: {e}")
+        self.table = CursorTable(state)
+        self.round_trips = 0
+
+    def save(self):
+        if not self.state_file:
+            return
+        temp_path = self.state_file + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.table.cursors, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.state_file)
+
+    def lease(self, key, count, start_row=1):
+        with self.lock:
+            self.round_trips += 1
+            result = self.table.lease(key, count, start_row)
+            self.save()
+            return result
+
+    def release(self, key, first, last):
+        with self.lock:
+            self.round_trips += 1
+            released = self.table.release(key, first, last)
+            if released:
+                self.save()
+            return released
+
+    def get_status(self):
+        with self.lock:
+            return dict(self.table.cursors)
+
+class FileLockCoordinator:
+    def __init__(self, path, lock_timeout=10.0):
+        """공유 폴더의 JSON 파일 + 잠금 파일로 여러 PC의 커서를 조정
+
+        잠금은 운영체제 파일 잠금(Windows msvcrt, 그 밖에는 fcntl)이라 프로세스가 비정상 종료해도
+        자동으로 풀립니다. 잠금 파일은 지우지 않고 계속 재사용합니다."""
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.lock_timeout = lock_timeout
+        self.round_trips = 0
+
+    def acquire_lock(self):
+        """잠금 파일을 단독으로 잠글 때까지 대기, 잠근 파일 반환"""
+        deadline = time.time() + self.lock_timeout
+        handle = open(self.lock_path, 'a+b')
+        while True:
+            try:
+                lock_file(handle)
+                return handle
+            except OSError:
+                if time.time() > deadline:
+                    handle.close()
+                    raise TimeoutError(f"커서 잠금 대기 시간 초과: {self.lock_path}")
+                time.sleep(0.05)
+
+    def update(self, change):
+        """잠금 상태에서 커서 표를 읽고 change(table) 실행 후 저장"""
+        handle = self.acquire_lock()
+        try:
+            self.round_trips += 1
+            state = {}
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            table = CursorTable(state)
+            result = change(table)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(table.cursors, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+            return result
+        finally:
+            unlock_file(handle)
+            handle.close()
+
+    def lease(self, key, count, start_row=1):
+        return self.update(lambda table: table.lease(key, count, start_row))
+
+    def release(self, key, first, last):
+        return self.update(lambda table: table.release(key, first, last))
+
+class HTTPCoordinator:
+    def __init__(self, url, timeout=5.0):
+        """조정 서비스(CoordinatorServer)에 HTTP로 블록 할당 요청"""
+        import requests
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.round_trips = 0
+
+    def post(self, path, payload):
+        self.round_trips += 1
+        response = self.session.post(f"{self.url}{path}", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def lease(self, key, count, start_row=1):
+        result = self.post("/lease", {'key': key, 'count': count, 'start_row': start_row})
+        return result['first'], result['last']
+
+    def release(self, key, first, last):
+        return self.post("/release", {'key': key, 'first': first, 'last': last})['released']
+
+class CoordinatorServer:
+    def __init__(self, coordinator=None, host="0.0.0.0", port=8766):
+        """여러 PC가 공유하는 작은 커서 조정 서비스 (POST /lease, POST /release, GET /status)"""
+        self.coordinator = coordinator or LocalCoordinator()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/status":
+                    self.send_json(200, server.coordinator.get_status())
+                else:
+                    self.send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                    if self.path == "/lease":
+                        first, last = server.coordinator.lease(payload['key'], int(payload['count']),
+                                                               int(payload.get('start_row', 1)))
+                        self.send_json(200, {'first': first, 'last': last})
+                    elif self.path == "/release":
+                        released = server.coordinator.release(payload['key'], int(payload['first']),
+                                                              int(payload['last']))
+                        self.send_json(200, {'released': released})
+                    else:
+                        self.send_json(404, {'error': 'not found'})
+                except (KeyError, ValueError) as e:
+                    self.send_json(400, {'error': str(e)})
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="cell-coordinator")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class CellAllocator:
+    def __init__(self, coordinator, block_size=20, station=""):
+        """여러 입력 PC/스테이션이 같은 시트에 쓸 때 겹치지 않는 셀을 나눠 주는 할당기
+
+        행을 block_size개씩 빌려 두고 그 안에서 차례로 사용하므로 조정자 왕복은 블록당 한 번입니다."""
+        self.coordinator = coordinator
+        self.block_size = block_size
+        self.station = station
+        self.lock = threading.Lock()
+        self.leases = {}  # 키 -> [다음 행, 마지막 행]
+
+        # 통계
+        self.allocated = 0
+        self.blocks = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls, settings_manager):
+        """app_settings.json의 cell_allocation 항목으로 할당기 생성 (없거나 꺼져 있으면 None)"""
+        config = settings_manager.get_setting("cell_allocation", {}) if settings_manager else {}
+        if not config.get("enabled"):
+            return None
+        target = config.get("coordinator", "cell_cursors.json")
+        if target.startswith(("http://", "https://")):
+            coordinator = HTTPCoordinator(target, timeout=config.get("timeout", 5.0))
+        else:
+            coordinator = FileLockCoordinator(target[5:] if target.startswith("file:") else target)
+        print(f"🧮 셀 분배 사용: {target} (블록 {config.get('block_size', 20)}행)")
+        return cls(coordinator, config.get("block_size", 20), config.get("station", ""))
+
+    def next_cell(self, spreadsheet, sheet, cell):
+        """cell(입력란의 현재 셀)을 기준으로 다른 스테이션과 겹치지 않는 셀 주소 반환
+
+        입력란이 현재 블록 안을 가리키면 그 행을 쓰고, 블록보다 뒤를 가리키면 그 위치부터 새 블록을 받습니다."""
+        column, row = parse_cell(cell)
+        key = cursor_key(spreadsheet, sheet, column)
+        with self.lock:
+            lease = self.leases.get(key)
+            if lease and row > lease[1]:
+                self.release_lease(key, lease)
+                lease = None
+            if lease is None or lease[0] > lease[1]:
+                try:
+                    first, last = self.coordinator.lease(key, self.block_size, row)
+                except Exception as e:
+                    self.errors += 1
+                    raise RuntimeError(f"셀 분배 조정자 연결 실패: {e}")
+                lease = self.leases[key] = [first, last]
+                self.blocks += 1
+                print(f"🧮 행 블록 할당: {spreadsheet}/{sheet} {column}{first}~{column}{last}")
+            elif row > lease[0]:
+                lease[0] = row
+            allocated_row = lease[0]
+            lease[0] += 1
+            self.allocated += 1
+            return f"{column}{allocated_row}"
+
+    def release_lease(self, key, lease):
+        if lease[0] > lease[1]:
+            return
+        try:
+            self.coordinator.release(key, lease[0], lease[1])
+        except Exception as e:
+            print(f"⚠️ 남은 행 반환 실패 ({key}): {e}")
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'station': self.station,
+                'allocated': self.allocated,
+                'blocks': self.blocks,
+                'round_trips': self.coordinator.round_trips,
+                'errors': self.errors,
+                'leases': {key: f"{lease[0]}~{lease[1]}" for key, lease in self.leases.items()}
+            }
+
+    def close(self):
+        """종료 시 쓰지 않은 행 반환 (뒤이어 다른 할당이 없었던 블록만 되돌려짐)"""
+        with self.lock:
+            for key, lease in self.leases.items():
+                self.release_lease(key, lease)
+            self.leases.clear()
+
+def main():
+    """셀 분배 조정 서비스 실행"""
+    parser = argparse.ArgumentParser(description="여러 PC가 같은 시트에 입력할 때 행 블록을 나눠 주는 조정 서비스")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--state", default="cell_cursors.json", help="커서 상태 저장 파일")
+    args = parser.parse_args()
+
+    server = CoordinatorServer(LocalCoordinator(args.state), args.host, args.port)
+    print(f"🧮 셀 분배 조정 서비스 시작: http://{args.host}:{args.port} (상태 파일 {args.state})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("조정 서비스 종료 중...")
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
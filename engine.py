@@ -0,0 +1,392 @@
+import asyncio
+import bisect
+import itertools
+import threading
+import time
+import concurrent.futures
+from audio_utils import pcm_to_wav_bytes, trim_silence
+from audio_spool import AudioSpool
+
+DEFAULT_CONCURRENCY = {
+    'capture': 1,     # 마이크 녹음 (장치 하나당 1개)
+    'encode': 2,      # 무음 제거 + WAV 인코딩
+    'transcribe': 4,  # Cloud Run 인식 요청
+    'sheet': 1        # 결과 전달/시트 입력 (순서 유지를 위해 1개)
+}
+# 인식은 동시에 여러 개가 진행되어 끝나는 순서가 바뀔 수 있으므로, 결과는 stream별 제출 순서대로 sheet 단계에 넘김
+
+STAGES = ['capture', 'encode', 'transcribe', 'sheet']
+
+class VoicePipelineEngine:
+    def __init__(self, queue_size=8, concurrency=None, vad_threshold=None, packer=None):
+        """녹음 → 인코딩 → 인식 → 시트 입력 단계를 제한된 큐로 연결한 asyncio 처리 엔진
+
+        vad_threshold를 주면 인코딩 전에 그 RMS 미만인 앞뒤 무음을 잘라냅니다 (기본은 녹음 그대로 전송)."""
+        self.queue_size = queue_size
+        self.packer = packer  # 짧은 발화 패킹 (billing.UtterancePacker, 선택)
+        self.concurrency = dict(DEFAULT_CONCURRENCY)
+        self.concurrency.update(concurrency or {})
+        self.vad_threshold = vad_threshold
+
+        self.loop = None
+        self.loop_thread = None
+        self.executor = None
+        self.queues = {}
+        self.tasks = []
+        self.accepting = False
+        self.job_ids = itertools.count(1)
+        self.jobs = {}  # 처리 중인 작업 (작업 ID -> 작업)
+        self.order = {}  # stream -> 아직 sheet 단계로 넘기지 않은 작업 ID (제출 순)
+        self.parked = {}  # 작업 ID -> 앞선 작업을 기다리는 인식 완료 작업
+
+        # 단계별 통계
+        self.stage_stats = {stage: {'processed': 0, 'failed': 0, 'busy_seconds': 0.0} for stage in STAGES}
+
+    @classmethod
+    def from_settings(cls, settings_manager):
+        """app_settings.json의 engine 항목으로 엔진 생성"""
+        from billing import UtterancePacker
+        config = settings_manager.get_setting("engine", {}) if settings_manager else {}
+        return cls(queue_size=config.get("queue_size", 8),
+                   concurrency=config.get("concurrency"),
+                   vad_threshold=config.get("vad_threshold"),
+                   packer=UtterancePacker.from_settings(settings_manager))
+
+    def start(self):
+        """별도 스레드에서 이벤트 루프와 단계별 작업자 시작"""
+        if self.loop:
+            return
+        # 블로킹 호출(녹음, HTTP, gspread)은 단계 동시성 합계만큼의 스레드 풀에서 실행
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=sum(self.concurrency.values()), thread_name_prefix="engine")
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+        ready = threading.Event()
+        self.loop_thread = threading.Thread(target=self.run_loop, args=(ready,), daemon=True, name="engine-loop")
+        self.loop_thread.start()
+        ready.wait()
+        self.accepting = True
+        print(f"⚙️ 처리 엔진 시작 (큐 크기 {self.queue_size}, 동시성 {self.concurrency})")
+
+    def run_loop(self, ready):
+        asyncio.set_event_loop(self.loop)
+        for stage in STAGES:
+            self.queues[stage] = asyncio.Queue(maxsize=self.queue_size)
+        for stage in STAGES:
+            for _ in range(self.concurrency[stage]):
+                self.tasks.append(self.loop.create_task(self.stage_worker(stage)))
+        ready.set()
+        self.loop.run_forever()
+
+    def submit(self, job, block=False, timeout=None):
+        """작업 제출 (block=False이면 큐가 가득 찼을 때 즉시 None 반환)
+
+        job 딕셔너리 키:
+          processor  - SimpleVoiceProcessor (capture_audio/transcribe 제공)
+          pcm        - 이미 녹음된 PCM (없으면 processor에서 녹음)
+          sink       - sink(text, confidence) 결과 전달 함수
+          on_error   - on_error(message) 오류 전달 함수 (선택)
+          stream     - 결과 순서를 지키는 단위 (같은 stream의 결과는 제출 순서대로 sink에 전달, 기본은 processor)
+        반환값은 (텍스트, 신뢰도)로 완료되는 concurrent.futures.Future
+        """
+        if not self.accepting:
+            print("❌ 처리 엔진이 실행 중이 아닙니다")
+            return None
+
+        job['id'] = next(self.job_ids)
+        job['future'] = concurrent.futures.Future()
+        job['cancelled'] = False
+        job['timings'] = {'submitted': time.time()}
+        first_stage = 'encode' if job.get('pcm') is not None or job.get('spool') else 'capture'
+
+        async def enqueue():
+            queue = self.queues[first_stage]
+            self.track_order(job)
+            if block:
+                await queue.put(job)
+                return True
+            try:
+                queue.put_nowait(job)
+                return True
+            except asyncio.QueueFull:
+                self.forget_order(job)
+                return False
+
+        self.jobs[job['id']] = job
+        accepted = asyncio.run_coroutine_threadsafe(enqueue(), self.loop).result(timeout)
+        if not accepted:
+            self.jobs.pop(job['id'], None)
+            print("⚠️ 처리 대기열이 가득 찼습니다 (백프레셔)")
+            return None
+        return job['future']
+
+    def cancel(self, job_id):
+        """작업 취소 (이후 단계는 건너뜀)"""
+        job = self.jobs.get(job_id)
+        if job:
+            job['cancelled'] = True
+            job['future'].cancel()
+
+    async def stage_worker(self, stage):
+        """단계 작업자: 입력 큐에서 꺼내 처리 후 다음 단계 큐로 전달 (다음 큐가 가득 차면 대기)"""
+        queue = self.queues[stage]
+        next_stage = STAGES[STAGES.index(stage) + 1] if stage != STAGES[-1] else None
+        while True:
+            job = await queue.get()
+            if stage == 'sheet':
+                self.release_in_order()  # 자리가 생겼으므로 기다리던 결과를 넣음
+            try:
+                if job['cancelled']:
+                    self.finish(job)
+                    continue
+                started = time.time()
+                ok = await getattr(self, f"run_{stage}")(job)
+                self.stage_stats[stage]['busy_seconds'] += time.time() - started
+                job['timings'][stage] = time.time()
+                if not ok:
+                    self.stage_stats[stage]['failed'] += 1
+                    self.finish(job)
+                    continue
+                # 함께 처리된 작업(발화 패킹)도 다음 단계로 전달
+                for handled in [job] + job.pop('extra_jobs', []):
+                    if handled is not job:
+                        queue.task_done()
+                    self.stage_stats[stage]['processed'] += 1
+                    if next_stage == 'sheet':
+                        # 앞서 제출된 작업이 아직 인식 중이면 끝날 때까지 보관
+                        self.parked[handled['id']] = handled
+                        self.release_in_order()
+                    elif next_stage:
+                        await self.queues[next_stage].put(handled)
+                    else:
+                        self.finish(handled)
+            except asyncio.CancelledError:
+                self.finish(job)
+                raise
+            except Exception as e:
+                print(f"❌ 엔진 {stage} 단계 오류: {e}")
+                self.stage_stats[stage]['failed'] += 1
+                self.report_error(job, f"❌ 처리 오류: {e}")
+                self.finish(job)
+            finally:
+                queue.task_done()
+
+    async def run_capture(self, job):
+        """마이크 녹음 (블로킹 읽기 루프는 스레드 풀에서 실행)"""
+        captured = await self.loop.run_in_executor(None, job['processor'].capture_audio)
+        if isinstance(captured, AudioSpool):
+            # 무제한 녹음: 이후 단계는 스풀의 메모리뷰를 직접 읽음
+            job['spool'] = captured
+            if captured.size == 0:
+                self.report_error(job, "❌ 녹음된 데이터가 없습니다")
+                return False
+            return True
+        if not captured:
+            self.report_error(job, "❌ 녹음된 데이터가 없습니다")
+            return False
+        job['pcm'] = b''.join(captured)
+        return True
+
+    async def run_encode(self, job):
+        """무음 구간 제거 후 WAV 인코딩"""
+        processor = job['processor']
+        if job.get('spool'):
+            return True  # 긴 녹음은 인식 단계에서 구간별로 인코딩
+
+        def encode():
+            pcm = trim_silence(job['pcm'], processor.RATE, self.vad_threshold) if self.vad_threshold else job['pcm']
+            if not pcm:
+                return None
+            return pcm_to_wav_bytes(pcm, processor.RATE, processor.CHANNELS, 2)
+
+        job['wav'] = await self.loop.run_in_executor(None, encode)
+        if self.packer and job['wav'] is not None:
+            job['pcm'] = memoryview(job['wav'])[44:]  # 패킹용 PCM (WAV 헤더 제외, 추가 복사 없음)
+        else:
+            job['pcm'] = None  # 메모리 해제
+        if job['wav'] is None:
+            self.report_error(job, "❌ 음성이 감지되지 않았습니다")
+            return False
+        return True
+
+    async def run_transcribe(self, job):
+        """Cloud Run 인식 요청 (패킹 사용 시 대기 중인 짧은 발화를 묶어서 한 번에 요청)"""
+        processor = job['processor']
+        if not processor.api_available:
+            print("Cloud Run API 사용 불가능")
+            job['result'] = ("[오류] Cloud Run 서버 연결 실패", 0.0)
+            job['wav'] = None
+            return True
+
+        if job.get('spool'):
+            text, confidence, _ = await self.loop.run_in_executor(None, processor.transcribe_spool, job['spool'])
+            job['result'] = (text, confidence)
+            spool = job.pop('spool')
+            if processor.archive:
+                job['archive_audio'] = spool  # 보관소가 기록 후 닫음
+            else:
+                spool.close()
+            return True
+
+        batch = self.collect_pack(job)
+        try:
+            results = None
+            if len(batch) > 1:
+                results = await self.loop.run_in_executor(
+                    None, processor.transcribe_packed, [j['pcm'] for j in batch], self.packer)
+            if results is not None:
+                for packed_job, result in zip(batch, results):
+                    packed_job['result'] = result
+            else:
+                for single_job in batch:
+                    text, confidence, _ = await self.loop.run_in_executor(None, processor.transcribe, single_job['wav'])
+                    single_job['result'] = (text, confidence)
+        except BaseException as e:
+            # 함께 꺼낸 작업도 큐에서 빠진 것이므로 여기서 종료 처리 (대표 작업은 stage_worker가 처리)
+            for extra in batch[1:]:
+                if not isinstance(e, asyncio.CancelledError):
+                    self.stage_stats['transcribe']['failed'] += 1
+                    self.report_error(extra, f"❌ 처리 오류: {e}")
+                self.finish(extra)
+                self.queues['transcribe'].task_done()
+            raise
+
+        for handled in batch:
+            if handled['processor'].archive and handled.get('wav') is not None:
+                handled['archive_audio'] = memoryview(handled['wav'])[44:]
+            handled['wav'] = None
+            handled['pcm'] = None
+        job['extra_jobs'] = batch[1:]
+        return True
+
+    def collect_pack(self, job):
+        """이미 대기 중인 짧은 발화를 묶음으로 꺼내 반환
+
+        묶을 수 없는 작업(긴 녹음, 다른 프로세서, 취소됨)을 만나면 큐에 되돌려 일반 경로로 처리되게 합니다.
+        """
+        if not self.packer or not self.packer.is_packable(job['pcm']):
+            return [job]
+        batch = [job]
+        total = self.packer.duration(job['pcm'])
+        queue = self.queues['transcribe']
+        limit = self.packer.max_utterances
+        quality = job['processor'].quality
+        if quality:
+            # 네트워크가 느리면 묶음 크기를 줄여 결과까지의 시간을 목표 안으로
+            limit = quality.batch_size(limit, total)
+        while len(batch) < limit and not queue.empty():
+            candidate = queue.get_nowait()
+            duration = self.packer.duration(candidate['pcm']) if candidate.get('pcm') else None
+            if (candidate['processor'] is not job['processor'] or candidate['cancelled'] or duration is None
+                    or not self.packer.is_packable(candidate['pcm'])
+                    or total + duration + self.packer.separator_seconds > self.packer.max_pack_seconds):
+                # 방금 한 자리를 비웠으므로 바로 되돌릴 수 있음 (꺼낸 것은 완료 처리, 되돌린 것은 새로 집계)
+                queue.put_nowait(candidate)
+                queue.task_done()
+                break
+            batch.append(candidate)
+            total += duration + self.packer.separator_seconds
+        return batch
+
+    async def run_sheet(self, job):
+        """결과 전달 (GUI 표시 및 시트 입력은 sink에서 수행)"""
+        text, confidence = job['result']
+        target = await self.loop.run_in_executor(None, job['sink'], text, confidence)
+        # 원본 보관은 보관소 스레드에서 (인식/입력 지연에 영향 없음)
+        audio = job.pop('archive_audio', None)
+        if audio is not None:
+            processor = job['processor']
+            processor.archive.submit(audio, text, confidence, target if isinstance(target, dict) else None,
+                                     processor.RATE, processor.CHANNELS)
+        if not job['future'].done():
+            job['future'].set_result(job['result'])
+        return True
+
+    def report_error(self, job, message):
+        """작업 오류 전달"""
+        print(message)
+        if job.get('on_error'):
+            try:
+                job['on_error'](message)
+            except Exception as e:
+                print(f"오류 콜백 실행 실패: {e}")
+
+    def track_order(self, job):
+        bisect.insort(self.order.setdefault(job.get('stream', job['processor']), []), job['id'])
+
+    def forget_order(self, job):
+        """sheet 단계에 가지 못하고 끝난 작업을 순서에서 빼고, 뒤에서 기다리던 결과를 넘김"""
+        ids = self.order.get(job.get('stream', job['processor']))
+        if ids and job['id'] in ids:
+            ids.remove(job['id'])
+        self.parked.pop(job['id'], None)
+        self.release_in_order()
+
+    def release_in_order(self):
+        """앞선 작업이 모두 넘어갔거나 끝난 결과를 제출 순서대로 sheet 큐에 넣음 (큐가 차면 자리가 날 때)"""
+        queue = self.queues['sheet']
+        for stream, ids in list(self.order.items()):
+            while ids and ids[0] in self.parked and not queue.full():
+                queue.put_nowait(self.parked.pop(ids.pop(0)))
+            if not ids:
+                del self.order[stream]
+
+    def finish(self, job):
+        """작업 종료 처리"""
+        self.jobs.pop(job['id'], None)
+        self.forget_order(job)
+        spool = job.pop('spool', None)
+        if spool:
+            spool.close()
+        audio = job.pop('archive_audio', None)
+        if hasattr(audio, 'close'):
+            audio.close()
+        if not job['future'].done():
+            job['future'].cancel()
+
+    def get_stats(self):
+        """단계별 큐 길이와 처리 통계"""
+        stats = {}
+        for stage in STAGES:
+            stats[stage] = dict(self.stage_stats[stage])
+            stats[stage]['queued'] = self.queues[stage].qsize() if stage in self.queues else 0
+            stats[stage]['concurrency'] = self.concurrency[stage]
+        stats['in_flight'] = len(self.jobs)
+        return stats
+
+    def stop(self, timeout=10):
+        """새 작업을 받지 않고, 남은 작업을 timeout까지 처리한 뒤 작업자 취소 및 종료"""
+        if not self.loop:
+            return
+        self.accepting = False
+
+        async def drain():
+            for stage in STAGES:
+                await self.queues[stage].join()
+
+        async def shutdown():
+            try:
+                await asyncio.wait_for(drain(), timeout)
+            except asyncio.TimeoutError:
+                print("⚠️ 처리 엔진 종료 대기 시간 초과 - 남은 작업 취소")
+            for task in self.tasks:
+                task.cancel()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+            # 취소로 sheet 단계에 가지 못한 결과 정리
+            parked = list(self.parked.values())
+            self.parked.clear()
+            self.order.clear()
+            for job in parked:
+                self.finish(job)
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout + 5)
+        except Exception as e:
+            print(f"처리 엔진 종료 오류: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join(5)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.loop.close()
+        self.loop = None
+        self.tasks = []
+        print("⚙️ 처리 엔진 종료")
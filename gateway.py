@@ -0,0 +1,434 @@
+import argparse
+import base64
+import hashlib
+import json
+import re
+import struct
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_PAYLOAD_BYTES = 32 * 1024 * 1024  # 오디오 한 건 최대 크기 (Cloud Run 요청 한도와 같음)
+WS_CLOSE_TOO_BIG = 1009
+
+def unmask(payload, mask):
+    """WebSocket 클라이언트 프레임 마스크 해제 (바이트별 반복 대신 정수 XOR 한 번)"""
+    length = len(payload)
+    if not length:
+        return b''
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+
+def next_cell_address(cell):
+    """같은 열의 다음 행 셀 주소 반환 (A1 -> A2)"""
+    match = re.match(r'([A-Z]+)(\d+)', cell)
+    if not match:
+        return cell
+    return f"{match.group(1)}{int(match.group(2)) + 1}"
+
+def percentile(values, ratio):
+    """정렬되지 않은 값 목록의 백분위수 계산"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(ratio * (len(ordered) - 1))))
+    return ordered[index]
+
+class ClientStats:
+    def __init__(self, window_seconds=60):
+        """클라이언트별 처리량/지연시간 통계"""
+        self.window_seconds = window_seconds
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.audio_bytes = 0
+        self.inflight = 0
+        self.latencies = deque(maxlen=1000)  # 최근 처리 시간(초)
+        self.completed_at = deque()  # 처리량 계산용 완료 시각
+        self.lock = threading.Lock()
+
+    def try_begin(self, audio_size, max_inflight):
+        """동시 처리 한도 내이면 요청 시작 기록 후 True, 한도 초과면 False"""
+        with self.lock:
+            if self.inflight >= max_inflight:
+                self.rejected += 1
+                return False
+            self.requests += 1
+            self.inflight += 1
+            self.audio_bytes += audio_size
+            return True
+
+    def finish(self, latency, success):
+        """요청 완료 기록"""
+        now = time.time()
+        with self.lock:
+            self.inflight -= 1
+            self.latencies.append(latency)
+            self.completed_at.append(now)
+            if not success:
+                self.errors += 1
+            while self.completed_at and self.completed_at[0] < now - self.window_seconds:
+                self.completed_at.popleft()
+
+    def snapshot(self):
+        """현재 통계를 딕셔너리로 반환"""
+        with self.lock:
+            latencies = list(self.latencies)
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'rejected': self.rejected,
+                'inflight': self.inflight,
+                'audio_bytes': self.audio_bytes,
+                'throughput_per_min': len(self.completed_at) * 60.0 / self.window_seconds,
+                'latency_p50_ms': percentile(latencies, 0.50) * 1000,
+                'latency_p95_ms': percentile(latencies, 0.95) * 1000,
+                'latency_max_ms': max(latencies) * 1000 if latencies else 0.0
+            }
+
+class TranscriptionGateway:
+    def __init__(self, settings_manager, voice_processor, sheet_writer, max_concurrent=8, cursor_save_seconds=10.0):
+        """여러 녹음 스테이션의 오디오를 받아 공유 인식/시트 작성기로 처리하는 게이트웨이
+
+        클라이언트별 다음 셀 위치는 메모리에서 관리하고 cursor_save_seconds마다(바뀐 경우만)와 종료 시
+        설정 파일에 저장합니다."""
+        self.settings_manager = settings_manager
+        self.voice_processor = voice_processor
+        self.sheet_writer = sheet_writer
+        self.transcribe_slots = threading.BoundedSemaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+
+        self.client_stats = {}
+        self.cursor_lock = threading.Lock()
+        self.cursors = {}  # 클라이언트 ID -> 다음 셀 주소
+        self.cursors_dirty = False
+        self.started_at = time.time()
+
+        self.stop_event = threading.Event()
+        self.cursor_saver = threading.Thread(target=self.save_loop, args=(cursor_save_seconds,), daemon=True,
+                                             name="gateway-cursors")
+        self.cursor_saver.start()
+
+    def get_client_config(self, client_id):
+        """설정 파일에 등록된 클라이언트 설정 반환 (미등록이면 None)"""
+        clients = self.settings_manager.get_setting("gateway_clients", {})
+        return clients.get(client_id)
+
+    def get_stats(self, client_id):
+        """클라이언트 통계 객체 가져오기"""
+        with self.cursor_lock:
+            if client_id not in self.client_stats:
+                self.client_stats[client_id] = ClientStats()
+            return self.client_stats[client_id]
+
+    def reserve_cell(self, client_id):
+        """클라이언트의 현재 셀을 반환하고 커서를 다음 행으로 이동 (설정 파일 저장은 save_cursors에서)"""
+        with self.cursor_lock:
+            config = self.get_client_config(client_id)
+            cell = self.cursors.get(client_id) or config.get("cell", "A1").strip().upper()
+            allocator = self.sheet_writer.sheet_handler.allocator
+            if allocator:
+                # 다른 PC/게이트웨이와 같은 시트를 쓰면 겹치지 않는 행을 받음
+                cell = allocator.next_cell(config["spreadsheet"], config["sheet"], cell)
+            self.cursors[client_id] = next_cell_address(cell)
+            self.cursors_dirty = True
+            return cell
+
+    def save_cursors(self):
+        """바뀐 셀 위치를 설정 파일의 gateway_clients에 저장"""
+        with self.cursor_lock:
+            if not self.cursors_dirty:
+                return
+            cursors = dict(self.cursors)
+            self.cursors_dirty = False
+        try:
+            clients = self.settings_manager.get_setting("gateway_clients", {})
+            for client_id, cell in cursors.items():
+                if client_id in clients:
+                    clients[client_id]["cell"] = cell
+            self.settings_manager.set_setting("gateway_clients", clients)
+        except Exception as e:
+            print(f"⚠️ 게이트웨이 셀 위치 저장 실패: {e}")
+            with self.cursor_lock:
+                self.cursors_dirty = True
+
+    def save_loop(self, interval):
+        while not self.stop_event.wait(interval):
+            self.save_cursors()
+
+    def close(self):
+        """주기 저장 중지 후 마지막 셀 위치 저장"""
+        self.stop_event.set()
+        self.save_cursors()
+
+    def process_audio(self, client_id, audio_data):
+        """오디오 한 건 처리: 인식 후 클라이언트 대상 셀로 일괄 작성기에 전달"""
+        config = self.get_client_config(client_id)
+        if config is None:
+            return 403, {'success': False, 'error': f'등록되지 않은 클라이언트: {client_id}'}
+
+        stats = self.get_stats(client_id)
+        if not stats.try_begin(len(audio_data), config.get("max_inflight", 2)):
+            return 429, {'success': False, 'error': '클라이언트 동시 처리 한도 초과'}
+
+        started = time.time()
+        success = False
+        try:
+            with self.transcribe_slots:
+                text, confidence, success = self.voice_processor.transcribe(audio_data)
+
+            cell = None
+            if success and text:
+                cell = self.reserve_cell(client_id)
+                self.sheet_writer.enqueue(config["spreadsheet"], config["sheet"], cell, text, confidence)
+
+            return 200, {
+                'success': success,
+                'transcript': text,
+                'confidence': confidence,
+                'spreadsheet': config["spreadsheet"],
+                'sheet': config["sheet"],
+                'cell': cell,
+                'latency_ms': (time.time() - started) * 1000
+            }
+        except Exception as e:
+            print(f"❌ 게이트웨이 처리 오류 ({client_id}): {e}")
+            return 500, {'success': False, 'error': str(e)}
+        finally:
+            stats.finish(time.time() - started, success)
+
+    def get_all_stats(self):
+        """전체 및 클라이언트별 통계"""
+        with self.cursor_lock:
+            clients = dict(self.client_stats)
+        per_client = {client_id: stats.snapshot() for client_id, stats in clients.items()}
+        return {
+            'uptime_seconds': time.time() - self.started_at,
+            'max_concurrent': self.max_concurrent,
+            'total_requests': sum(s['requests'] for s in per_client.values()),
+            'total_errors': sum(s['errors'] for s in per_client.values()),
+            'throughput_per_min': sum(s['throughput_per_min'] for s in per_client.values()),
+            'sheet_writer': self.sheet_writer.get_stats(),
+            'sheets_quota': self.sheet_writer.sheet_handler.quota.get_status(),
+            'sheet_mirrors': self.sheet_writer.sheet_handler.mirror.get_stats() if self.sheet_writer.sheet_handler.mirror else None,
+            'recognition_backends': self.voice_processor.router.get_stats(),
+            'recognition_connections': self.voice_processor.connections.get_status(),
+            'upload_quality': self.voice_processor.quality.get_stats() if self.voice_processor.quality else None,
+            'stt_usage': self.voice_processor.usage.get_summary() if self.voice_processor.usage else None,
+            'clients': per_client
+        }
+
+class GatewayRequestHandler(BaseHTTPRequestHandler):
+    """게이트웨이 HTTP/WebSocket 요청 처리기"""
+    protocol_version = "HTTP/1.1"
+    gateway = None
+    max_payload = MAX_PAYLOAD_BYTES
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def parse_client_path(self, suffix):
+        """/clients/<id>/<suffix> 경로에서 클라이언트 ID 추출"""
+        match = re.match(rf'^/clients/([^/]+)/{suffix}$', urlparse(self.path).path)
+        return match.group(1) if match else None
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self.send_json(200, {'status': 'ok'})
+        elif path == "/stats":
+            self.send_json(200, self.gateway.get_all_stats())
+        else:
+            client_id = self.parse_client_path("ws")
+            if client_id and self.headers.get("Upgrade", "").lower() == "websocket":
+                self.handle_websocket(client_id)
+            else:
+                self.send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        client_id = self.parse_client_path("audio")
+        if not client_id:
+            self.send_json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self.send_json(400, {'error': 'Content-Length 오류'})
+            return
+        if length > self.max_payload:
+            # 본문을 읽지 않고 거절 (연결은 닫음)
+            self.close_connection = True
+            self.send_json(413, {'error': f'오디오가 너무 큽니다 (최대 {self.max_payload // (1024 * 1024)}MB)'})
+            return
+        audio_data = self.rfile.read(length)
+        status, payload = self.gateway.process_audio(client_id, audio_data)
+        self.send_json(status, payload)
+
+    def handle_websocket(self, client_id):
+        """WebSocket 연결: 바이너리 메시지 하나가 WAV 한 건, 결과는 텍스트 메시지로 응답"""
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        print(f"🔌 WebSocket 연결: {client_id}")
+
+        try:
+            while True:
+                opcode, payload = self.read_ws_message()
+                if opcode is None or opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    self.write_ws_frame(0xA, payload)
+                elif opcode == 0x2:
+                    status, result = self.gateway.process_audio(client_id, payload)
+                    result['status'] = status
+                    self.write_ws_frame(0x1, json.dumps(result, ensure_ascii=False).encode('utf-8'))
+        except (ConnectionError, OSError) as e:
+            print(f"WebSocket 연결 종료 ({client_id}): {e}")
+        finally:
+            self.close_connection = True
+
+    def read_ws_message(self):
+        """조각난 프레임을 합쳐 메시지 하나 읽기 (최대 크기를 넘으면 1009로 닫고 None)"""
+        chunks = []
+        received = 0
+        message_opcode = None
+        while True:
+            header = self.rfile.read(2)
+            if len(header) < 2:
+                return None, b''
+            fin = header[0] & 0x80
+            opcode = header[0] & 0x0F
+            masked = header[1] & 0x80
+            length = header[1] & 0x7F
+            if length == 126:
+                length = struct.unpack(">H", self.rfile.read(2))[0]
+            elif length == 127:
+                length = struct.unpack(">Q", self.rfile.read(8))[0]
+            received += length
+            if received > self.max_payload:
+                self.write_ws_frame(0x8, struct.pack(">H", WS_CLOSE_TOO_BIG) + b"message too big")
+                return None, b''
+            mask = self.rfile.read(4) if masked else b''
+            payload = self.rfile.read(length)
+            if masked:
+                payload = unmask(payload, mask)
+
+            # 제어 프레임은 조각 중간에도 올 수 있음
+            if opcode >= 0x8:
+                return opcode, payload
+            if opcode != 0x0:
+                message_opcode = opcode
+            chunks.append(payload)
+            if fin:
+                return message_opcode, b''.join(chunks)
+
+    def write_ws_frame(self, opcode, payload):
+        """마스크 없는 서버 프레임 전송"""
+        header = bytearray([0x80 | opcode])
+        if len(payload) < 126:
+            header.append(len(payload))
+        elif len(payload) < 65536:
+            header.append(126)
+            header += struct.pack(">H", len(payload))
+        else:
+            header.append(127)
+            header += struct.pack(">Q", len(payload))
+        self.wfile.write(bytes(header) + payload)
+        self.wfile.flush()
+
+def build_gateway(settings_manager, max_concurrent=8, sheet_handler=None):
+    """설정을 반영한 인식 프로세서/시트 작성기로 게이트웨이 구성 (sheet_handler를 주면 해당 핸들러 사용)"""
+    from main import GoogleSheetHandler
+    from speechtext import SimpleVoiceProcessor
+    from sheet_writer import SheetBatchWriter
+    from billing import UsageAccountant
+
+    voice_processor = SimpleVoiceProcessor(pool_size=max_concurrent)
+    # 인식 서버 목록/연결 몫, 버킷 업로드, 업로드 품질 조절 등 설정 반영
+    voice_processor.set_settings_manager(settings_manager)
+    voice_processor.set_usage_accountant(UsageAccountant(settings_manager))
+    if sheet_handler is None:
+        sheet_handler = GoogleSheetHandler(settings_manager)
+    sheet_writer = SheetBatchWriter(sheet_handler)
+    return TranscriptionGateway(settings_manager, voice_processor, sheet_writer, max_concurrent)
+
+def serve(host="0.0.0.0", port=8765, max_concurrent=8):
+    """게이트웨이 서비스 실행"""
+    from main import SettingsManager
+
+    settings_manager = SettingsManager()
+    gateway = build_gateway(settings_manager, max_concurrent)
+    voice_processor = gateway.voice_processor
+    sheet_writer = gateway.sheet_writer
+    sheet_handler = sheet_writer.sheet_handler
+    GatewayRequestHandler.gateway = gateway
+    server = ThreadingHTTPServer((host, port), GatewayRequestHandler)
+    server.daemon_threads = True
+
+    clients = settings_manager.get_setting("gateway_clients", {})
+    print(f"🌐 게이트웨이 시작: http://{host}:{port} (등록 클라이언트 {len(clients)}개)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("게이트웨이 종료 중...")
+    finally:
+        server.server_close()
+        gateway.close()
+        sheet_writer.close()
+        if sheet_handler.mirror:
+            sheet_handler.mirror.close()
+        if sheet_handler.allocator:
+            sheet_handler.allocator.close()
+        if voice_processor.usage:
+            voice_processor.usage.close()
+
+def send(url, client_id, wav_file):
+    """씬 클라이언트: WAV 파일 한 건을 게이트웨이로 전송"""
+    import requests
+    with open(wav_file, 'rb') as f:
+        response = requests.post(f"{url}/clients/{client_id}/audio", data=f.read(), timeout=90)
+    print(f"응답 상태 코드: {response.status_code}")
+    print(f"응답 내용: {response.text}")
+
+def main():
+    """게이트웨이 명령행 진입점"""
+    parser = argparse.ArgumentParser(description="다중 스테이션 음성 인식 게이트웨이")
+    sub = parser.add_subparsers(dest="command")
+
+    serve_parser = sub.add_parser("serve", help="게이트웨이 서비스 실행")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--max-concurrent", type=int, default=8)
+
+    send_parser = sub.add_parser("send", help="WAV 파일을 게이트웨이로 전송")
+    send_parser.add_argument("client_id")
+    send_parser.add_argument("wav_file")
+    send_parser.add_argument("--url", default="http://127.0.0.1:8765")
+
+    args = parser.parse_args()
+    if args.command == "send":
+        send(args.url, args.client_id, args.wav_file)
+    else:
+        serve(getattr(args, "host", "0.0.0.0"), getattr(args, "port", 8765),
+              getattr(args, "max_concurrent", 8))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+import gspread
+import requests
+from google.oauth2.service_account import Credentials
+from google.auth.transport.requests import AuthorizedSession, Request
+
+SERVICE_ACCOUNT_FILE = "voicetext-472910-82f1fa0a8fbe.json"
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+
+class TokenCache:
+    def __init__(self, path, secret):
+        """액세스 토큰을 암호화해 디스크에 보관하는 캐시
+
+        키는 서비스 계정 비공개 키에서 유도하므로 키 파일이 없는 곳에서는 읽을 수 없습니다.
+        암호화는 HMAC-SHA256 키스트림, 무결성은 HMAC 태그로 확인합니다 (표준 라이브러리만 사용).
+        """
+        self.path = path
+        derived = hashlib.pbkdf2_hmac('sha256', secret, b'voicetext-token-cache', 100000, dklen=64)
+        self.encryption_key = derived[:32]
+        self.mac_key = derived[32:]
+
+    def keystream(self, nonce, length):
+        blocks = []
+        for counter in range((length + 31) // 32):
+            blocks.append(hmac.new(self.encryption_key, nonce + counter.to_bytes(8, 'big'), hashlib.sha256).digest())
+        return b''.join(blocks)[:length]
+
+    def save(self, token, expiry_timestamp):
+        """토큰 저장 (임시 파일에 쓴 뒤 교체, 소유자만 읽기 가능)"""
+        try:
+            plain = json.dumps({'token': token, 'expiry': expiry_timestamp}).encode('utf-8')
+            nonce = os.urandom(16)
+            cipher = bytes(a ^ b for a, b in zip(plain, self.keystream(nonce, len(plain))))
+            tag = hmac.new(self.mac_key, nonce + cipher, hashlib.sha256).digest()
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(nonce + tag + cipher)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ 토큰 캐시 저장 실패: {e}")
+
+    def load(self):
+        """(토큰, 만료 시각) 반환, 없거나 손상/변조되었으면 None"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        nonce, tag, cipher = data[:16], data[16:48], data[48:]
+        expected = hmac.new(self.mac_key, nonce + cipher, hashlib.sha256).digest()
+        if len(tag) < 32 or not hmac.compare_digest(tag, expected):
+            print("⚠️ 토큰 캐시가 손상되었거나 다른 키로 만들어져 무시합니다")
+            return None
+        plain = bytes(a ^ b for a, b in zip(cipher, self.keystream(nonce, len(cipher))))
+        cached = json.loads(plain.decode('utf-8'))
+        return cached['token'], cached['expiry']
+
+class GoogleAuthClient:
+    def __init__(self, key_file=SERVICE_ACCOUNT_FILE, cache_file="token_cache.bin",
+                 refresh_margin=300, pool_size=10):
+        """프로세스 전체가 공유하는 구글 인증 클라이언트
+
+        토큰은 암호화된 파일에 보관해 재시작 시 재사용하고, 만료 refresh_margin초 전에
+        백그라운드에서 갱신하여 저장 경로에서 동기 갱신이 일어나지 않게 합니다.
+        gspread와 드라이브 호출은 연결 풀을 둔 하나의 세션을 함께 사용합니다.
+        """
+        self.refresh_margin = refresh_margin
+        self.credentials = Credentials.from_service_account_file(key_file, scopes=SCOPES)
+        with open(key_file, 'r', encoding='utf-8') as f:
+            secret = json.load(f)['private_key'].encode('utf-8')
+        self.cache = TokenCache(cache_file, secret)
+        self.refresh_lock = threading.Lock()
+        self.token_request = Request(requests.Session())
+
+        # 통계
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.cache_hit = self.load_cached_token()
+
+        self.session = AuthorizedSession(self.credentials)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.gc = gspread.Client(auth=self.credentials, session=self.session)
+
+        self.running = True
+        self.wakeup = threading.Event()
+        self.refresher = threading.Thread(target=self.refresh_loop, daemon=True, name="token-refresher")
+        self.refresher.start()
+
+        try:
+            print(f"🔑 서비스 계정: {self.credentials.service_account_email}")
+        except Exception as e:
+            print(f"⚠️ 서비스 계정 정보 확인 실패: {e}")
+
+    @classmethod
+    def from_settings(cls, settings_manager):
+        """app_settings.json의 google_auth 항목으로 생성"""
+        config = settings_manager.get_setting("google_auth", {}) if settings_manager else {}
+        return cls(key_file=config.get("key_file", SERVICE_ACCOUNT_FILE),
+                   cache_file=config.get("cache_file", "token_cache.bin"),
+                   refresh_margin=config.get("refresh_margin_seconds", 300),
+                   pool_size=config.get("pool_size", 10))
+
+    def load_cached_token(self):
+        """캐시된 토큰이 충분히 남아 있으면 인증 정보에 적용"""
+        try:
+            cached = self.cache.load()
+        except Exception as e:
+            print(f"⚠️ 토큰 캐시 읽기 실패: {e}")
+            return False
+        if not cached or cached[1] - time.time() <= self.refresh_margin:
+            return False
+        self.credentials.token = cached[0]
+        # google-auth는 만료 시각을 시간대 없는 UTC로 다룸
+        self.credentials.expiry = datetime.fromtimestamp(cached[1], timezone.utc).replace(tzinfo=None)
+        print(f"✅ 캐시된 액세스 토큰 사용 (남은 시간 {int(cached[1] - time.time())}초)")
+        return True
+
+    def seconds_until_expiry(self):
+        if not self.credentials.token or not self.credentials.expiry:
+            return 0.0
+        return self.credentials.expiry.replace(tzinfo=timezone.utc).timestamp() - time.time()
+
+    def ensure_token(self):
+        """만료가 가까우면 갱신 후 캐시에 저장"""
+        with self.refresh_lock:
+            if self.seconds_until_expiry() > self.refresh_margin:
+                return
+            self.credentials.refresh(self.token_request)
+            self.refreshes += 1
+            expiry = self.credentials.expiry.replace(tzinfo=timezone.utc).timestamp()
+            self.cache.save(self.credentials.token, expiry)
+            print(f"🔑 액세스 토큰 갱신 (만료까지 {int(expiry - time.time())}초)")
+
+    def refresh_loop(self):
+        """만료 refresh_margin초 전에 깨어나 토큰 갱신"""
+        while self.running:
+            try:
+                self.ensure_token()
+                wait = max(5.0, self.seconds_until_expiry() - self.refresh_margin)
+            except Exception as e:
+                self.refresh_errors += 1
+                print(f"⚠️ 액세스 토큰 갱신 실패 (30초 후 재시도): {e}")
+                wait = 30.0
+            self.wakeup.wait(wait)
+
+    def get_stats(self):
+        return {
+            'expires_in_seconds': int(self.seconds_until_expiry()),
+            'cache_hit': self.cache_hit,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors
+        }
+
+    def close(self):
+        self.running = False
+        self.wakeup.set()
+        self.session.close()
+
+shared_client = None
+shared_lock = threading.Lock()
+
+def get_shared_client(settings_manager=None):
+    """프로세스 공용 인증 클라이언트 반환 (처음 호출할 때 생성)"""
+    global shared_client
+    with shared_lock:
+        if shared_client is None:
+            shared_client = GoogleAuthClient.from_settings(settings_manager)
+        return shared_client
@@ -1,7 +1,12 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext
+from tkinter import ttk, messagebox
+import queue
 import threading
-import time
+import concurrent.futures
+from profiler import ProfilingControls
+from history_view import HistoryView
+
+CELL_SAVE_SECONDS = 10  # 마지막 입력 셀을 설정 파일에 저장하는 주기 (발화마다 쓰지 않음)
 
 class SimpleVoiceGUI:
     def __init__(self, root):
@@ -12,7 +17,6 @@ class SimpleVoiceGUI:
         
         # 상태 변수
         self.is_recording = False
-        self.recording_thread = None
         self.voice_processor = None
         self.sheet_handler = None
         self.settings_manager = None
@@ -21,21 +25,51 @@ class SimpleVoiceGUI:
         self.current_row = 1
         self.current_col = 1
         
+        # 네트워크 작업은 작업 스레드에서, 결과 반영은 UI 스레드에서
+        self.background = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="gui-load")
+        self.ui_queue = queue.Queue()
+        self.load_generation = {}
+        self.loading = {}
+        self.spinner_index = 0
+        self.spinner_after_id = None
+        
+        # 마지막 입력 셀은 메모리에 두고 주기적으로(또는 종료 시) 저장
+        self.cell_lock = threading.Lock()
+        self.unsaved_cell = None
+        
         # GUI 구성 요소 생성
         self.setup_gui()
+        self.root.after(50, self.poll_ui_queue)
+        self.root.after(CELL_SAVE_SECONDS * 1000, self.cell_save_loop)
         
         # 버튼 스타일 설정 (폰트 검정색)
         self.setup_styles()
         
-        # 녹음 상태 표시를 위한 깜빡임 스레드
-        self.blink_thread = None
+        # 녹음 상태 표시를 위한 깜빡임 효과
         self.blink_active = False
+        self.blink_on = True
+        self.blink_after_id = None
         
         # 타이머 관련 변수
-        self.timer_thread = None
         self.timer_active = False
+        self.timer_after_id = None
+        self.elapsed_mode = False
         self.remaining_seconds = 15
         
+        # 지원용 숨김 메뉴 (Ctrl+Shift+P): 실행 중 프로파일링
+        self.profiler = None
+        self.profile_menu = tk.Menu(self.root, tearoff=0)
+        self.profile_menu.add_command(label="CPU 프로파일링 시작", command=lambda: self.run_profile_command("cpu start"))
+        self.profile_menu.add_command(label="CPU 프로파일링 중지/저장", command=lambda: self.run_profile_command("cpu stop"))
+        self.profile_menu.add_separator()
+        self.profile_menu.add_command(label="메모리 스냅샷", command=lambda: self.run_profile_command("mem snap"))
+        self.profile_menu.add_command(label="메모리 추적 종료", command=lambda: self.run_profile_command("mem stop"))
+        self.profile_menu.add_separator()
+        self.profile_menu.add_command(label="상태 보기", command=lambda: self.run_profile_command("status"))
+        self.profile_menu.add_separator()
+        self.profile_menu.add_command(label="오디오 장치 보정", command=self.calibrate_audio)
+        self.root.bind("<Control-Shift-P>", self.show_profile_menu)
+        
     def setup_gui(self):
         """GUI 구성 요소 설정"""
         # 메인 프레임
@@ -97,6 +131,16 @@ class SimpleVoiceGUI:
         auto_detect_button = ttk.Button(spreadsheet_frame, text="자동 감지", command=self.auto_detect_spreadsheet)
         auto_detect_button.grid(row=0, column=3, padx=(5, 0))
         
+        # 로딩 표시
+        self.spreadsheet_spinner = ttk.Label(spreadsheet_frame, text="", width=2, foreground="blue")
+        self.spreadsheet_spinner.grid(row=0, column=4, padx=(5, 0))
+        
+        # 고객 프로필 선택 (profiles 설정이 있을 때만 표시)
+        self.profile_label = ttk.Label(spreadsheet_frame, text="프로필:")
+        self.profile_var = tk.StringVar()
+        self.profile_combo = ttk.Combobox(spreadsheet_frame, textvariable=self.profile_var, width=25, state="readonly")
+        self.profile_combo.bind("<<ComboboxSelected>>", self.on_profile_selected)
+        
         # 시트 선택 프레임
         sheet_frame = ttk.LabelFrame(main_frame, text="시트 선택", padding="5")
         sheet_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
@@ -112,10 +156,23 @@ class SimpleVoiceGUI:
         refresh_button = ttk.Button(sheet_frame, text="새로고침", command=self.refresh_sheets)
         refresh_button.grid(row=0, column=2)
         
-        # 스크롤 가능한 텍스트 위젯 (기존 크기로 복원)
-        self.text_area = scrolledtext.ScrolledText(text_frame, height=8, width=50,
-                                                  font=("Arial", 10), wrap=tk.WORD)
-        self.text_area.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # 로딩 표시
+        self.sheet_spinner = ttk.Label(sheet_frame, text="", width=2, foreground="blue")
+        self.sheet_spinner.grid(row=0, column=3, padx=(5, 0))
+        
+        # 인식 기록 목록 (최근 기록만 메모리에 두고 보이는 행만 그림)
+        self.history_view = HistoryView(text_frame, visible_rows=8, font=("Arial", 10))
+        self.history_view.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # 기록 검색 (로컬 저장소에서 검색, 네트워크 사용 없음)
+        search_frame = ttk.Frame(text_frame)
+        search_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
+        search_entry.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+        search_entry.bind("<Return>", lambda event: self.search_history())
+        ttk.Button(search_frame, text="기록 검색", command=self.search_history).grid(row=0, column=1)
+        search_frame.columnconfigure(0, weight=1)
         
         # 셀 주소 입력 프레임 (아래쪽에 배치)
         cell_input_frame = ttk.LabelFrame(main_frame, text="셀 주소 입력", padding="5")
@@ -133,6 +190,10 @@ class SimpleVoiceGUI:
                                           font=("Arial", 10, "bold"), foreground="blue")
         self.current_cell_label.grid(row=0, column=3)
         
+        # API 할당량 잔여 표시
+        self.quota_label = ttk.Label(main_frame, text="", font=("Arial", 8), foreground="gray")
+        self.quota_label.grid(row=8, column=0, columnspan=2, sticky=tk.W)
+        
         # 그리드 가중치 설정
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
@@ -161,15 +222,57 @@ class SimpleVoiceGUI:
     def set_sheet_handler(self, sheet_handler):
         """스프레드시트 핸들러 설정"""
         self.sheet_handler = sheet_handler
+        # API 할당량 표시 시작
+        self.update_quota_label()
         # 스프레드시트 목록 초기화
         self.refresh_spreadsheets()
         # 시트 목록 초기화
         self.refresh_sheets()
     
+    def set_history_store(self, history_store):
+        """인식 기록 저장소 설정"""
+        self.history_view.set_store(history_store)
+    
+    def search_history(self):
+        """로컬 기록에서 검색해 결과 창 표시"""
+        query = self.search_var.get().strip()
+        store = self.history_view.store
+        if not query or not store:
+            return
+        results = store.search(query, limit=200)
+        
+        window = tk.Toplevel(self.root)
+        window.title(f"기록 검색: {query} ({len(results)}건)")
+        listbox = tk.Listbox(window, width=80, height=20, font=("Arial", 10))
+        scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=listbox.yview)
+        listbox.configure(yscrollcommand=scrollbar.set)
+        listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(0, weight=1)
+        for record in results:
+            place = f"{record['spreadsheet']}/{record['sheet']}!{record['cell']}" if record['cell'] else ""
+            listbox.insert(tk.END, f"{self.history_view.format_record(record)}  {place}".rstrip())
+        if not results:
+            listbox.insert(tk.END, "검색 결과가 없습니다")
+        
+        def copy_selected(event):
+            selection = listbox.curselection()
+            if selection and results:
+                window.clipboard_clear()
+                window.clipboard_append(results[selection[0]]['text'])
+        listbox.bind("<Double-Button-1>", copy_selected)
+    
     def set_settings_manager(self, settings_manager):
         """설정 관리자 설정"""
         self.settings_manager = settings_manager
         print(f"✅ settings_manager 설정 완료: {settings_manager is not None}")
+        profiles = settings_manager.get_profiles() if settings_manager else []
+        if profiles:
+            self.profile_combo['values'] = profiles
+            self.profile_var.set(settings_manager.active_profile or "")
+            self.profile_label.grid(row=1, column=0, padx=(0, 5), pady=(5, 0))
+            self.profile_combo.grid(row=1, column=1, padx=(0, 10), pady=(5, 0))
         # 설정값 복원을 위해 refresh_sheets 호출
         if self.sheet_handler:
             self.refresh_sheets()
@@ -216,88 +319,208 @@ class SimpleVoiceGUI:
             self.reset_buttons()
             
     def start_blinking(self):
-        """깜빡임 효과 시작"""
+        """깜빡임 효과 시작 (Tk 타이머 사용, 별도 스레드 없음)"""
+        self.stop_blinking()
         self.blink_active = True
-        self.blink_thread = threading.Thread(target=self.blink_effect, daemon=True)
-        self.blink_thread.start()
+        self.blink_on = True
+        self.blink_effect()
         
     def stop_blinking(self):
         """깜빡임 효과 중지"""
         self.blink_active = False
+        if self.blink_after_id:
+            self.root.after_cancel(self.blink_after_id)
+            self.blink_after_id = None
         
     def start_timer(self):
-        """타이머 시작"""
+        """타이머 시작 (Tk 타이머 사용, 별도 스레드 없음)"""
+        self.stop_timer()
         self.timer_active = True
-        self.remaining_seconds = 15
-        self.timer_thread = threading.Thread(target=self.timer_countdown, daemon=True)
-        self.timer_thread.start()
+        # 최대 녹음 시간이 없으면(무제한 녹음) 경과 시간 표시
+        limit = self.voice_processor.RECORD_SECONDS if self.voice_processor else 15
+        self.elapsed_mode = not limit
+        self.remaining_seconds = limit or 0
+        self.timer_countdown()
         
     def stop_timer(self):
         """타이머 중지"""
         self.timer_active = False
+        if self.timer_after_id:
+            self.root.after_cancel(self.timer_after_id)
+            self.timer_after_id = None
         self.timer_label.config(text="")
         
     def timer_countdown(self):
-        """타이머 카운트다운"""
-        while self.timer_active and self.remaining_seconds > 0:
+        """타이머 카운트다운 (1초마다 다시 예약)"""
+        if not self.timer_active:
+            return
+        if self.elapsed_mode:
+            minutes, seconds = divmod(self.remaining_seconds, 60)
+            self.timer_label.config(text=f"⏱️ 녹음 시간: {minutes:02d}:{seconds:02d}")
+            self.remaining_seconds += 1
+            self.timer_after_id = self.root.after(1000, self.timer_countdown)
+        elif self.remaining_seconds > 0:
             self.timer_label.config(text=f"⏱️ 남은 시간: {self.remaining_seconds}초")
-            time.sleep(1)
-            if self.timer_active:
-                self.remaining_seconds -= 1
-        
-        if self.timer_active:
+            self.remaining_seconds -= 1
+            self.timer_after_id = self.root.after(1000, self.timer_countdown)
+        else:
             # 15초가 완료되면 타이머 숨기기
             self.timer_label.config(text="")
         
     def blink_effect(self):
-        """깜빡임 효과 구현"""
-        while self.blink_active:
-            self.status_label.config(foreground="red")
-            time.sleep(0.5)
-            if not self.blink_active:
-                break
-            self.status_label.config(foreground="white")
-            time.sleep(0.5)
+        """깜빡임 효과 구현 (0.5초마다 다시 예약)"""
+        if not self.blink_active:
+            return
+        self.status_label.config(foreground="red" if self.blink_on else "white")
+        self.blink_on = not self.blink_on
+        self.blink_after_id = self.root.after(500, self.blink_effect)
             
+    def update_quota_label(self):
+        """API 할당량 잔여 표시 갱신 (1초마다, 네트워크 호출 없음)"""
+        parts = []
+        quota = getattr(self.sheet_handler, 'quota', None)
+        if quota:
+            parts.append(quota.format_status())
+        usage = getattr(self.voice_processor, 'usage', None)
+        if usage:
+            parts.append(usage.format_summary())
+        self.quota_label.config(text=" | ".join(parts))
+        self.root.after(1000, self.update_quota_label)
+        
+    def show_profile_menu(self, event=None):
+        """숨김 프로파일링 메뉴 표시"""
+        x = self.root.winfo_pointerx() if event is None else event.x_root
+        y = self.root.winfo_pointery() if event is None else event.y_root
+        self.profile_menu.tk_popup(x, y)
+        self.profile_menu.grab_release()
+
+    def run_profile_command(self, command):
+        """프로파일링 명령 실행 후 결과 표시"""
+        if self.profiler is None:
+            self.profiler = ProfilingControls.from_settings(self.settings_manager)
+        try:
+            message = self.profiler.handle(command)
+        except Exception as e:
+            message = f"❌ 프로파일링 오류: {e}"
+        print(message)
+        messagebox.showinfo("프로파일링", message, parent=self.root)
+
+    def calibrate_audio(self):
+        """오디오 장치 보정 (백그라운드에서 측정 후 결과 표시)"""
+        if not self.voice_processor or self.is_recording:
+            return
+        self.update_status("🎚️ 오디오 장치 보정 중... (약 1분)", "blue")
+        voice_processor = self.voice_processor
+        
+        def done(report):
+            self.update_status("✅ 오디오 장치 보정 완료", "green")
+            messagebox.showinfo("오디오 장치 보정", report, parent=self.root)
+        
+        self.run_in_background('calibrate', lambda emit, is_current: voice_processor.calibrate_audio(), done,
+                               lambda e: self.update_status(f"❌ 장치 보정 오류: {str(e)[:30]}...", "red"))
+    
     def update_status(self, message, color="black"):
-        """상태 메시지 업데이트"""
+        """상태 메시지 업데이트 (작업 스레드에서 호출하면 UI 스레드로 넘겨 실행)"""
+        if threading.current_thread() is not threading.main_thread():
+            self.call_in_ui(lambda: self.update_status(message, color))
+            return
         self.status_label.config(text=message, foreground=color)
         
-    def display_result(self, text, confidence=None):
-        """인식 결과 표시"""
-        timestamp = time.strftime("%H:%M:%S")
+    def reserve_target(self):
+        """녹음을 시작할 때 입력 대상(스프레드시트/시트/셀)을 정하고 입력란은 다음 행으로 이동 (UI 스레드)
+
+        결과를 입력하는 엔진 스레드는 위젯을 읽지 않고 이 대상을 그대로 사용합니다."""
+        cell = self.cell_address_entry.get().strip().upper() or "A1"  # 기본값
+        target = {'spreadsheet': self.spreadsheet_var.get(), 'sheet': self.sheet_var.get(), 'cell': cell}
+        if self.sheet_handler:
+            # 결과가 나오기 전에 다음 녹음을 시작해도 같은 셀에 겹쳐 쓰지 않도록 미리 이동
+            self.cell_address_entry.delete(0, tk.END)
+            self.cell_address_entry.insert(0, cell)
+            self.move_to_next_cell()
+            target['next_cell'] = self.cell_address_entry.get()
+        return target
+    
+    def release_target(self, target):
+        """녹음/인식이 실패하면 미리 옮긴 입력란을 정했던 셀로 되돌림 (그 사이 다른 녹음이 옮기지 않은 경우만)"""
+        def restore():
+            if target.get('next_cell') and self.cell_address_entry.get().strip().upper() == target['next_cell']:
+                self.cell_address_entry.delete(0, tk.END)
+                self.cell_address_entry.insert(0, target['cell'])
+                self.current_cell_label.config(text=target['cell'])
+        self.call_in_ui(restore)
         
-        if confidence:
-            result_text = f"[{timestamp}] {text} (신뢰도: {confidence:.2f})\n"
-        else:
-            result_text = f"[{timestamp}] {text}\n"
-            
-        # 텍스트 영역에 결과 추가
-        self.text_area.insert(tk.END, result_text)
-        self.text_area.see(tk.END)  # 자동 스크롤
+    def display_result(self, text, confidence=None, target=None):
+        """인식 결과 표시, 입력 대상(스프레드시트/시트/셀) 반환
+
+        처리 엔진 스레드에서 호출되므로 위젯은 UI 스레드에서만 다루고, 셀 분배/시트 입력은 이 스레드에서 합니다.
+        target은 녹음 시작 때 reserve_target으로 정한 대상 (없으면 지금 입력란 기준으로 정함)."""
+        if target is None:
+            target = self.call_in_ui(self.reserve_target, wait=True)
+        spreadsheet, sheet, current_cell = target['spreadsheet'], target['sheet'], target['cell']
+        
+        # 여러 PC가 같은 시트에 쓰는 경우 겹치지 않는 셀을 받아 입력란에 반영
+        if self.sheet_handler and self.sheet_handler.allocator:
+            try:
+                current_cell = self.sheet_handler.allocator.next_cell(spreadsheet, sheet, current_cell)
+            except Exception as e:
+                print(f"⚠️ 셀 분배 실패, 입력란 셀 사용: {e}")
+        
+        def show_result():
+            # 기록 목록에 결과 추가 (로컬 기록 저장은 백그라운드에서)
+            self.history_view.append(text, confidence or 0.0, spreadsheet, sheet,
+                                     current_cell if self.sheet_handler else "")
+            entry_cell = self.cell_address_entry.get().strip().upper()
+            if self.sheet_handler and current_cell != target['cell'] and entry_cell == target.get('next_cell'):
+                # 셀 분배로 다른 셀에 입력했으면 그 셀 기준으로 다음 행으로 이동
+                self.cell_address_entry.delete(0, tk.END)
+                self.cell_address_entry.insert(0, current_cell)
+                self.move_to_next_cell()
+            self.update_status("✅ 인식 완료", "green")
         
         # 스프레드시트에 저장
         if self.sheet_handler:
-            # 셀 주소 입력란에서 현재 셀 주소 가져오기
-            current_cell = self.cell_address_entry.get().strip().upper()
-            if not current_cell:
-                current_cell = "A1"  # 기본값
-            
             self.sheet_handler.save_to_sheet(text, confidence or 0.0, current_cell)
             
-            # 셀 주소 설정 저장
-            if self.settings_manager:
-                self.settings_manager.set_setting("last_cell", current_cell)
-                print(f"✅ 셀 주소 설정 저장: {current_cell}")
-            
-            # 다음 행으로 자동 이동
-            self.move_to_next_cell()
-            
-        # 상태 업데이트
-        self.update_status("✅ 인식 완료", "green")
+            # 셀 주소는 기억만 하고 설정 파일에는 주기적으로 저장 (cell_save_loop)
+            with self.cell_lock:
+                self.unsaved_cell = current_cell
+        
+        self.call_in_ui(show_result)
+        return {'spreadsheet': spreadsheet, 'sheet': sheet, 'cell': current_cell}
+    
+    def call_in_ui(self, func, wait=False):
+        """UI 스레드에서 func 실행 (작업 스레드에서 위젯을 다룰 때, wait=True면 결과를 기다려 반환)"""
+        if threading.current_thread() is threading.main_thread():
+            return func()
+        future = concurrent.futures.Future()
+        
+        def run(_):
+            try:
+                future.set_result(func())
+            except Exception as e:
+                future.set_exception(e)
+        
+        # 'ui' 종류는 세대를 쓰지 않으므로 poll_ui_queue에서 항상 실행됨
+        self.ui_queue.put(('ui', None, run, None))
+        return future.result(timeout=10) if wait else None
+        
+    def cell_save_loop(self):
+        self.save_cell_cursor()
+        self.root.after(CELL_SAVE_SECONDS * 1000, self.cell_save_loop)
+    
+    def save_cell_cursor(self):
+        """마지막 입력 셀이 바뀌었으면 설정 파일에 저장 (주기적으로, 프로필 전환과 종료 시 호출)"""
+        with self.cell_lock:
+            cell, self.unsaved_cell = self.unsaved_cell, None
+        if cell and self.settings_manager:
+            self.settings_manager.set_setting("last_cell", cell)
+            print(f"✅ 셀 주소 설정 저장: {cell}")
         
     def reset_buttons(self):
-        """버튼 상태 초기화"""
+        """버튼 상태 초기화 (작업 스레드에서 호출하면 UI 스레드로 넘겨 실행)"""
+        if threading.current_thread() is not threading.main_thread():
+            self.call_in_ui(self.reset_buttons)
+            return
         self.is_recording = False
         self.start_button.config(state="normal")
         self.stop_button.config(state="disabled")
@@ -347,190 +570,321 @@ class SimpleVoiceGUI:
         except Exception as e:
             print(f"❌ 설정값 복원 실패: {e}")
     
+    def run_in_background(self, kind, work, on_item=None, on_done=None, on_error=None):
+        """네트워크 작업을 작업 스레드에서 실행 (UI 스레드에서는 결과만 반영)
+
+        같은 종류의 새 요청이 들어오면 이전 요청은 취소된 것으로 보고 결과를 버립니다.
+        work(emit, is_current)는 결과가 나오는 대로 emit(item)으로 전달하고 최종 결과를 반환합니다.
+        """
+        self.load_generation[kind] = self.load_generation.get(kind, 0) + 1
+        generation = self.load_generation[kind]
+        is_current = lambda: self.load_generation.get(kind) == generation
+        
+        def emit(item):
+            if on_item:
+                self.ui_queue.put((kind, generation, on_item, item))
+        
+        def task():
+            try:
+                result = work(emit, is_current)
+                if on_done:
+                    self.ui_queue.put((kind, generation, on_done, result))
+            except Exception as e:
+                print(f"백그라운드 작업 오류 ({kind}): {e}")
+                if on_error:
+                    self.ui_queue.put((kind, generation, on_error, e))
+            finally:
+                self.ui_queue.put((kind, generation, None, None))
+        
+        self.loading[kind] = generation
+        self.update_spinners()
+        self.background.submit(task)
+    
+    def cancel_loading(self, *kinds):
+        """진행 중인 요청 결과를 버리도록 표시"""
+        for kind in kinds:
+            self.load_generation[kind] = self.load_generation.get(kind, 0) + 1
+    
+    def poll_ui_queue(self):
+        """작업 스레드 결과를 UI 스레드에서 반영 (50ms마다)"""
+        self.drain_ui_queue()
+        self.root.after(50, self.poll_ui_queue)
+    
+    def drain_ui_queue(self):
+        """UI 큐에 쌓인 결과를 모두 반영 (오래된 요청 결과는 무시, 종료 직전에도 호출)"""
+        try:
+            while True:
+                kind, generation, callback, value = self.ui_queue.get_nowait()
+                if callback is None:
+                    # 작업 종료 표시는 취소된 요청이어도 반영
+                    self.finish_loading(kind, generation)
+                    continue
+                if self.load_generation.get(kind) != generation:
+                    continue
+                try:
+                    callback(value)
+                except Exception as e:
+                    print(f"UI 갱신 오류 ({kind}): {e}")
+        except queue.Empty:
+            pass
+    
+    def finish_loading(self, kind, generation):
+        if self.loading.get(kind) == generation:
+            del self.loading[kind]
+        self.update_spinners()
+    
+    def update_spinners(self):
+        """로딩 중인 드롭다운 옆에 회전 표시"""
+        frames = "◐◓◑◒"
+        spreadsheet_busy = any(kind in self.loading for kind in ('spreadsheets', 'select_spreadsheet', 'profile'))
+        sheet_busy = spreadsheet_busy or any(kind in self.loading for kind in ('sheets', 'select_sheet'))
+        frame = frames[self.spinner_index % len(frames)]
+        self.spreadsheet_spinner.config(text=frame if spreadsheet_busy else "")
+        self.sheet_spinner.config(text=frame if sheet_busy else "")
+        if (spreadsheet_busy or sheet_busy) and self.spinner_after_id is None:
+            self.spinner_after_id = self.root.after(120, self.spin)
+    
+    def spin(self):
+        self.spinner_after_id = None
+        self.spinner_index += 1
+        self.update_spinners()
+    
     def refresh_spreadsheets(self):
-        """스프레드시트 목록 새로고침"""
+        """스프레드시트 목록 새로고침 (백그라운드, 받는 대로 드롭다운에 추가)"""
         print("🔄 refresh_spreadsheets 메서드 호출됨")
-        try:
-            if not self.sheet_handler:
-                print("❌ sheet_handler가 없습니다")
-                return
-            
-            # GUI 상태 업데이트
-            self.update_status("🔄 스프레드시트 목록 로딩 중...", "blue")
-            
-            # 모든 스프레드시트 가져오기
-            all_spreadsheets = self.sheet_handler.get_all_spreadsheets()
-            print(f"🔄 가져온 스프레드시트 목록: {[spreadsheet['title'] for spreadsheet in all_spreadsheets]}")
-            
-            if all_spreadsheets:
-                spreadsheet_titles = [spreadsheet['title'] for spreadsheet in all_spreadsheets]
-                self.spreadsheet_combo['values'] = spreadsheet_titles
-                
-                # 이전 설정값이 있으면 그것을 사용, 없으면 첫 번째 스프레드시트 선택
-                if self.settings_manager:
-                    last_spreadsheet = self.settings_manager.get_setting("last_spreadsheet")
-                    print(f"🔄 스프레드시트 복원 시도: {last_spreadsheet}")
-                    if last_spreadsheet and last_spreadsheet in spreadsheet_titles:
-                        self.spreadsheet_var.set(last_spreadsheet)
-                        # 선택된 스프레드시트로 변경
-                        self.sheet_handler.set_target_spreadsheet(last_spreadsheet)
-                        print(f"✅ 스프레드시트 복원 완료: {last_spreadsheet}")
-                    elif spreadsheet_titles:
-                        self.spreadsheet_var.set(spreadsheet_titles[0])
-                        # 첫 번째 스프레드시트로 변경
-                        self.sheet_handler.set_target_spreadsheet(spreadsheet_titles[0])
-                        print(f"✅ 기본 스프레드시트 선택: {spreadsheet_titles[0]}")
-                elif spreadsheet_titles:
-                    self.spreadsheet_var.set(spreadsheet_titles[0])
-                    # 첫 번째 스프레드시트로 변경
-                    self.sheet_handler.set_target_spreadsheet(spreadsheet_titles[0])
-                    print(f"✅ 기본 스프레드시트 선택: {spreadsheet_titles[0]}")
-                
-                print(f"✅ 스프레드시트 목록 새로고침 완료: {spreadsheet_titles}")
-                self.update_status(f"✅ {len(spreadsheet_titles)}개 스프레드시트 로드 완료", "green")
-            else:
-                print("❌ 스프레드시트 목록을 가져올 수 없습니다")
-                self.spreadsheet_combo['values'] = []
-                self.update_status("❌ 스프레드시트 목록을 가져올 수 없습니다", "red")
-                
-        except Exception as e:
-            print(f"스프레드시트 목록 새로고침 오류: {e}")
-            self.update_status(f"❌ 스프레드시트 목록 오류: {str(e)[:30]}...", "red")
-
+        if not self.sheet_handler:
+            print("❌ sheet_handler가 없습니다")
+            return
+        
+        # GUI 상태 업데이트
+        self.update_status("🔄 스프레드시트 목록 로딩 중...", "blue")
+        self.spreadsheet_combo['values'] = []
+        handler = self.sheet_handler
+        
+        def work(emit, is_current):
+            titles = []
+            for spreadsheet in handler.get_all_spreadsheets(priority='interactive'):
+                if not is_current():
+                    break
+                titles.append(spreadsheet['title'])
+                emit(spreadsheet['title'])
+            return titles
+        
+        def add_item(title):
+            self.spreadsheet_combo['values'] = list(self.spreadsheet_combo['values']) + [title]
+        
+        self.run_in_background('spreadsheets', work, add_item, self.on_spreadsheets_loaded,
+                               lambda e: self.update_status(f"❌ 스프레드시트 목록 오류: {str(e)[:30]}...", "red"))
+    
+    def on_spreadsheets_loaded(self, spreadsheet_titles):
+        """스프레드시트 목록 로드 완료: 이전 설정값 또는 첫 번째 스프레드시트 선택"""
+        self.spreadsheet_combo['values'] = spreadsheet_titles
+        if not spreadsheet_titles:
+            print("❌ 스프레드시트 목록을 가져올 수 없습니다")
+            self.update_status("❌ 스프레드시트 목록을 가져올 수 없습니다", "red")
+            return
+        
+        # 이전 설정값이 있으면 그것을 사용, 없으면 첫 번째 스프레드시트 선택
+        last_spreadsheet = self.settings_manager.get_setting("last_spreadsheet") if self.settings_manager else None
+        print(f"🔄 스프레드시트 복원 시도: {last_spreadsheet}")
+        selected = last_spreadsheet if last_spreadsheet in spreadsheet_titles else spreadsheet_titles[0]
+        self.spreadsheet_var.set(selected)
+        print(f"✅ 스프레드시트 목록 새로고침 완료: {spreadsheet_titles}")
+        self.update_status(f"✅ {len(spreadsheet_titles)}개 스프레드시트 로드 완료", "green")
+        self.select_spreadsheet(selected, save=False)
+    
     def refresh_sheets(self):
-        """시트 목록 새로고침"""
+        """시트 목록 새로고침 (백그라운드)"""
         print("🔄 refresh_sheets 메서드 호출됨")
-        try:
-            if not self.sheet_handler:
-                print("❌ sheet_handler가 없습니다")
-                return
-            
-            # 모든 시트 가져오기
-            all_sheets = self.sheet_handler.get_all_sheets()
-            print(f"🔄 가져온 시트 목록: {[sheet['title'] for sheet in all_sheets]}")
-            
-            if all_sheets:
-                sheet_titles = [sheet['title'] for sheet in all_sheets]
-                self.sheet_combo['values'] = sheet_titles
-                
-                # 이전 설정값이 있으면 그것을 사용, 없으면 첫 번째 시트 선택
-                print(f"🔄 settings_manager 상태: {self.settings_manager is not None}")
-                if self.settings_manager:
-                    last_sheet = self.settings_manager.get_setting("last_sheet")
-                    print(f"🔄 시트 복원 시도: {last_sheet}")
-                    print(f"🔄 사용 가능한 시트: {sheet_titles}")
-                    if last_sheet and last_sheet in sheet_titles:
-                        self.sheet_var.set(last_sheet)
-                        self.on_sheet_selected(None)
-                        print(f"✅ 시트 복원 완료: {last_sheet}")
-                    elif sheet_titles:
-                        self.sheet_var.set(sheet_titles[0])
-                        self.on_sheet_selected(None)
-                        print(f"✅ 기본 시트 선택: {sheet_titles[0]}")
-                    
-                    # 셀 주소 복원
-                    last_cell = self.settings_manager.get_setting("last_cell", "A1")
-                    print(f"🔄 셀 주소 복원 시도: {last_cell}")
-                    if last_cell and hasattr(self, 'cell_address_entry'):
-                        self.cell_address_entry.delete(0, tk.END)
-                        self.cell_address_entry.insert(0, last_cell)
-                        self.current_cell_label.config(text=last_cell)
-                        print(f"✅ 셀 주소 복원 완료: {last_cell}")
-                    else:
-                        print(f"❌ 셀 주소 복원 실패: entry 위젯이 없음")
-                else:
-                    print("❌ settings_manager가 None입니다")
-                    if sheet_titles:
-                        self.sheet_var.set(sheet_titles[0])
-                        self.on_sheet_selected(None)
-                
-                print(f"✅ 시트 목록 새로고침 완료: {sheet_titles}")
-            else:
-                print("❌ 시트 목록을 가져올 수 없습니다")
-                self.sheet_combo['values'] = []
-                
-        except Exception as e:
-            print(f"시트 목록 새로고침 오류: {e}")
+        if not self.sheet_handler:
+            print("❌ sheet_handler가 없습니다")
+            return
+        handler = self.sheet_handler
+        
+        def work(emit, is_current):
+            titles = []
+            for sheet in handler.get_all_sheets(priority='interactive'):
+                if not is_current():
+                    break
+                titles.append(sheet['title'])
+                emit(sheet['title'])
+            return titles
+        
+        self.sheet_combo['values'] = []
+        self.run_in_background('sheets', work, self.add_sheet_item, self.on_sheets_loaded)
+    
+    def add_sheet_item(self, title):
+        self.sheet_combo['values'] = list(self.sheet_combo['values']) + [title]
+    
+    def on_sheets_loaded(self, sheet_titles):
+        """시트 목록 로드 완료: 이전 시트와 셀 주소 복원"""
+        self.sheet_combo['values'] = sheet_titles
+        if not sheet_titles:
+            print("❌ 시트 목록을 가져올 수 없습니다")
+            return
+        
+        last_sheet = self.settings_manager.get_setting("last_sheet") if self.settings_manager else None
+        print(f"🔄 시트 복원 시도: {last_sheet}")
+        self.sheet_var.set(last_sheet if last_sheet in sheet_titles else sheet_titles[0])
+        self.on_sheet_selected(None)
+        
+        # 셀 주소 복원
+        if self.settings_manager:
+            last_cell = self.settings_manager.get_setting("last_cell", "A1")
+            if last_cell:
+                self.cell_address_entry.delete(0, tk.END)
+                self.cell_address_entry.insert(0, last_cell)
+                self.current_cell_label.config(text=last_cell)
+                print(f"✅ 셀 주소 복원 완료: {last_cell}")
+        print(f"✅ 시트 목록 새로고침 완료: {sheet_titles}")
     
     def on_spreadsheet_selected(self, event):
         """스프레드시트 선택 이벤트 처리 (방법 3A)"""
-        try:
-            selected_spreadsheet = self.spreadsheet_var.get()
-            if selected_spreadsheet and self.sheet_handler:
-                # 선택된 스프레드시트가 허용 목록에 없으면 추가
-                if hasattr(self.sheet_handler, 'add_allowed_spreadsheet'):
-                    self.sheet_handler.add_allowed_spreadsheet(selected_spreadsheet)
-                
-                success = self.sheet_handler.set_target_spreadsheet(selected_spreadsheet)
-                if success:
-                    print(f"✅ 스프레드시트 변경 완료: {selected_spreadsheet}")
-                    # 스프레드시트 변경 시 시트 목록 새로고침
-                    self.refresh_sheets()
-                    # 스프레드시트 변경 시 설정 저장
-                    if self.settings_manager:
-                        self.settings_manager.set_setting("last_spreadsheet", selected_spreadsheet)
-                        print(f"✅ 스프레드시트 설정 저장: {selected_spreadsheet}")
-                else:
-                    print(f"❌ 스프레드시트 변경 실패: {selected_spreadsheet}")
-        except Exception as e:
-            print(f"스프레드시트 선택 오류: {e}")
-
+        selected_spreadsheet = self.spreadsheet_var.get()
+        if selected_spreadsheet and self.sheet_handler:
+            self.select_spreadsheet(selected_spreadsheet)
+    
+    def select_spreadsheet(self, title, save=True):
+        """스프레드시트 변경 후 시트 목록 로드 (백그라운드, 진행 중인 이전 선택은 취소)"""
+        handler = self.sheet_handler
+        settings_manager = self.settings_manager
+        self.sheet_combo['values'] = []
+        self.sheet_var.set("")
+        # 이전 스프레드시트의 시트 목록/선택 요청 무효화
+        self.cancel_loading('sheets', 'select_sheet')
+        
+        def work(emit, is_current):
+            # 선택된 스프레드시트가 허용 목록에 없으면 추가
+            if save and hasattr(handler, 'add_allowed_spreadsheet'):
+                handler.add_allowed_spreadsheet(title)
+            # 작업 스레드에서는 찾기만 하고 대상 변경은 UI 스레드에서 (늦게 끝난 이전 선택이 덮어쓰지 않도록)
+            spreadsheet = handler.find_spreadsheet(title)
+            if spreadsheet is None:
+                return None
+            titles = []
+            if is_current():
+                for sheet in handler.get_all_sheets(priority='interactive', spreadsheet=spreadsheet):
+                    titles.append(sheet['title'])
+                    emit(sheet['title'])
+            return spreadsheet, titles
+        
+        def done(result):
+            if result is None:
+                print(f"❌ 스프레드시트 변경 실패: {title}")
+                self.update_status(f"❌ 스프레드시트 변경 실패: {title}", "red")
+                return
+            # 최신 선택의 결과만 여기까지 옴 (poll_ui_queue가 이전 세대 결과를 버림)
+            spreadsheet, sheet_titles = result
+            handler.spreadsheet = spreadsheet
+            handler.sheet = None
+            print(f"✅ 스프레드시트 변경 완료: {title}")
+            # 스프레드시트 변경 시 설정 저장
+            if save and settings_manager:
+                settings_manager.set_setting("last_spreadsheet", title)
+                print(f"✅ 스프레드시트 설정 저장: {title}")
+            self.on_sheets_loaded(sheet_titles)
+        
+        self.run_in_background('select_spreadsheet', work, self.add_sheet_item, done,
+                               lambda e: self.update_status(f"❌ 스프레드시트 선택 오류: {str(e)[:30]}...", "red"))
+    
     def on_sheet_selected(self, event):
-        """시트 선택 이벤트 처리"""
-        try:
-            selected_sheet = self.sheet_var.get()
-            if selected_sheet and self.sheet_handler:
-                success = self.sheet_handler.set_target_sheet(selected_sheet)
-                if success:
-                    print(f"✅ 시트 변경 완료: {selected_sheet}")
-                    # 시트 변경 시 설정 저장
-                    if self.settings_manager:
-                        self.settings_manager.set_setting("last_sheet", selected_sheet)
-                        print(f"✅ 시트 설정 저장: {selected_sheet}")
-                    # 셀 주소는 이전 설정값을 유지 (초기화하지 않음)
-                else:
-                    print(f"❌ 시트 변경 실패: {selected_sheet}")
-        except Exception as e:
-            print(f"시트 선택 오류: {e}")
+        """시트 선택 이벤트 처리 (백그라운드)"""
+        selected_sheet = self.sheet_var.get()
+        if not selected_sheet or not self.sheet_handler:
+            return
+        handler = self.sheet_handler
+        spreadsheet = handler.spreadsheet
+        
+        def done(sheet):
+            # 그 사이 스프레드시트가 바뀌었으면 이전 스프레드시트의 시트는 적용하지 않음
+            if sheet is not None and handler.spreadsheet is spreadsheet:
+                handler.sheet = sheet
+                print(f"✅ 시트 변경 완료: {selected_sheet}")
+                # 시트 변경 시 설정 저장 (셀 주소는 이전 설정값을 유지)
+                if self.settings_manager:
+                    self.settings_manager.set_setting("last_sheet", selected_sheet)
+                    print(f"✅ 시트 설정 저장: {selected_sheet}")
+            else:
+                print(f"❌ 시트 변경 실패: {selected_sheet}")
+        
+        self.run_in_background('select_sheet', lambda emit, is_current: handler.find_sheet(selected_sheet, spreadsheet),
+                               on_done=done, on_error=lambda e: print(f"❌ 시트 변경 실패: {selected_sheet} ({e})"))
+    
+    def on_profile_selected(self, event):
+        """고객 프로필 전환 (백그라운드, 연결과 목록 캐시는 재사용)"""
+        profile_name = self.profile_var.get()
+        if not profile_name or not self.sheet_handler:
+            return
+        handler = self.sheet_handler
+        self.cancel_loading('spreadsheets', 'sheets', 'select_spreadsheet', 'select_sheet')
+        # 이전 프로필의 마지막 셀은 전환 전에 저장
+        self.save_cell_cursor()
+        
+        def work(emit, is_current):
+            if not handler.switch_profile(profile_name):
+                return None
+            spreadsheets = [s['title'] for s in handler.get_all_spreadsheets(priority='interactive', use_cache=True)]
+            sheets = []
+            if handler.spreadsheet:
+                worksheets = handler.worksheet_lists.get(handler.spreadsheet.id)
+                sheets = [w.title for w in worksheets] if worksheets is not None else \
+                    [s['title'] for s in handler.get_all_sheets(priority='interactive')]
+            return (spreadsheets, sheets, handler.spreadsheet.title if handler.spreadsheet else "",
+                    handler.sheet.title if handler.sheet else "")
+        
+        def done(result):
+            if result is None:
+                self.update_status(f"❌ 프로필 전환 실패: {profile_name}", "red")
+                self.profile_var.set(self.settings_manager.active_profile or "")
+                return
+            spreadsheets, sheets, spreadsheet_title, sheet_title = result
+            self.spreadsheet_combo['values'] = spreadsheets
+            self.spreadsheet_var.set(spreadsheet_title)
+            self.sheet_combo['values'] = sheets
+            self.sheet_var.set(sheet_title)
+            last_cell = self.settings_manager.get_setting("last_cell", "A1")
+            self.cell_address_entry.delete(0, tk.END)
+            self.cell_address_entry.insert(0, last_cell)
+            self.current_cell_label.config(text=last_cell)
+            self.update_status(f"✅ 프로필 전환: {profile_name}", "green")
+        
+        self.run_in_background('profile', work, on_done=done,
+                               on_error=lambda e: self.update_status(f"❌ 프로필 전환 오류: {str(e)[:30]}...", "red"))
     
     def auto_detect_spreadsheet(self):
-        """스프레드시트 자동 감지 (방법 3A)"""
-        try:
-            print("🔍 스프레드시트 자동 감지 시작...")
-            
-            if not self.sheet_handler:
-                print("❌ sheet_handler가 없습니다")
+        """스프레드시트 자동 감지 (방법 3A, 백그라운드)"""
+        print("🔍 스프레드시트 자동 감지 시작...")
+        if not self.sheet_handler:
+            print("❌ sheet_handler가 없습니다")
+            return
+        if not hasattr(self.sheet_handler, 'auto_detect_spreadsheet'):
+            print("❌ 자동 감지 기능을 사용할 수 없습니다")
+            self.update_status("❌ 자동 감지 기능을 사용할 수 없습니다", "red")
+            return
+        
+        # GUI 상태 업데이트
+        self.update_status("🔍 스프레드시트 자동 감지 중...", "blue")
+        handler = self.sheet_handler
+        
+        def work(emit, is_current):
+            handler.auto_detect_spreadsheet()
+            titles = [spreadsheet['title'] for spreadsheet in handler.get_all_spreadsheets(priority='interactive')]
+            return titles, handler.spreadsheet.title if handler.spreadsheet else None
+        
+        def done(result):
+            titles, detected_name = result
+            self.spreadsheet_combo['values'] = titles
+            if not detected_name:
+                print("❌ 자동 감지된 스프레드시트가 없습니다")
+                self.update_status("❌ 자동 감지된 스프레드시트가 없습니다", "red")
                 return
-            
-            # GUI 상태 업데이트
-            self.update_status("🔍 스프레드시트 자동 감지 중...", "blue")
-            
-            # 자동 감지 실행
-            if hasattr(self.sheet_handler, 'auto_detect_spreadsheet'):
-                self.sheet_handler.auto_detect_spreadsheet()
-                
-                # 자동 감지 후 스프레드시트 목록 새로고침
-                self.refresh_spreadsheets()
-                
-                # 자동 감지된 스프레드시트가 있으면 선택
-                if self.sheet_handler.spreadsheet:
-                    detected_name = self.sheet_handler.spreadsheet.title
-                    self.spreadsheet_var.set(detected_name)
-                    print(f"✅ 자동 감지 완료: {detected_name}")
-                    self.update_status(f"✅ 자동 감지 완료: {detected_name}", "green")
-                    
-                    # 시트 목록도 새로고침
-                    self.refresh_sheets()
-                else:
-                    print("❌ 자동 감지된 스프레드시트가 없습니다")
-                    self.update_status("❌ 자동 감지된 스프레드시트가 없습니다", "red")
-            else:
-                print("❌ 자동 감지 기능을 사용할 수 없습니다")
-                self.update_status("❌ 자동 감지 기능을 사용할 수 없습니다", "red")
-                
-        except Exception as e:
-            print(f"자동 감지 오류: {e}")
-            self.update_status(f"❌ 자동 감지 오류: {str(e)[:30]}...", "red")
+            self.spreadsheet_var.set(detected_name)
+            print(f"✅ 자동 감지 완료: {detected_name}")
+            self.update_status(f"✅ 자동 감지 완료: {detected_name}", "green")
+            self.refresh_sheets()
+        
+        self.run_in_background('spreadsheets', work, on_done=done,
+                               on_error=lambda e: self.update_status(f"❌ 자동 감지 오류: {str(e)[:30]}...", "red"))
     
     def setup_styles(self):
         """버튼 스타일 설정"""
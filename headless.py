@@ -0,0 +1,249 @@
+import sys
+import time
+import json
+import wave
+from gateway import next_cell_address
+from audio_spool import AudioSpool
+from profiler import ProfilingControls
+import google_auth
+from session_replay import SessionRecorder
+
+class HeadlessController:
+    def __init__(self, voice_processor, sheet_handler, settings_manager, engine, history_store=None):
+        """GUI 없이 표준 입력 명령으로 녹음/인식을 제어하는 컨트롤러"""
+        self.voice_processor = voice_processor
+        self.sheet_handler = sheet_handler
+        self.settings_manager = settings_manager
+        self.engine = engine
+        self.history_store = history_store
+        self.profiler = ProfilingControls.from_settings(settings_manager)
+
+        self.commands = {
+            'help': self.cmd_help,
+            'record': self.cmd_record,
+            'stop': self.cmd_stop,
+            'file': self.cmd_file,
+            'cell': self.cmd_cell,
+            'stats': self.cmd_stats,
+            'quota': self.cmd_quota,
+            'usage': self.cmd_usage,
+            'profile': self.cmd_profile,
+            'search': self.cmd_search,
+            'source': self.cmd_source,
+            'customer': self.cmd_customer,
+            'calibrate': self.cmd_calibrate
+        }
+
+    def save_result(self, text, confidence):
+        """인식 결과를 현재 셀에 저장하고 다음 행으로 이동"""
+        cell = self.settings_manager.get_setting("last_cell", "A1")
+        if self.sheet_handler.allocator:
+            cell = self.sheet_handler.allocator.next_cell(self.settings_manager.get_setting("last_spreadsheet", ""),
+                                                          self.settings_manager.get_setting("last_sheet", ""), cell)
+        self.sheet_handler.save_to_sheet(text, confidence or 0.0, cell)
+        self.settings_manager.set_setting("last_cell", next_cell_address(cell))
+        print(f"인식 결과: {text} → {cell}")
+        target = {'spreadsheet': self.settings_manager.get_setting("last_spreadsheet", ""),
+                  'sheet': self.settings_manager.get_setting("last_sheet", ""), 'cell': cell}
+        if self.history_store:
+            self.history_store.add(text, confidence or 0.0, target['spreadsheet'], target['sheet'], cell)
+        return target
+
+    def handle_command(self, line):
+        """명령 한 줄 처리, 종료 명령이면 False 반환"""
+        parts = line.strip().split(maxsplit=1)
+        if not parts:
+            return True
+        name, arg = parts[0].lower(), (parts[1] if len(parts) > 1 else "")
+        if name in ('quit', 'exit'):
+            return False
+        handler = self.commands.get(name)
+        if handler is None:
+            print(f"❌ 알 수 없는 명령: {name} (help 참고)")
+            return True
+        try:
+            handler(arg)
+        except Exception as e:
+            print(f"❌ 명령 실행 오류 ({name}): {e}")
+        return True
+
+    def cmd_help(self, arg):
+        """명령 목록 출력"""
+        print("명령: " + ", ".join(sorted(self.commands)) + ", quit")
+
+    def cmd_record(self, arg):
+        """마이크 녹음 시작"""
+        if self.voice_processor.is_recording:
+            print("이미 녹음 중입니다")
+            return
+        self.voice_processor.is_recording = True
+        job = {'processor': self.voice_processor, 'sink': self.save_result,
+               'on_error': self.voice_processor.report_error}
+        if self.engine.submit(job) is None:
+            self.voice_processor.is_recording = False
+        else:
+            print("🎙️ 녹음 중... (stop 입력 시 중지)")
+
+    def cmd_stop(self, arg):
+        """마이크 녹음 중지"""
+        self.voice_processor.stop_recording()
+
+    def cmd_file(self, arg):
+        """WAV 파일을 인식 작업으로 제출 (대기열이 가득 차면 빈 자리가 날 때까지 대기)"""
+        wf = wave.open(arg, 'rb')
+        try:
+            if wf.getframerate() != self.voice_processor.RATE or wf.getnchannels() != 1:
+                print(f"❌ {self.voice_processor.RATE}Hz 모노 WAV만 지원합니다: {arg}")
+                return
+            job = {'processor': self.voice_processor, 'sink': self.save_result}
+            if wf.getnframes() / wf.getframerate() > self.voice_processor.longform.max_seconds:
+                # 긴 파일은 스풀로 옮겨 장문 인식 (파일 전체를 메모리에 올리지 않음)
+                spool = AudioSpool(rate=wf.getframerate())
+                while True:
+                    data = wf.readframes(65536)
+                    if not data:
+                        break
+                    spool.append(data)
+                job['spool'] = spool
+            else:
+                job['pcm'] = wf.readframes(wf.getnframes())
+        finally:
+            wf.close()
+        self.engine.submit(job, block=True)
+        print(f"📁 파일 제출 완료: {arg}")
+
+    def cmd_cell(self, arg):
+        """다음 입력 셀 지정"""
+        if arg:
+            self.settings_manager.set_setting("last_cell", arg.strip().upper())
+        print(f"현재 셀: {self.settings_manager.get_setting('last_cell', 'A1')}")
+
+    def cmd_stats(self, arg):
+        """처리 엔진/캡처 통계 출력"""
+        stats = self.engine.get_stats()
+        stats['capture'] = dict(self.voice_processor.capture_stats)
+        stats['source'] = self.voice_processor.last_source_stats
+        if self.voice_processor.capture_process:
+            stats['capture'].update(self.voice_processor.capture_process.get_stats())
+        if self.sheet_handler.mirror:
+            stats['mirrors'] = self.sheet_handler.mirror.get_stats()
+        if self.sheet_handler.allocator:
+            stats['cell_allocation'] = self.sheet_handler.allocator.get_stats()
+        stats['recognition_backends'] = self.voice_processor.router.get_stats()
+        stats['recognition_connections'] = self.voice_processor.connections.get_status()
+        if self.voice_processor.quality:
+            stats['upload_quality'] = self.voice_processor.quality.get_stats()
+        if self.voice_processor.uploader:
+            stats['object_upload'] = self.voice_processor.uploader.get_stats()
+        if google_auth.shared_client:
+            stats['auth'] = google_auth.shared_client.get_stats()
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+    def cmd_quota(self, arg):
+        """Sheets/Drive API 남은 할당량과 등급별 대기 시간 출력"""
+        print(json.dumps(self.sheet_handler.quota.get_status(), ensure_ascii=False, indent=2))
+
+    def cmd_usage(self, arg):
+        """음성 인식 사용량과 예상 비용 출력"""
+        if self.voice_processor.usage:
+            print(json.dumps(self.voice_processor.usage.get_summary(), ensure_ascii=False, indent=2))
+
+    def cmd_profile(self, arg):
+        """실행 중 프로파일링 (profile cpu start|stop, profile mem snap [이름]|stop, profile status)"""
+        print(self.profiler.handle(arg))
+
+    def cmd_source(self, arg):
+        """오디오 입력 변경 (source mic|file:경로|pipe|tcp:호스트:포트|rtp:호스트:포트 [배속])"""
+        parts = arg.split()
+        if not parts:
+            print(f"현재 입력: {self.voice_processor.audio_source}")
+            return
+        speed = float(parts[1]) if len(parts) > 1 else None
+        self.voice_processor.set_audio_source(parts[0], speed)
+        print(f"오디오 입력: {parts[0]}" + (f" ({speed:g}배속)" if speed is not None else ""))
+
+    def cmd_search(self, arg):
+        """로컬 기록 검색 (search 검색어...)"""
+        if not self.history_store:
+            print("기록 저장소가 없습니다")
+            return
+        results = self.history_store.search(arg, limit=50)
+        for record in reversed(results):
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record['timestamp']))
+            print(f"[{timestamp}] {record['text']} → {record['spreadsheet']}/{record['sheet']}!{record['cell']}")
+        print(f"검색 결과 {len(results)}건")
+
+    def cmd_calibrate(self, arg):
+        """마이크 청크 크기/호스트 API 보정 (calibrate [설정당 측정 초])"""
+        self.voice_processor.calibrate_audio(float(arg) if arg.strip() else 2.0)
+
+    def cmd_customer(self, arg):
+        """고객 프로필 목록 보기/전환 (customer [이름])"""
+        name = arg.strip()
+        if not name:
+            active = self.settings_manager.active_profile
+            for profile in self.settings_manager.get_profiles():
+                print(("* " if profile == active else "  ") + profile)
+            return
+        started = time.time()
+        if self.sheet_handler.switch_profile(name):
+            print(f"프로필 전환 완료: {name} ({(time.time() - started) * 1000:.0f}ms), "
+                  f"현재 셀 {self.settings_manager.get_setting('last_cell', 'A1')}")
+
+def main():
+    """헤드리스 실행 진입점"""
+    from main import SettingsManager, GoogleSheetHandler
+    from speechtext import SimpleVoiceProcessor
+    from engine import VoicePipelineEngine
+    from billing import UsageAccountant
+    from audio_archive import AudioArchive
+    from capture_process import CaptureProcess
+    from history_store import HistoryStore
+
+    settings_manager = SettingsManager()
+    voice_processor = SimpleVoiceProcessor()
+    voice_processor.set_settings_manager(settings_manager)
+    voice_processor.set_usage_accountant(UsageAccountant(settings_manager))
+    voice_processor.set_audio_archive(AudioArchive.from_settings(settings_manager))
+    capture_process = CaptureProcess.from_settings(voice_processor, settings_manager)
+    if capture_process and capture_process.start():
+        voice_processor.set_capture_process(capture_process)
+    engine = VoicePipelineEngine.from_settings(settings_manager)
+    engine.start()
+    voice_processor.set_engine(engine)
+
+    sheet_handler = GoogleSheetHandler(settings_manager)
+    sheet_handler.set_target_spreadsheet(settings_manager.get_setting("last_spreadsheet", "음성기록"))
+    sheet_handler.set_target_sheet(settings_manager.get_setting("last_sheet", "시트1"))
+    recorder = SessionRecorder.from_settings(settings_manager)
+    if recorder:
+        recorder.attach(voice_processor, sheet_handler)
+
+    history_store = HistoryStore.from_settings(settings_manager)
+    controller = HeadlessController(voice_processor, sheet_handler, settings_manager, engine, history_store)
+    controller.cmd_help("")
+    try:
+        for line in sys.stdin:
+            if not controller.handle_command(line):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        voice_processor.is_recording = False
+        engine.stop()
+        if sheet_handler.mirror:
+            sheet_handler.mirror.close()
+        if sheet_handler.allocator:
+            sheet_handler.allocator.close()
+        history_store.close()
+        if voice_processor.usage:
+            voice_processor.usage.close()
+        if voice_processor.archive:
+            voice_processor.archive.close()
+        if voice_processor.capture_process:
+            voice_processor.capture_process.stop()
+        if recorder:
+            recorder.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import queue
+import sqlite3
+import threading
+import time
+
+class HistoryStore:
+    def __init__(self, path="transcript_history.db", flush_interval=0.5):
+        """인식 결과 기록을 로컬 SQLite에 저장하는 저장소 (쓰기는 백그라운드 스레드에서 일괄 처리)
+
+        텍스트에는 FTS5 전문 검색 색인을 두어 접두어 검색을 빠르게 처리합니다.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue()
+        self.read_lock = threading.Lock()
+
+        self.reader = sqlite3.connect(path, check_same_thread=False)
+        self.reader.execute("PRAGMA journal_mode=WAL")
+        self.reader.execute("""CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp REAL NOT NULL,
+            text TEXT NOT NULL,
+            confidence REAL,
+            spreadsheet TEXT,
+            sheet TEXT,
+            cell TEXT)""")
+        self.reader.execute("CREATE INDEX IF NOT EXISTS results_timestamp ON results (timestamp)")
+        self.fts = self.setup_fts()
+        self.reader.commit()
+        # 기록 번호는 저장할 때 SQLite가 부여 (같은 파일을 쓰는 다른 프로세스와 겹치지 않음)
+        # total은 저장 대기 중인 기록까지 포함한 기록 수 (화면 행 수)
+        self.total = self.reader.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self.count_lock = threading.Lock()
+
+        self.running = True
+        self.writer = threading.Thread(target=self.write_loop, daemon=True, name="history-writer")
+        self.writer.start()
+
+    def setup_fts(self):
+        """전문 검색 색인 생성 (FTS5를 쓸 수 없으면 LIKE 검색으로 대체)"""
+        try:
+            self.reader.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(
+                text, content='results', content_rowid='id', prefix='1 2 3')""")
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ 전문 검색 색인을 사용할 수 없습니다 (일반 검색 사용): {e}")
+            return False
+        self.reader.execute("""CREATE TRIGGER IF NOT EXISTS results_ai AFTER INSERT ON results BEGIN
+            INSERT INTO results_fts (rowid, text) VALUES (new.id, new.text); END""")
+        self.reader.execute("""CREATE TRIGGER IF NOT EXISTS results_ad AFTER DELETE ON results BEGIN
+            INSERT INTO results_fts (results_fts, rowid, text) VALUES ('delete', old.id, old.text); END""")
+        self.reader.execute("""CREATE TRIGGER IF NOT EXISTS results_au AFTER UPDATE ON results BEGIN
+            INSERT INTO results_fts (results_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            INSERT INTO results_fts (rowid, text) VALUES (new.id, new.text); END""")
+        # 색인 도입 이전에 쌓인 기록은 한 번 색인
+        indexed = self.reader.execute("SELECT COUNT(*) FROM results_fts_docsize").fetchone()[0]
+        if indexed == 0 and self.reader.execute("SELECT COUNT(*) FROM results").fetchone()[0]:
+            print("🔎 기존 기록 검색 색인 생성 중...")
+            self.reader.execute("INSERT INTO results_fts (results_fts) VALUES ('rebuild')")
+        return True
+
+    @classmethod
+    def from_settings(cls, settings_manager):
+        """app_settings.json의 history 항목으로 생성"""
+        config = settings_manager.get_setting("history", {}) if settings_manager else {}
+        return cls(path=config.get("path", "transcript_history.db"))
+
+    def add(self, text, confidence=0.0, spreadsheet="", sheet="", cell=""):
+        """기록 추가 (즉시 반환, 저장은 백그라운드에서 하며 저장 후 record['id']가 채워짐)"""
+        record = {'id': None, 'timestamp': time.time(), 'text': text,
+                  'confidence': confidence or 0.0, 'spreadsheet': spreadsheet, 'sheet': sheet, 'cell': cell}
+        with self.count_lock:
+            self.total += 1
+        self.pending.put(record)
+        return record
+
+    def write_loop(self):
+        """대기 중인 기록을 모아 한 트랜잭션으로 저장"""
+        connection = sqlite3.connect(self.path)
+        while self.running or not self.pending.empty():
+            try:
+                batch = [self.pending.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with connection:
+                    for record in batch:
+                        cursor = connection.execute(
+                            "INSERT INTO results (timestamp, text, confidence, spreadsheet, sheet, cell) "
+                            "VALUES (:timestamp, :text, :confidence, :spreadsheet, :sheet, :cell)", record)
+                        record['id'] = cursor.lastrowid
+            except Exception as e:
+                print(f"기록 저장 오류: {e}")
+        connection.close()
+
+    def fetch_page(self, offset, limit):
+        """저장 순서로 offset번째(0부터) 기록부터 limit개 반환"""
+        with self.read_lock:
+            cursor = self.reader.execute(
+                "SELECT id, timestamp, text, confidence, spreadsheet, sheet, cell FROM results "
+                "ORDER BY id LIMIT ? OFFSET ?", (limit, offset))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def search(self, query, limit=100, since=None, spreadsheet=None, sheet=None):
+        """텍스트 검색 (단어마다 접두어 일치, 모두 포함), 최신순 기록 목록 반환"""
+        terms = query.split()
+        if not terms:
+            return []
+        conditions = []
+        params = []
+        if self.fts:
+            match = " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+            conditions.append("id IN (SELECT rowid FROM results_fts WHERE results_fts MATCH ?)")
+            params.append(match)
+        else:
+            for term in terms:
+                conditions.append("text LIKE ?")
+                params.append(f"%{term}%")
+        for column, operator, value in (('timestamp', '>=', since), ('spreadsheet', '=', spreadsheet),
+                                        ('sheet', '=', sheet)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        sql = ("SELECT id, timestamp, text, confidence, spreadsheet, sheet, cell FROM results WHERE "
+               + " AND ".join(conditions) + " ORDER BY id DESC LIMIT ?")
+        params.append(int(limit))
+        with self.read_lock:
+            cursor = self.reader.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        """남은 기록 저장 후 종료"""
+        self.running = False
+        self.writer.join(timeout=5)
+        with self.read_lock:
+            self.reader.close()
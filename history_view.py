@@ -0,0 +1,145 @@
+import time
+import tkinter as tk
+from tkinter import ttk, font as tkfont
+from collections import OrderedDict, deque
+
+class HistoryView:
+    def __init__(self, parent, store=None, capacity=500, visible_rows=8, page_size=100, max_pages=5,
+                 font=("Arial", 10)):
+        """보이는 행만 그리는 인식 기록 목록
+
+        최근 기록은 고정 크기 링에, 그 이전 기록은 저장소에서 페이지 단위로 읽어 옵니다.
+        추가 비용은 세션 길이와 관계없이 일정합니다.
+        """
+        self.store = store
+        self.ring = deque(maxlen=capacity)
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.pages = OrderedDict()  # 이전 기록 페이지 캐시 (LRU)
+        self.next_id = 1
+
+        self.font = tkfont.Font(font=font)
+        self.row_height = self.font.metrics("linespace") + 4
+
+        self.frame = ttk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, height=visible_rows * self.row_height, background="white",
+                                highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scroll)
+        self.canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+        self.items = []  # 화면 행마다 재사용하는 텍스트 아이템
+        self.total = store.total if store else 0
+        self.top = 0
+        self.follow = True  # 맨 아래를 보고 있으면 새 기록을 따라감
+
+        self.canvas.bind("<Configure>", lambda event: self.render())
+        self.canvas.bind("<MouseWheel>", lambda event: self.scroll_rows(-1 if event.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_rows(-1))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_rows(1))
+        self.canvas.bind("<Double-Button-1>", self.copy_row)
+
+    def set_store(self, store):
+        """기록 저장소 연결 (이전 세션 기록도 스크롤로 볼 수 있음)"""
+        self.store = store
+        self.ring.clear()
+        self.pages.clear()
+        self.total = store.total
+        self.top = max(0, self.total - self.visible_count())
+        self.follow = True
+        self.render()
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def visible_count(self):
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def append(self, text, confidence=0.0, spreadsheet="", sheet="", cell=""):
+        """기록 추가 (저장소가 있으면 백그라운드로 저장)"""
+        if self.store:
+            record = self.store.add(text, confidence, spreadsheet, sheet, cell)
+        else:
+            record = {'id': self.next_id, 'timestamp': time.time(), 'text': text, 'confidence': confidence or 0.0,
+                      'spreadsheet': spreadsheet, 'sheet': sheet, 'cell': cell}
+            self.next_id += 1
+        self.ring.append(record)
+        self.total += 1
+        if self.follow:
+            self.top = max(0, self.total - self.visible_count())
+        self.render()
+        return record
+
+    def get_record(self, index):
+        """행 번호(0부터)에 해당하는 기록 반환"""
+        # 링에는 마지막 기록들이 있음 (행 번호 total - len(ring)부터)
+        ring_start = self.total - len(self.ring)
+        if index >= ring_start:
+            offset = index - ring_start
+            return self.ring[offset] if offset < len(self.ring) else None
+        if not self.store:
+            return None
+        page, offset = divmod(index, self.page_size)
+        if page not in self.pages:
+            self.pages[page] = self.store.fetch_page(page * self.page_size, self.page_size)
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        self.pages.move_to_end(page)
+        records = self.pages[page]
+        return records[offset] if offset < len(records) else None
+
+    def format_record(self, record):
+        timestamp = time.strftime("%H:%M:%S", time.localtime(record['timestamp']))
+        if time.strftime("%Y%m%d", time.localtime(record['timestamp'])) != time.strftime("%Y%m%d"):
+            timestamp = time.strftime("%m-%d %H:%M", time.localtime(record['timestamp']))
+        text = f"[{timestamp}] {record['text']}"
+        if record['confidence']:
+            text += f" (신뢰도: {record['confidence']:.2f})"
+        if record['cell']:
+            text += f" → {record['cell']}"
+        return text
+
+    def render(self):
+        """보이는 행만 다시 그림"""
+        rows = self.visible_count()
+        while len(self.items) < rows:
+            y = len(self.items) * self.row_height + 2
+            self.items.append(self.canvas.create_text(4, y, anchor=tk.NW, font=self.font, text=""))
+        while len(self.items) > rows:
+            self.canvas.delete(self.items.pop())
+
+        self.top = max(0, min(self.top, self.total - rows))
+        for row, item in enumerate(self.items):
+            index = self.top + row
+            record = self.get_record(index) if index < self.total else None
+            self.canvas.itemconfigure(item, text=self.format_record(record) if record else "")
+
+        if self.total:
+            self.scrollbar.set(self.top / self.total, min(1.0, (self.top + rows) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_rows(self, count):
+        self.top += count
+        self.top = max(0, min(self.top, self.total - self.visible_count()))
+        self.follow = self.top >= self.total - self.visible_count()
+        self.render()
+
+    def on_scroll(self, action, value, unit=None):
+        """스크롤바 명령 처리 (moveto 비율 / scroll 단위)"""
+        if action == "moveto":
+            self.top = int(float(value) * self.total)
+            self.scroll_rows(0)
+        elif action == "scroll":
+            step = self.visible_count() if unit == "pages" else 1
+            self.scroll_rows(int(value) * step)
+
+    def copy_row(self, event):
+        """더블클릭한 행의 텍스트를 클립보드에 복사"""
+        index = self.top + event.y // self.row_height
+        record = self.get_record(index) if index < self.total else None
+        if record:
+            self.canvas.clipboard_clear()
+            self.canvas.clipboard_append(record['text'])
@@ -0,0 +1,197 @@
+import argparse
+import contextlib
+import glob
+import os
+import random
+import tempfile
+import threading
+import time
+import numpy as np
+from gateway import percentile
+from audio_utils import pcm_to_wav_bytes
+
+class LoadMetrics:
+    def __init__(self):
+        """부하 테스트 결과 수집"""
+        self.records = []
+        self.lock = threading.Lock()
+
+    def add(self, record):
+        with self.lock:
+            self.records.append(record)
+
+    def summary(self, offered_per_min, duration):
+        """구간 요약: 처리량, 지연시간 백분위수, 오류/폴백 비율"""
+        with self.lock:
+            records = list(self.records)
+        count = len(records)
+        summary = {
+            'offered_per_min': offered_per_min,
+            'completed': count,
+            'throughput_per_min': count * 60.0 / duration,
+            'error_rate': sum(1 for r in records if not r['transcribed']) / count if count else 0.0,
+            'fallback_rate': sum(1 for r in records if r['transcribed'] and not r['saved']) / count if count else 0.0
+        }
+        for key in ('queue_wait', 'transcribe', 'sheet', 'total'):
+            values = [r[key] for r in records]
+            summary[f'{key}_p50'] = percentile(values, 0.50)
+            summary[f'{key}_p95'] = percentile(values, 0.95)
+            summary[f'{key}_p99'] = percentile(values, 0.99)
+        return summary
+
+class VirtualStation(threading.Thread):
+    def __init__(self, index, voice_processor, sheet_handler, fixtures, rate_per_min, stop_event, metrics):
+        """발화가 무작위(포아송) 간격으로 도착하는 가상 녹음 스테이션"""
+        super().__init__(daemon=True, name=f"station-{index}")
+        self.voice_processor = voice_processor
+        self.sheet_handler = sheet_handler
+        self.fixtures = fixtures
+        self.rate_per_second = rate_per_min / 60.0
+        self.stop_event = stop_event
+        self.metrics = metrics
+        self.column = chr(ord('A') + index % 26)
+        self.row = 1
+
+    def run(self):
+        next_arrival = time.time() + random.expovariate(self.rate_per_second)
+        while not self.stop_event.is_set():
+            # 도착 시각까지 대기 (이전 발화 처리가 늦어지면 바로 처리 → 대기 시간에 반영)
+            if self.stop_event.wait(max(0.0, next_arrival - time.time())):
+                break
+            arrival = next_arrival
+            next_arrival += random.expovariate(self.rate_per_second)
+
+            started = time.time()
+            wav = random.choice(self.fixtures)
+            text, confidence, transcribed = self.voice_processor.transcribe(wav)
+            transcribed_at = time.time()
+            saved = False
+            if transcribed:
+                saved = self.sheet_handler.save_to_sheet(text, confidence, f"{self.column}{self.row}")
+                self.row += 1
+            finished = time.time()
+
+            self.metrics.add({
+                'queue_wait': started - arrival,
+                'transcribe': transcribed_at - started,
+                'sheet': finished - transcribed_at,
+                'total': finished - arrival,
+                'transcribed': transcribed,
+                'saved': saved
+            })
+
+def load_fixtures(paths, rate=16000):
+    """WAV 파일 목록 불러오기 (없으면 3초 합성 음성 사용)"""
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.wav"))) if os.path.isdir(path) else [path])
+    fixtures = []
+    for path in files:
+        with open(path, 'rb') as f:
+            fixtures.append(f.read())
+    if not fixtures:
+        samples = (np.sin(np.arange(rate * 3) * 2 * np.pi * 220 / rate) * 3000).astype(np.int16)
+        fixtures.append(pcm_to_wav_bytes(samples.tobytes(), rate))
+    return fixtures
+
+def run_step(stations, rate_per_station, duration, make_station_clients, fixtures):
+    """정해진 부하로 한 구간 실행 후 요약 반환"""
+    metrics = LoadMetrics()
+    stop_event = threading.Event()
+    workers = []
+    for index in range(stations):
+        voice_processor, sheet_handler = make_station_clients(index)
+        workers.append(VirtualStation(index, voice_processor, sheet_handler, fixtures,
+                                      rate_per_station, stop_event, metrics))
+    started = time.time()
+    for worker in workers:
+        worker.start()
+    time.sleep(duration)
+    stop_event.set()
+    for worker in workers:
+        worker.join(timeout=120)
+    return metrics.summary(stations * rate_per_station, time.time() - started)
+
+def is_saturated(summary, latency_slo):
+    """처리량이 제공 부하를 따라가지 못하거나, 오류/지연이 기준을 넘으면 포화"""
+    return (summary['throughput_per_min'] < summary['offered_per_min'] * 0.9
+            or summary['error_rate'] + summary['fallback_rate'] > 0.05
+            or summary['total_p95'] > latency_slo)
+
+def print_summary(summary):
+    print(f"  제공 부하 {summary['offered_per_min']:.0f}/분 → 처리 {summary['throughput_per_min']:.1f}/분 "
+          f"(완료 {summary['completed']}건)")
+    print(f"  지연(초) 인식 p50 {summary['transcribe_p50']:.2f} / p95 {summary['transcribe_p95']:.2f} / "
+          f"p99 {summary['transcribe_p99']:.2f}, 시트 p95 {summary['sheet_p95']:.2f}, "
+          f"대기 p95 {summary['queue_wait_p95']:.2f}, 전체 p95 {summary['total_p95']:.2f}")
+    print(f"  오류율 {summary['error_rate'] * 100:.1f}%, CSV 폴백율 {summary['fallback_rate'] * 100:.1f}%")
+
+def main():
+    """부하 테스트 명령행 진입점"""
+    parser = argparse.ArgumentParser(description="인식/시트 입력 경로 동시 부하 테스트")
+    parser.add_argument("--stations", type=int, default=10, help="가상 스테이션 수")
+    parser.add_argument("--rates", default="2,4,8,16", help="스테이션당 분당 발화 수 (쉼표로 구분하면 단계별 증가)")
+    parser.add_argument("--duration", type=float, default=30, help="단계별 실행 시간(초)")
+    parser.add_argument("--fixtures", nargs="*", default=[], help="재생할 WAV 파일 또는 폴더")
+    parser.add_argument("--target-url", help="인식 서버 URL (없으면 로컬 대역 서버)")
+    parser.add_argument("--real-sheets", action="store_true", help="실제 구글 시트에 기록 (주의)")
+    parser.add_argument("--backend-latency-ms", type=float, default=400)
+    parser.add_argument("--backend-concurrency", type=int, default=20, help="대역 서버 동시 처리 한도")
+    parser.add_argument("--sheets-quota", type=int, default=60, help="대역 시트의 분당 할당량")
+    parser.add_argument("--latency-slo", type=float, default=5.0, help="전체 p95 지연 기준(초)")
+    args = parser.parse_args()
+
+    from speechtext import SimpleVoiceProcessor
+    from main import GoogleSheetHandler, SettingsManager
+    from standins import StandInTranscribeServer, StandInSheetsClient
+
+    backend = None
+    target_url = args.target_url
+    if not target_url:
+        backend = StandInTranscribeServer(latency_ms=args.backend_latency_ms,
+                                          max_concurrent=args.backend_concurrency).start()
+        target_url = backend.url
+    fixtures = load_fixtures(args.fixtures)
+    fallback_dir = tempfile.mkdtemp(prefix="load_test_")
+
+    def make_station_clients(index):
+        # 실제 배포처럼 스테이션마다 별도 처리기/핸들러, 시트 할당량은 같은 서비스 계정이 공유
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            voice_processor = SimpleVoiceProcessor(api_url=target_url)
+            if args.real_sheets:
+                sheet_handler = GoogleSheetHandler(SettingsManager())
+            else:
+                sheet_handler = GoogleSheetHandler(gc=shared_sheets)
+                sheet_handler.set_target_sheet("시트1")
+        sheet_handler.local_file = os.path.join(fallback_dir, f"station_{index}.csv")
+        return voice_processor, sheet_handler
+
+    print(f"🚀 부하 테스트: 스테이션 {args.stations}개, 대상 {target_url}, "
+          f"시트 {'실제' if args.real_sheets else '대역'}")
+    saturation = None
+    last_ok = None
+    for rate in [float(r) for r in args.rates.split(",")]:
+        shared_sheets = StandInSheetsClient(per_minute_quota=args.sheets_quota)
+        print(f"\n▶ 스테이션당 {rate:g}회/분 ({args.duration:g}초)")
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            summary = run_step(args.stations, rate, args.duration, make_station_clients, fixtures)
+        print_summary(summary)
+        if is_saturated(summary, args.latency_slo):
+            saturation = summary
+            print("  ⚠️ 포화 상태")
+            break
+        last_ok = summary
+
+    print("\n📊 결과")
+    if saturation and last_ok:
+        print(f"  포화 지점: 분당 {last_ok['offered_per_min']:.0f} ~ {saturation['offered_per_min']:.0f}회 사이")
+    elif saturation:
+        print(f"  첫 단계부터 포화: 분당 {saturation['offered_per_min']:.0f}회")
+    else:
+        print(f"  최대 부하 분당 {last_ok['offered_per_min']:.0f}회까지 포화 없음")
+    print(f"  CSV 폴백 파일: {fallback_dir}")
+    if backend:
+        backend.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import time
+import concurrent.futures
+import numpy as np
+from audio_utils import pcm_to_wav_bytes
+
+class MemoryAudio:
+    def __init__(self, pcm, rate=16000, channels=1, sample_width=2):
+        """메모리 상의 PCM을 AudioSpool과 같은 방식으로 읽기 위한 래퍼"""
+        self.pcm = memoryview(pcm)
+        self.size = len(pcm)
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+
+    def duration(self):
+        return self.size / (self.rate * self.channels * self.sample_width)
+
+    def byte_offset(self, seconds):
+        frame = self.channels * self.sample_width
+        return min(self.size, int(seconds * self.rate) * frame)
+
+    def iter_views(self, start=0, end=None):
+        end = self.size if end is None else min(end, self.size)
+        yield self.pcm[start:end]
+
+    def read(self, start, end):
+        return bytes(self.pcm[start:end])
+
+def compute_frame_rms(audio, frame_ms=30):
+    """오디오 전체의 프레임별 RMS 계산 (세그먼트 경계에 걸친 프레임은 이어 붙여 처리)"""
+    frame_bytes = int(audio.rate * frame_ms / 1000) * 2
+    values = []
+    carry = b''
+    for view in audio.iter_views():
+        if carry:
+            need = frame_bytes - len(carry)
+            carry += bytes(view[:need])
+            view = view[need:]
+            if len(carry) < frame_bytes:
+                continue
+            samples = np.frombuffer(carry, dtype=np.int16).astype(np.float32)
+            values.append(np.sqrt(np.mean(samples * samples, keepdims=True)))
+            carry = b''
+        count = len(view) // frame_bytes
+        if count:
+            frames = np.frombuffer(view[:count * frame_bytes], dtype=np.int16).astype(np.float32)
+            frames = frames.reshape(count, frame_bytes // 2)
+            values.append(np.sqrt(np.mean(frames * frames, axis=1)))
+        carry = bytes(view[count * frame_bytes:])
+    return (np.concatenate(values) if values else np.zeros(0)), frame_bytes
+
+def find_segments(audio, target_seconds=45, max_seconds=55, min_silence_ms=300,
+                  silence_threshold=300, frame_ms=30):
+    """무음 구간에서 잘라 max_seconds 이하 구간 목록 [(시작 바이트, 끝 바이트), ...] 반환
+
+    target_seconds 이후 가장 먼저 나오는 충분히 긴 무음의 가운데에서 자르고,
+    max_seconds까지 무음이 없으면 그 구간 안에서 가장 조용한 지점에서 자릅니다.
+    """
+    rms, frame_bytes = compute_frame_rms(audio, frame_ms)
+    total_frames = len(rms)
+    if total_frames == 0:
+        return [(0, audio.size)] if audio.size else []
+
+    silent = rms < silence_threshold
+    min_run = max(1, int(min_silence_ms / frame_ms))
+    max_frames = max(1, int(max_seconds * 1000 / frame_ms))
+    target_frames = min(int(target_seconds * 1000 / frame_ms), max_frames)
+
+    segments = []
+    start = 0
+    while start < total_frames:
+        if total_frames - start <= max_frames:
+            segments.append((start, total_frames))
+            break
+        cut = None
+        run = 0
+        for index in range(start + target_frames // 2, start + max_frames):
+            run = run + 1 if silent[index] else 0
+            if run >= min_run and index >= start + target_frames:
+                cut = index - run // 2
+                break
+        if cut is None:
+            # 무음이 없으면 후반부에서 가장 조용한 프레임에서 자름
+            window = rms[start + target_frames // 2:start + max_frames]
+            cut = start + target_frames // 2 + int(np.argmin(window))
+        # 구간 길이가 프레임 하나보다 짧게 설정되어도 항상 앞으로 진행
+        cut = max(cut, start + 1)
+        segments.append((start, cut))
+        start = cut
+
+    return [(s * frame_bytes, audio.size if e == total_frames else e * frame_bytes) for s, e in segments]
+
+class LongFormTranscriber:
+    def __init__(self, voice_processor, target_seconds=45, max_seconds=55, max_workers=4, max_retries=2,
+                 silence_threshold=300):
+        """긴 녹음을 무음 기준으로 나눠 병렬로 인식하고 순서대로 이어 붙이는 장문 인식기"""
+        self.voice_processor = voice_processor
+        self.target_seconds = target_seconds
+        self.max_seconds = max_seconds
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.silence_threshold = silence_threshold
+
+    @classmethod
+    def from_settings(cls, voice_processor, settings_manager):
+        """app_settings.json의 longform 항목으로 생성"""
+        config = settings_manager.get_setting("longform", {}) if settings_manager else {}
+        target_seconds = config.get("target_seconds", 45)
+        max_seconds = config.get("max_seconds", 55)
+        if not 1 <= target_seconds <= max_seconds:
+            print(f"⚠️ longform 구간 길이 설정 오류 (target {target_seconds}초, max {max_seconds}초) - 기본값 45/55초 사용")
+            target_seconds, max_seconds = 45, 55
+        return cls(voice_processor,
+                   target_seconds=target_seconds,
+                   max_seconds=max_seconds,
+                   max_workers=config.get("max_workers", 4),
+                   max_retries=config.get("max_retries", 2),
+                   silence_threshold=config.get("silence_threshold", 300))
+
+    def transcribe_segment(self, audio, index, start, end, priority='interactive'):
+        """구간 하나 인식 (실패 시 이 구간만 재시도)"""
+        processor = self.voice_processor
+        seconds = (end - start) / (audio.rate * audio.sample_width * audio.channels)
+        # 업로드 크기에 비례한 요청 제한 시간 (고정 60초 대신)
+        timeout = max(30, seconds * 2)
+        result = {'index': index, 'start_seconds': start / (audio.rate * audio.sample_width * audio.channels),
+                  'seconds': seconds, 'text': '', 'confidence': 0.0, 'attempts': 0, 'success': False}
+        for attempt in range(self.max_retries + 1):
+            result['attempts'] = attempt + 1
+            wav = pcm_to_wav_bytes(audio.read(start, end), audio.rate, audio.channels, audio.sample_width)
+            text, confidence, success = processor.transcribe(wav, timeout=timeout, priority=priority)
+            if success:
+                result.update(text=text, confidence=confidence, success=True)
+                break
+            result['text'] = text
+            if attempt < self.max_retries:
+                print(f"⚠️ 구간 {index + 1} 인식 실패 - 재시도 ({attempt + 1}/{self.max_retries})")
+                time.sleep(min(8, 2 ** attempt))
+        return result
+
+    def transcribe(self, audio, priority='interactive'):
+        """긴 오디오 인식, 구간별 결과를 포함한 딕셔너리 반환"""
+        started = time.time()
+        segments = find_segments(audio, self.target_seconds, self.max_seconds,
+                                 silence_threshold=self.silence_threshold)
+        print(f"✂️ 장문 인식: {audio.duration():.1f}초 → {len(segments)}개 구간 (동시 {self.max_workers}개)")
+
+        # 구간 데이터는 작업이 실행될 때 읽으므로 메모리에는 동시 작업 수만큼만 올라감
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix="longform") as executor:
+            futures = [executor.submit(self.transcribe_segment, audio, index, start, end, priority)
+                       for index, (start, end) in enumerate(segments)]
+            results = [future.result() for future in futures]
+
+        recognized = [r for r in results if r['success'] and r['text']]
+        total_seconds = sum(r['seconds'] for r in recognized)
+        confidence = (sum(r['confidence'] * r['seconds'] for r in recognized) / total_seconds
+                      if total_seconds else 0.0)
+        failed = [r['index'] + 1 for r in results if not r['success']]
+        if failed:
+            print(f"❌ 인식 실패 구간: {failed}")
+        print(f"✅ 장문 인식 완료: {time.time() - started:.1f}초 소요")
+
+        return {
+            'text': " ".join(r['text'] for r in recognized),
+            'confidence': confidence,
+            'success': not failed and bool(recognized),
+            'segments': results
+        }
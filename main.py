@@ -1,18 +1,35 @@
 import tkinter as tk
-import gspread
-from google.oauth2.service_account import Credentials
 import os
 import csv
 import json
+import threading
 from datetime import datetime
 from gui import SimpleVoiceGUI
 from speechtext import SimpleVoiceProcessor
+from engine import VoicePipelineEngine
+from rate_limiter import QuotaScheduler
+from billing import UsageAccountant
+from history_store import HistoryStore
+from audio_archive import AudioArchive
+from capture_process import CaptureProcess
+from sheet_mirror import SheetMirror
+from cell_allocator import CellAllocator
+from google_auth import get_shared_client
+from session_replay import SessionRecorder
+
+# 고객 프로필마다 따로 보관하는 설정 (나머지 설정은 모든 프로필이 공유)
+PROFILE_KEYS = ("allowed_spreadsheets", "last_spreadsheet", "last_sheet", "last_cell", "last_row", "last_col")
 
 class SettingsManager:
-    """설정 파일 관리 클래스"""
+    """설정 파일 관리 클래스 (profiles 항목이 있으면 고객 프로필별 설정 지원)"""
     def __init__(self, settings_file="app_settings.json"):
         self.settings_file = settings_file
+        # UI 스레드, 엔진 스레드, 복제/분배 스레드가 함께 쓰므로 변경과 저장은 잠금 안에서
+        self.lock = threading.RLock()
         self.settings = self.load_settings()
+        self.active_profile = self.settings.get("active_profile")
+        if self.active_profile not in self.settings.get("profiles", {}):
+            self.active_profile = None
     
     def load_settings(self):
         """설정 파일에서 설정 불러오기"""
@@ -32,7 +49,7 @@ class SettingsManager:
     def save_settings(self):
         """설정을 파일에 저장"""
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
+            with self.lock, open(self.settings_file, 'w', encoding='utf-8') as f:
                 json.dump(self.settings, f, ensure_ascii=False, indent=2)
                 print(f"✅ 설정 파일 저장 성공: {self.settings_file}")
         except Exception as e:
@@ -50,22 +67,58 @@ class SettingsManager:
         }
     
     def get_setting(self, key, default=None):
-        """설정값 가져오기"""
+        """설정값 가져오기 (현재 프로필에 있는 값이 우선)"""
+        if self.active_profile:
+            profile = self.settings["profiles"][self.active_profile]
+            if key in profile:
+                return profile[key]
         return self.settings.get(key, default)
     
     def set_setting(self, key, value):
-        """설정값 저장"""
-        self.settings[key] = value
-        self.save_settings()
+        """설정값 저장 (프로필별 설정은 현재 프로필에 저장)"""
+        with self.lock:
+            if self.active_profile and key in PROFILE_KEYS:
+                self.settings["profiles"][self.active_profile][key] = value
+            else:
+                self.settings[key] = value
+            self.save_settings()
+    
+    def get_profiles(self):
+        """고객 프로필 이름 목록"""
+        return list(self.settings.get("profiles", {}))
+    
+    def switch_profile(self, profile_name):
+        """현재 프로필 변경 (파일은 다시 읽지 않음)"""
+        if profile_name not in self.settings.get("profiles", {}):
+            print(f"❌ 프로필을 찾을 수 없습니다: {profile_name}")
+            return False
+        with self.lock:
+            self.active_profile = profile_name
+            self.settings["active_profile"] = profile_name
+            self.save_settings()
+        print(f"✅ 프로필 변경: {profile_name}")
+        return True
 
 class GoogleSheetHandler:
-    def __init__(self, settings_manager=None):
-        """구글 스프레드시트 핸들러"""
+    def __init__(self, settings_manager=None, gc=None):
+        """구글 스프레드시트 핸들러 (gc를 주면 해당 클라이언트 사용, 부하 테스트용 대역 등)"""
+        self.gc = gc
+        self.local_file = "음성인식_데이터_GoogleCloud.csv"  # 폴백 CSV 파일
         self.sheet = None
         self.spreadsheet = None  # 전체 스프레드시트 객체
         self.current_row = 1  # 현재 입력할 행 번호
         self.current_col = 1  # 현재 입력할 열 번호 (A열)
         self.settings_manager = settings_manager
+        # 스프레드시트 목록/워크시트 목록 캐시 (프로필 전환 시 다시 조회하지 않음)
+        self.catalog = None
+        self.worksheet_lists = {}
+        self.profile_targets = {}  # 프로필 -> (스프레드시트, 시트)
+        # Sheets/Drive API 할당량 관리 (읽기/쓰기/드라이브 버킷)
+        self.quota = QuotaScheduler.from_settings(settings_manager)
+        # 백업 스프레드시트 복제 (sheet_mirrors 설정이 있을 때만)
+        self.mirror = SheetMirror.from_settings(self, settings_manager)
+        # 여러 PC가 같은 시트에 쓸 때 행 블록 분배 (cell_allocation 설정이 있을 때만)
+        self.allocator = CellAllocator.from_settings(settings_manager)
         self.setup_google_sheet()
     
     def setup_google_sheet(self):
@@ -76,29 +129,14 @@ class GoogleSheetHandler:
             # Google Sheets 연결 활성화
             print("📊 Google Sheets 연결 활성화")
             
-            # 구글 인증
+            if self.gc is not None:
+                print("📊 전달받은 구글 시트 클라이언트 사용")
+                self.auto_detect_spreadsheet()
+                return
+            
+            # 구글 인증 (프로세스 공용 클라이언트, 캐시된 토큰 재사용)
             print("🔑 구글 인증 중...")
-            scope = [
-                "https://www.googleapis.com/auth/spreadsheets",
-                "https://www.googleapis.com/auth/drive"
-            ]
-            
-            # 서비스 계정 키 파일 사용
-            creds = Credentials.from_service_account_file(
-                "voicetext-472910-82f1fa0a8fbe.json", 
-                scopes=scope
-            )
-            
-            # 구글 시트 클라이언트 생성
-            print("📊 구글 시트 클라이언트 생성 중...")
-            self.gc = gspread.authorize(creds)
-            
-            # 서비스 계정 정보 출력 (디버깅용)
-            try:
-                service_account_info = creds.service_account_email
-                print(f"🔑 서비스 계정: {service_account_info}")
-            except Exception as e:
-                print(f"⚠️ 서비스 계정 정보 확인 실패: {e}")
+            self.gc = get_shared_client(self.settings_manager).gc
             
             # 자동 감지 방식으로 스프레드시트 설정
             print("🔍 스프레드시트 자동 감지 중...")
@@ -122,7 +160,8 @@ class GoogleSheetHandler:
             print(f"🔒 허용된 스프레드시트: {allowed_spreadsheets}")
             
             # 모든 스프레드시트 가져오기
-            all_spreadsheets = self.gc.openall()
+            all_spreadsheets = self.quota.call('drive', self.gc.openall)
+            self.catalog = all_spreadsheets
             print(f"📊 접근 가능한 스프레드시트: {[s.title for s in all_spreadsheets]}")
             
             # 허용된 스프레드시트 중에서 우선순위에 따라 선택
@@ -172,7 +211,7 @@ class GoogleSheetHandler:
             return "A1"
     
     def save_to_sheet(self, text, confidence, target_cell="A1"):
-        """스프레드시트에 데이터 저장 (사용자 지정 셀에 텍스트만 입력)"""
+        """스프레드시트에 데이터 저장 (사용자 지정 셀에 텍스트만 입력), 시트 저장 성공 여부 반환"""
         try:
             if self.sheet:
                 # 구글 스프레드시트에 저장 (텍스트만 지정된 셀에 입력)
@@ -189,13 +228,18 @@ class GoogleSheetHandler:
                         for char in col_letter:
                             col_num = col_num * 26 + (ord(char) - ord('A') + 1)
                         
+                        # 백업 시트 복제는 별도 작성기에서 동시에 진행 (원본 입력을 기다리게 하지 않음)
+                        if self.mirror and self.spreadsheet:
+                            self.mirror.submit(self.spreadsheet.title, self.sheet.title, target_cell, text, confidence)
+                        
                         # 지정된 셀에 텍스트만 입력 (타임스탬프, 신뢰도 없이)
-                        self.sheet.update_cell(row_num, col_num, text)
+                        self.quota.call('write', self.sheet.update_cell, row_num, col_num, text)
                         print(f"✅ 구글 스프레드시트에 텍스트 입력 완료: {text[:30]}...")
                         print(f"📍 입력 위치: {target_cell} 셀")
+                        return True
                     else:
                         print("❌ 잘못된 셀 위치 형식입니다. A1 형식으로 입력해주세요.")
-                        return
+                        return False
                         
                 except Exception as e:
                     print(f"구글 시트 저장 오류: {e}")
@@ -209,23 +253,16 @@ class GoogleSheetHandler:
                 
         except Exception as e:
             print(f"데이터 저장 오류: {e}")
+        return False
     
-    def get_all_spreadsheets(self):
-        """허용된 스프레드시트 목록만 가져오기 (보안 강화)"""
+    def get_all_spreadsheets(self, priority='maintenance', use_cache=False):
+        """허용된 스프레드시트 목록만 가져오기 (보안 강화, use_cache이면 마지막 조회 결과 사용)"""
         try:
             print("🔍 허용된 스프레드시트 목록 가져오기...")
             
             if not hasattr(self, 'gc') or not self.gc:
-                # gspread 클라이언트 다시 생성
-                scope = [
-                    "https://www.googleapis.com/auth/spreadsheets",
-                    "https://www.googleapis.com/auth/drive"
-                ]
-                creds = Credentials.from_service_account_file(
-                    "voicetext-472910-82f1fa0a8fbe.json", 
-                    scopes=scope
-                )
-                self.gc = gspread.authorize(creds)
+                # 공용 gspread 클라이언트 사용
+                self.gc = get_shared_client(self.settings_manager).gc
             
             # 설정에서 허용된 스프레드시트 목록 가져오기
             allowed_spreadsheets = []
@@ -237,7 +274,11 @@ class GoogleSheetHandler:
             print(f"🔒 허용된 스프레드시트: {allowed_spreadsheets}")
             
             # 모든 스프레드시트 가져오기
-            all_spreadsheets = self.gc.openall()
+            if use_cache and self.catalog is not None:
+                all_spreadsheets = self.catalog
+            else:
+                all_spreadsheets = self.quota.call('drive', self.gc.openall, priority=priority)
+                self.catalog = all_spreadsheets
             
             # 허용된 스프레드시트만 필터링
             filtered_spreadsheets = []
@@ -263,14 +304,16 @@ class GoogleSheetHandler:
             print(f"  3. 서비스 계정 이메일: {getattr(self.gc.auth, 'service_account_email', 'Unknown') if hasattr(self, 'gc') and self.gc else 'Unknown'}")
             return []
 
-    def get_all_sheets(self):
-        """모든 시트 목록 가져오기"""
+    def get_all_sheets(self, priority='maintenance', spreadsheet=None):
+        """모든 시트 목록 가져오기 (spreadsheet를 주면 현재 대상 대신 그 스프레드시트)"""
         try:
-            if not self.spreadsheet:
+            spreadsheet = spreadsheet or self.spreadsheet
+            if not spreadsheet:
                 return []
             
             # 모든 워크시트 가져오기
-            worksheets = self.spreadsheet.worksheets()
+            worksheets = self.quota.call('read', spreadsheet.worksheets, priority=priority)
+            self.worksheet_lists[spreadsheet.id] = worksheets
             
             # 모든 시트 반환
             all_sheets = []
@@ -286,22 +329,30 @@ class GoogleSheetHandler:
             print(f"모든 시트 목록 가져오기 실패: {e}")
             return []
     
+    def find_spreadsheet(self, spreadsheet_title):
+        """제목으로 스프레드시트 찾기 (대상은 바꾸지 않음, 없으면 None)"""
+        # 모든 스프레드시트 목록 가져오기 (방금 조회한 목록에 없을 때만 다시 조회)
+        all_spreadsheets = self.get_all_spreadsheets(priority='interactive', use_cache=True)
+        if spreadsheet_title not in [s['title'] for s in all_spreadsheets]:
+            all_spreadsheets = self.get_all_spreadsheets(priority='interactive')
+        
+        for spreadsheet_info in all_spreadsheets:
+            if spreadsheet_info['title'] == spreadsheet_title:
+                return spreadsheet_info['spreadsheet']
+        print(f"❌ 스프레드시트를 찾을 수 없습니다: {spreadsheet_title}")
+        return None
+    
     def set_target_spreadsheet(self, spreadsheet_title):
         """대상 스프레드시트 설정"""
         try:
-            # 모든 스프레드시트 목록 가져오기
-            all_spreadsheets = self.get_all_spreadsheets()
-            
-            for spreadsheet_info in all_spreadsheets:
-                if spreadsheet_info['title'] == spreadsheet_title:
-                    # 새로운 스프레드시트로 변경
-                    self.spreadsheet = spreadsheet_info['spreadsheet']
-                    self.sheet = None  # 현재 시트 초기화
-                    print(f"✅ 대상 스프레드시트 변경: {spreadsheet_title}")
-                    return True
-            
-            print(f"❌ 스프레드시트를 찾을 수 없습니다: {spreadsheet_title}")
-            return False
+            spreadsheet = self.find_spreadsheet(spreadsheet_title)
+            if spreadsheet is None:
+                return False
+            # 새로운 스프레드시트로 변경
+            self.spreadsheet = spreadsheet
+            self.sheet = None  # 현재 시트 초기화
+            print(f"✅ 대상 스프레드시트 변경: {spreadsheet_title}")
+            return True
             
         except Exception as e:
             print(f"스프레드시트 설정 오류: {e}")
@@ -334,30 +385,76 @@ class GoogleSheetHandler:
             print(f"허용된 스프레드시트 추가 오류: {e}")
             return False
 
+    def find_sheet(self, sheet_title, spreadsheet=None):
+        """제목으로 시트 찾기 (대상은 바꾸지 않음, 없으면 None)"""
+        spreadsheet = spreadsheet or self.spreadsheet
+        if not spreadsheet:
+            return None
+        
+        worksheets = self.quota.call('read', spreadsheet.worksheets)
+        for sheet in worksheets:
+            if sheet.title == sheet_title:
+                return sheet
+        print(f"❌ 시트를 찾을 수 없습니다: {sheet_title}")
+        return None
+    
     def set_target_sheet(self, sheet_title):
         """대상 시트 설정"""
         try:
-            if not self.spreadsheet:
+            sheet = self.find_sheet(sheet_title)
+            if sheet is None:
                 return False
+            self.sheet = sheet
+            print(f"✅ 대상 시트 변경: {sheet_title}")
+            return True
             
-            worksheets = self.spreadsheet.worksheets()
-            for sheet in worksheets:
-                if sheet.title == sheet_title:
-                    self.sheet = sheet
-                    print(f"✅ 대상 시트 변경: {sheet_title}")
-                    return True
-            
-            print(f"❌ 시트를 찾을 수 없습니다: {sheet_title}")
+        except Exception as e:
+            print(f"시트 설정 오류: {e}")
             return False
+    
+    def switch_profile(self, profile_name):
+        """고객 프로필 전환: 연결은 그대로 두고 대상 스프레드시트/시트만 바꿈
+
+        한 번 사용한 프로필은 이전 대상을 그대로 복원하고, 처음이면 캐시된 목록에서
+        프로필의 마지막 스프레드시트/시트를 찾습니다.
+        """
+        try:
+            if not self.settings_manager:
+                return False
+            previous = self.settings_manager.active_profile
+            if not self.settings_manager.switch_profile(profile_name):
+                return False
+            self.profile_targets[previous] = (self.spreadsheet, self.sheet)
+            
+            if profile_name in self.profile_targets:
+                self.spreadsheet, self.sheet = self.profile_targets[profile_name]
+                return True
+            
+            spreadsheets = self.get_all_spreadsheets(priority='interactive', use_cache=True)
+            if not spreadsheets:
+                self.spreadsheet, self.sheet = None, None
+                return True
+            last_spreadsheet = self.settings_manager.get_setting("last_spreadsheet")
+            titles = [s['title'] for s in spreadsheets]
+            self.spreadsheet = spreadsheets[titles.index(last_spreadsheet) if last_spreadsheet in titles else 0]['spreadsheet']
+            
+            key = self.spreadsheet.id
+            if key not in self.worksheet_lists:
+                self.worksheet_lists[key] = self.quota.call('read', self.spreadsheet.worksheets)
+            worksheets = self.worksheet_lists[key]
+            last_sheet = self.settings_manager.get_setting("last_sheet")
+            self.sheet = next((w for w in worksheets if w.title == last_sheet), worksheets[0] if worksheets else None)
+            print(f"✅ 프로필 대상: {self.spreadsheet.title}/{self.sheet.title if self.sheet else '-'}")
+            return True
             
         except Exception as e:
-            print(f"시트 설정 오류: {e}")
+            print(f"프로필 전환 오류: {e}")
             return False
     
     def save_to_local_file(self, timestamp, text, confidence):
         """로컬 CSV 파일에 저장 (Excel 호환 UTF-8 BOM 포함)"""
         try:
-            filename = "음성인식_데이터_GoogleCloud.csv"
+            filename = self.local_file
             
             # 파일이 없으면 헤더 추가
             file_exists = os.path.exists(filename)
@@ -394,12 +491,36 @@ def main():
         print("설정 관리자 초기화 중...")
         settings_manager = SettingsManager()
         print("설정 관리자 초기화 완료")
+        voice_processor.set_settings_manager(settings_manager)
+        
+        # 음성 인식 사용량 회계 (전송 오디오 시간, 과금 시간, 예산)
+        voice_processor.set_usage_accountant(UsageAccountant(settings_manager))
+        
+        # 녹음 원본 보관소 (audio_archive.enabled가 true일 때만)
+        voice_processor.set_audio_archive(AudioArchive.from_settings(settings_manager))
+        
+        # 별도 프로세스 캡처 (capture_process.enabled가 true일 때만, 실패 시 기존 방식)
+        capture_process = CaptureProcess.from_settings(voice_processor, settings_manager)
+        if capture_process and capture_process.start():
+            voice_processor.set_capture_process(capture_process)
+        
+        # 처리 엔진 초기화 (녹음/인식/시트 입력 단계를 하나의 엔진에서 처리)
+        print("처리 엔진 초기화 중...")
+        engine = VoicePipelineEngine.from_settings(settings_manager)
+        engine.start()
+        voice_processor.set_engine(engine)
+        print("처리 엔진 초기화 완료")
         
         # 구글 스프레드시트 핸들러 초기화
         print("구글 스프레드시트 핸들러 초기화 중...")
         sheet_handler = GoogleSheetHandler(settings_manager)
         print("구글 스프레드시트 핸들러 초기화 완료")
         
+        # 세션 기록 (session_recording.enabled가 true일 때만, 재현/성능 시험용)
+        recorder = SessionRecorder.from_settings(settings_manager)
+        if recorder:
+            recorder.attach(voice_processor, sheet_handler)
+        
         # GUI 초기화
         print("GUI 초기화 중...")
         gui = SimpleVoiceGUI(root)
@@ -417,8 +538,45 @@ def main():
         gui.set_settings_manager(settings_manager)
         print("스프레드시트 핸들러 연결 완료")
         
+        # 인식 기록 저장소 (로컬 SQLite, 이전 기록은 목록 스크롤 시 읽어 옴)
+        history_store = HistoryStore.from_settings(settings_manager)
+        gui.set_history_store(history_store)
+        
         print("모든 초기화 완료 - GUI 창이 표시됩니다")
         
+        # 창을 닫으면 남은 작업을 정리하고 엔진 종료
+        def on_close():
+            voice_processor.is_recording = False
+            root.protocol("WM_DELETE_WINDOW", lambda: None)  # 종료 중 다시 누르면 무시
+            gui.update_status("⏳ 남은 작업 처리 후 종료합니다...", "orange")
+            # 남은 결과의 화면 반영이 UI 큐를 거치므로 엔진 종료는 작업 스레드에서 기다리고 UI는 계속 처리
+            stopper = threading.Thread(target=engine.stop, daemon=True, name="engine-stop")
+            stopper.start()
+            finish_close(stopper)
+        
+        def finish_close(stopper):
+            if stopper.is_alive():
+                root.after(100, finish_close, stopper)
+                return
+            gui.drain_ui_queue()  # 마지막 결과의 기록 목록 반영
+            gui.save_cell_cursor()
+            gui.background.shutdown(wait=False, cancel_futures=True)
+            if sheet_handler.mirror:
+                sheet_handler.mirror.close()
+            if sheet_handler.allocator:
+                sheet_handler.allocator.close()
+            history_store.close()
+            if voice_processor.usage:
+                voice_processor.usage.close()
+            if voice_processor.archive:
+                voice_processor.archive.close()
+            if voice_processor.capture_process:
+                voice_processor.capture_process.stop()
+            if recorder:
+                recorder.close()
+            root.destroy()
+        root.protocol("WM_DELETE_WINDOW", on_close)
+        
         # GUI 실행
         root.mainloop()
         
@@ -0,0 +1,366 @@
+import sys
+import json
+import threading
+import time
+from collections import deque
+import numpy as np
+from audio_sources import PyAudioSource
+from gateway import next_cell_address
+
+class UtteranceSegmenter:
+    def __init__(self, rate=16000, threshold=300, min_silence_ms=700, max_utterance_seconds=50, preroll_ms=300):
+        """에너지 기반 VAD: 연속 입력에서 발화 단위로 잘라냄"""
+        self.rate = rate
+        self.threshold = threshold
+        self.min_silence_ms = min_silence_ms
+        self.max_utterance_bytes = int(max_utterance_seconds * rate) * 2
+        self.preroll_ms = preroll_ms
+
+        self.buffer = bytearray()
+        self.in_speech = False
+        self.silence_ms = 0.0
+        self.preroll = deque()
+        self.preroll_total_ms = 0.0
+
+    def feed(self, pcm):
+        """PCM 블록 입력, 완성된 발화 목록 반환"""
+        block_ms = len(pcm) / 2 / self.rate * 1000
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+        utterances = []
+
+        if not self.in_speech:
+            if rms >= self.threshold:
+                # 발화 시작: 직전 무음 일부(프리롤)를 포함
+                self.in_speech = True
+                self.silence_ms = 0.0
+                self.buffer = bytearray(b''.join(self.preroll))
+                self.buffer += pcm
+                self.preroll.clear()
+                self.preroll_total_ms = 0.0
+            else:
+                self.preroll.append(bytes(pcm))
+                self.preroll_total_ms += block_ms
+                while self.preroll and self.preroll_total_ms > self.preroll_ms:
+                    removed = self.preroll.popleft()
+                    self.preroll_total_ms -= len(removed) / 2 / self.rate * 1000
+            return utterances
+
+        self.buffer += pcm
+        self.silence_ms = self.silence_ms + block_ms if rms < self.threshold else 0.0
+        if self.silence_ms >= self.min_silence_ms or len(self.buffer) >= self.max_utterance_bytes:
+            utterances.append(bytes(self.buffer))
+            self.buffer = bytearray()
+            self.in_speech = False
+        return utterances
+
+    def flush(self):
+        """남은 발화 반환 (녹음 중지 시)"""
+        remaining = bytes(self.buffer) if self.in_speech else b''
+        self.buffer = bytearray()
+        self.in_speech = False
+        self.preroll.clear()
+        self.preroll_total_ms = 0.0
+        return [remaining] if remaining else []
+
+    def buffered_bytes(self):
+        return len(self.buffer) + sum(len(block) for block in self.preroll)
+
+class StationChannel:
+    def __init__(self, config, manager):
+        """마이크(또는 다채널 장치의 한 채널) 하나에 해당하는 독립 녹음 스테이션"""
+        self.name = config["name"]
+        self.device_index = config.get("device_index")
+        self.channel = config.get("channel", 0)
+        self.spreadsheet = config["spreadsheet"]
+        self.sheet = config["sheet"]
+        self.cell = config.get("cell", "A1").strip().upper()
+        self.manager = manager
+
+        self.is_recording = False
+        self.segmenter = UtteranceSegmenter(manager.voice_processor.RATE,
+                                            threshold=config.get("vad_threshold", 300),
+                                            min_silence_ms=config.get("min_silence_ms", 700))
+        self.lock = threading.Lock()
+
+        # 채널별 자원 사용량
+        self.cpu_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.utterances = 0
+        self.results = 0
+        self.pending_jobs = 0
+
+    def on_audio(self, pcm):
+        """장치 캡처 스레드에서 호출: VAD 후 발화를 처리 엔진에 제출"""
+        if not self.is_recording:
+            return
+        started = time.thread_time()
+        with self.lock:
+            utterances = self.segmenter.feed(pcm)
+        self.audio_seconds += len(pcm) / 2 / self.manager.voice_processor.RATE
+        for utterance in utterances:
+            self.submit(utterance)
+        self.cpu_seconds += time.thread_time() - started
+
+    def submit(self, pcm):
+        """발화 하나를 공유 엔진에 제출"""
+        job = {'processor': self.manager.voice_processor, 'pcm': pcm, 'sink': self.deliver, 'stream': self.name,
+               'on_error': lambda message: print(f"[{self.name}] {message}")}
+        future = self.manager.engine.submit(job)
+        if future is not None:
+            self.utterances += 1
+            self.pending_jobs += 1
+            future.add_done_callback(self.job_done)
+        else:
+            print(f"⚠️ [{self.name}] 처리 대기열이 가득 차 발화를 버렸습니다")
+
+    def job_done(self, future):
+        with self.lock:
+            self.pending_jobs -= 1
+
+    def deliver(self, text, confidence):
+        """인식 결과를 스테이션 대상 셀로 전달"""
+        if not text or text.startswith("["):
+            print(f"❌ [{self.name}] {text}")
+            return {'spreadsheet': self.spreadsheet, 'sheet': self.sheet, 'cell': ''}
+        with self.lock:
+            cell = self.cell
+            allocator = self.manager.sheet_writer.sheet_handler.allocator
+            if allocator:
+                # 다른 PC의 스테이션과 같은 시트를 쓰면 겹치지 않는 행을 받음
+                cell = allocator.next_cell(self.spreadsheet, self.sheet, cell)
+            self.cell = next_cell_address(cell)
+        self.manager.sheet_writer.enqueue(self.spreadsheet, self.sheet, cell, text, confidence)
+        self.manager.cursor_moved()
+        if self.manager.history_store:
+            self.manager.history_store.add(text, confidence, self.spreadsheet, self.sheet, cell)
+        self.results += 1
+        print(f"✅ [{self.name}] {text} → {self.spreadsheet}/{self.sheet}!{cell}")
+        return {'spreadsheet': self.spreadsheet, 'sheet': self.sheet, 'cell': cell}
+
+    def start(self):
+        self.is_recording = True
+        print(f"🎙️ [{self.name}] 녹음 시작")
+
+    def stop(self):
+        self.is_recording = False
+        with self.lock:
+            remaining = self.segmenter.flush()
+        for utterance in remaining:
+            self.submit(utterance)
+        print(f"⏹️ [{self.name}] 녹음 중지")
+
+class DeviceCapture(threading.Thread):
+    def __init__(self, device_index, channels, stations, voice_processor):
+        """입력 장치 하나를 열고 채널별로 분리해 각 스테이션에 전달하는 캡처 스레드
+
+        장치 읽기는 audio_sources.PyAudioSource를 사용하므로 연속 읽기 오류가 이어지면 캡처를 끝내고,
+        장치 열기/읽기 실패 사유는 error에 남겨 보고서에 표시합니다."""
+        super().__init__(daemon=True, name=f"capture-{device_index}")
+        self.device_index = device_index
+        self.channels = channels
+        self.stations = stations
+        self.source = PyAudioSource(voice_processor.RATE, channels, voice_processor.CHUNK, device_index=device_index)
+        self.running = True
+        self.cpu_seconds = 0.0
+        self.error = None
+
+    @property
+    def read_errors(self):
+        return self.source.read_errors
+
+    def run(self):
+        try:
+            self.source.open()
+        except Exception as e:
+            self.error = f"장치 열기 실패: {e}"
+            print(f"❌ 장치 {self.device_index} 열기 실패: {e}")
+            self.source.close()
+            return
+        try:
+            while self.running:
+                data = self.source.read_block()
+                if data is None:
+                    self.error = "읽기 오류가 계속되어 캡처 중단"
+                    print(f"❌ 장치 {self.device_index} 캡처 중단 (장치 연결 확인)")
+                    break
+                started = time.thread_time()
+                frames = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+                split = {station: frames[:, station.channel].tobytes() for station in self.stations}
+                self.cpu_seconds += time.thread_time() - started
+                for station, pcm in split.items():
+                    station.on_audio(pcm)
+        finally:
+            self.source.close()
+
+class MultiStationManager:
+    def __init__(self, settings_manager, voice_processor, sheet_writer, engine, history_store=None,
+                 cursor_save_seconds=10.0):
+        """한 프로세스에서 여러 마이크/채널 스테이션을 동시에 운영 (네트워크 클라이언트는 공유)
+
+        스테이션별 다음 셀 위치는 메모리에서 관리하고 cursor_save_seconds마다(바뀐 경우만)와 종료 시
+        설정 파일에 저장합니다."""
+        self.settings_manager = settings_manager
+        self.voice_processor = voice_processor
+        self.sheet_writer = sheet_writer
+        self.engine = engine
+        self.history_store = history_store
+        self.cursor_lock = threading.Lock()
+        self.cursors_dirty = False
+
+        configs = settings_manager.get_setting("stations", [])
+        self.stations = {config["name"]: StationChannel(config, self) for config in configs}
+
+        # 같은 장치를 쓰는 스테이션은 하나의 다채널 스트림을 공유
+        devices = {}
+        for config in configs:
+            devices.setdefault(config.get("device_index"), []).append(self.stations[config["name"]])
+        self.captures = []
+        for device_index, stations in devices.items():
+            channels = max(station.channel for station in stations) + 1
+            self.captures.append(DeviceCapture(device_index, channels, stations, voice_processor))
+        self.started_at = time.time()
+
+        self.stop_event = threading.Event()
+        self.cursor_saver = threading.Thread(target=self.save_loop, args=(cursor_save_seconds,), daemon=True,
+                                             name="station-cursors")
+        self.cursor_saver.start()
+
+    def cursor_moved(self):
+        """스테이션 셀 위치가 바뀌었음을 표시 (설정 파일 저장은 save_cursors에서)"""
+        with self.cursor_lock:
+            self.cursors_dirty = True
+
+    def save_cursors(self):
+        """바뀐 스테이션별 다음 셀 위치를 설정 파일의 stations에 저장"""
+        with self.cursor_lock:
+            if not self.cursors_dirty:
+                return
+            self.cursors_dirty = False
+        cursors = {}
+        for name, station in self.stations.items():
+            with station.lock:
+                cursors[name] = station.cell
+        try:
+            configs = self.settings_manager.get_setting("stations", [])
+            for config in configs:
+                if config["name"] in cursors:
+                    config["cell"] = cursors[config["name"]]
+            self.settings_manager.set_setting("stations", configs)
+        except Exception as e:
+            print(f"⚠️ 스테이션 셀 위치 저장 실패: {e}")
+            with self.cursor_lock:
+                self.cursors_dirty = True
+
+    def save_loop(self, interval):
+        while not self.stop_event.wait(interval):
+            self.save_cursors()
+
+    def close(self):
+        """주기 저장 중지 후 마지막 셀 위치 저장"""
+        self.stop_event.set()
+        self.save_cursors()
+
+    def start_capture(self):
+        for capture in self.captures:
+            capture.start()
+        print(f"🎧 장치 {len(self.captures)}개, 스테이션 {len(self.stations)}개 캡처 시작")
+
+    def stop_capture(self):
+        for station in self.stations.values():
+            station.stop()
+        for capture in self.captures:
+            capture.running = False
+        for capture in self.captures:
+            capture.join(timeout=2)
+
+    def select(self, name):
+        """이름(또는 all)으로 스테이션 목록 선택"""
+        if name in ("", "all"):
+            return list(self.stations.values())
+        return [self.stations[name]] if name in self.stations else []
+
+    def get_report(self):
+        """채널별 CPU/메모리/처리량 보고 (하드웨어 산정용)"""
+        elapsed = max(1e-6, time.time() - self.started_at)
+        report = {}
+        for capture in self.captures:
+            # 장치 스트림 분리 비용은 채널 수로 나눠 배분
+            shared_cpu = capture.cpu_seconds / len(capture.stations)
+            for station in capture.stations:
+                cpu = station.cpu_seconds + shared_cpu
+                report[station.name] = {
+                    'recording': station.is_recording,
+                    'device_index': capture.device_index,
+                    'channel': station.channel,
+                    'cpu_percent': cpu / elapsed * 100,
+                    'buffered_bytes': station.segmenter.buffered_bytes(),
+                    'audio_seconds': round(station.audio_seconds, 1),
+                    'utterances': station.utterances,
+                    'results': station.results,
+                    'pending_jobs': station.pending_jobs,
+                    'read_errors': capture.read_errors,
+                    'capture_error': capture.error
+                }
+        return report
+
+def main():
+    """다중 스테이션 실행 진입점 (명령: start/stop [이름|all], report, quit)"""
+    from main import SettingsManager, GoogleSheetHandler
+    from speechtext import SimpleVoiceProcessor
+    from engine import VoicePipelineEngine
+    from sheet_writer import SheetBatchWriter
+    from billing import UsageAccountant
+    from audio_archive import AudioArchive
+    from history_store import HistoryStore
+
+    settings_manager = SettingsManager()
+    voice_processor = SimpleVoiceProcessor()
+    voice_processor.set_settings_manager(settings_manager)
+    voice_processor.set_usage_accountant(UsageAccountant(settings_manager))
+    voice_processor.set_audio_archive(AudioArchive.from_settings(settings_manager))
+    engine = VoicePipelineEngine.from_settings(settings_manager)
+    engine.start()
+    sheet_writer = SheetBatchWriter(GoogleSheetHandler(settings_manager))
+
+    history_store = HistoryStore.from_settings(settings_manager)
+    manager = MultiStationManager(settings_manager, voice_processor, sheet_writer, engine, history_store)
+    if not manager.stations:
+        print("❌ app_settings.json에 stations 설정이 없습니다")
+        return
+    manager.start_capture()
+    print("명령: start [이름|all], stop [이름|all], report, quit")
+    try:
+        for line in sys.stdin:
+            parts = line.strip().split(maxsplit=1)
+            if not parts:
+                continue
+            command, arg = parts[0].lower(), (parts[1] if len(parts) > 1 else "all")
+            if command in ("quit", "exit"):
+                break
+            elif command in ("start", "stop"):
+                for station in manager.select(arg):
+                    getattr(station, command)()
+            elif command == "report":
+                print(json.dumps(manager.get_report(), ensure_ascii=False, indent=2))
+            else:
+                print(f"❌ 알 수 없는 명령: {command}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop_capture()
+        engine.stop()
+        manager.close()
+        if voice_processor.archive:
+            voice_processor.archive.close()
+        sheet_writer.close()
+        if sheet_writer.sheet_handler.mirror:
+            sheet_writer.sheet_handler.mirror.close()
+        if sheet_writer.sheet_handler.allocator:
+            sheet_writer.sheet_handler.allocator.close()
+        history_store.close()
+        if voice_processor.usage:
+            voice_processor.usage.close()
+
+if __name__ == "__main__":
+    main()
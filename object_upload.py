@@ -0,0 +1,192 @@
+import concurrent.futures
+import hashlib
+import itertools
+import threading
+import time
+from datetime import timedelta
+import requests
+from audio_utils import wav_header
+from google_auth import SERVICE_ACCOUNT_FILE
+
+MAX_COMPOSE_SOURCES = 32  # GCS compose 한 번에 합칠 수 있는 최대 객체 수
+PART_CONTENT_TYPE = "application/octet-stream"
+
+class GCSObjectStore:
+    def __init__(self, bucket, key_file=SERVICE_ACCOUNT_FILE, url_minutes=60):
+        """Cloud Storage 버킷 (서명 URL 발급, 조각 목록/조합/삭제만 담당하고 데이터는 서명 URL로 직접 전송)"""
+        from google.cloud import storage
+        self.client = storage.Client.from_service_account_json(key_file)
+        self.bucket = self.client.bucket(bucket)
+        self.url_minutes = url_minutes
+
+    def signed_put_url(self, name, content_type=PART_CONTENT_TYPE):
+        return self.bucket.blob(name).generate_signed_url(version="v4", method="PUT", content_type=content_type,
+                                                          expiration=timedelta(minutes=self.url_minutes))
+
+    def list_sizes(self, prefix):
+        """prefix로 시작하는 객체의 {이름: 크기}"""
+        return {blob.name: blob.size for blob in self.client.list_blobs(self.bucket, prefix=prefix)}
+
+    def compose(self, names, name, content_type):
+        destination = self.bucket.blob(name)
+        destination.content_type = content_type
+        destination.compose([self.bucket.blob(source) for source in names])
+
+    def delete(self, names):
+        for name in names:
+            try:
+                self.bucket.blob(name).delete()
+            except Exception as e:
+                print(f"⚠️ 업로드 조각 삭제 실패 ({name}): {e}")
+
+    def uri(self, name):
+        return f"gs://{self.bucket.name}/{name}"
+
+class ObjectUploader:
+    def __init__(self, store, threshold_bytes=8 * 1024 * 1024, chunk_bytes=8 * 1024 * 1024, workers=4,
+                 max_retries=3, prefix="uploads"):
+        """큰 오디오를 서명 URL로 버킷에 직접 올리고 객체 URI를 돌려주는 업로더
+
+        오디오를 chunk_bytes 크기 조각으로 나눠 동시에 올린 뒤 하나의 객체로 합칩니다.
+        객체 이름은 내용의 해시로 정하므로, 중단된 업로드를 같은 오디오로 다시 시작하면
+        이미 올라간 조각은 건너뛰고 남은 조각만 올립니다.
+        """
+        self.store = store
+        self.threshold_bytes = threshold_bytes
+        self.chunk_bytes = chunk_bytes
+        self.workers = workers
+        self.max_retries = max_retries
+        self.prefix = prefix.strip('/')
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # 통계
+        self.lock = threading.Lock()
+        self.stats = {'uploads': 0, 'bytes': 0, 'parts': 0, 'resumed_parts': 0, 'retries': 0, 'failures': 0,
+                      'last_seconds': 0.0}
+
+    @classmethod
+    def from_settings(cls, settings_manager):
+        """app_settings.json의 object_upload 항목으로 생성 (꺼져 있거나 버킷이 없으면 None)"""
+        config = settings_manager.get_setting("object_upload", {}) if settings_manager else {}
+        if not config.get("enabled") or not config.get("bucket"):
+            return None
+        try:
+            store = GCSObjectStore(config["bucket"], config.get("key_file", SERVICE_ACCOUNT_FILE),
+                                   config.get("url_minutes", 60))
+        except Exception as e:
+            print(f"❌ 버킷 직접 업로드 설정 실패: {e}")
+            return None
+        print(f"🪣 큰 오디오 버킷 직접 업로드 사용: {config['bucket']} ({config.get('threshold_mb', 8)}MB 이상)")
+        return cls(store,
+                   threshold_bytes=int(config.get("threshold_mb", 8) * 1024 * 1024),
+                   chunk_bytes=int(config.get("chunk_mb", 8) * 1024 * 1024),
+                   workers=config.get("workers", 4),
+                   max_retries=config.get("max_retries", 3),
+                   prefix=config.get("prefix", "uploads"))
+
+    def should_upload(self, size):
+        return size >= self.threshold_bytes
+
+    def part_name(self, base, index):
+        return f"{base}.parts/{index:05d}"
+
+    def upload_part(self, name, read, start, end):
+        """조각 하나 전송 (실패하면 새 서명 URL로 재시도)"""
+        data = read(start, end)  # 전송할 때만 읽음 (전체 오디오를 한꺼번에 복제하지 않음)
+        for attempt in range(self.max_retries + 1):
+            try:
+                url = self.store.signed_put_url(name)
+                response = self.session.put(url, data=data, headers={'Content-Type': PART_CONTENT_TYPE},
+                                            timeout=max(30, len(data) / (256 * 1024)))
+                response.raise_for_status()
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                with self.lock:
+                    self.stats['retries'] += 1
+                print(f"⚠️ 업로드 조각 재시도 ({name}, {attempt + 1}/{self.max_retries}): {str(e)[:60]}")
+                time.sleep(min(8, 2 ** attempt))
+
+    def compose(self, names, name, content_type):
+        """조각을 하나의 객체로 합치기 (32개가 넘으면 중간 객체를 거쳐 단계적으로)"""
+        level = 0
+        while len(names) > MAX_COMPOSE_SOURCES:
+            level += 1
+            groups = [names[i:i + MAX_COMPOSE_SOURCES] for i in range(0, len(names), MAX_COMPOSE_SOURCES)]
+            merged = [f"{name}.parts/merge{level}-{index:05d}" for index in range(len(groups))]
+            for group, target in zip(groups, merged):
+                self.store.compose(group, target, PART_CONTENT_TYPE)
+            names = merged
+        self.store.compose(names, name, content_type)
+
+    def upload(self, data, content_type="audio/wav", extension="wav"):
+        """오디오를 버킷에 올리고 객체 URI 반환 (같은 내용이 이미 있으면 바로 반환)"""
+        data = memoryview(data)
+        return self.upload_from(len(data), lambda start, end: bytes(data[start:end]), [data],
+                                content_type, extension)
+
+    def upload_spool(self, spool):
+        """긴 녹음 스풀을 WAV 객체로 올리고 URI 반환 (WAV 헤더를 앞에 붙여 조각 단위로 읽으므로 전체를 메모리에 올리지 않음)"""
+        header = wav_header(spool.size, spool.rate, spool.channels, spool.sample_width)
+
+        def read(start, end):
+            pcm_start, pcm_end = max(start - len(header), 0), max(end - len(header), 0)
+            return header[start:end] + spool.read(pcm_start, pcm_end)
+
+        return self.upload_from(len(header) + spool.size, read, itertools.chain([header], spool.iter_views()),
+                                "audio/wav", "wav")
+
+    def upload_from(self, size, read, pieces, content_type, extension):
+        """size 바이트 오디오를 read(start, end)로 조각씩 읽어 업로드 (pieces는 내용 해시 계산용 순차 조각)"""
+        started = time.time()
+        digest = hashlib.sha256()
+        for piece in pieces:
+            digest.update(piece)
+        name = f"{self.prefix}/{digest.hexdigest()[:32]}.{extension}"
+        existing = self.store.list_sizes(name)
+        if existing.get(name) == size:
+            print(f"🪣 이미 업로드된 오디오: {self.store.uri(name)}")
+            return self.store.uri(name)
+
+        ranges = [(start, min(start + self.chunk_bytes, size)) for start in range(0, size, self.chunk_bytes)]
+        names = [self.part_name(name, index) for index in range(len(ranges))]
+        missing = [(part, start, end) for part, (start, end) in zip(names, ranges)
+                   if existing.get(part) != end - start]
+        resumed = len(names) - len(missing)
+        print(f"🪣 버킷 업로드: {size / 1024 / 1024:.1f}MB, 조각 {len(names)}개"
+              + (f" (이어서 올리기: {resumed}개 완료됨)" if resumed else ""))
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers,
+                                                       thread_name_prefix="upload") as executor:
+                futures = [executor.submit(self.upload_part, part, read, start, end)
+                           for part, start, end in missing]
+                for future in futures:
+                    future.result()
+            self.compose(names, name, content_type)
+        except Exception:
+            with self.lock:
+                self.stats['failures'] += 1
+            print("❌ 버킷 업로드 중단 - 같은 오디오로 다시 시도하면 남은 조각만 올립니다")
+            raise
+
+        # 합친 뒤 조각(중간 객체 포함) 정리
+        self.store.delete([part for part in self.store.list_sizes(f"{name}.parts/")])
+        elapsed = time.time() - started
+        with self.lock:
+            self.stats['uploads'] += 1
+            self.stats['bytes'] += size
+            self.stats['parts'] += len(missing)
+            self.stats['resumed_parts'] += resumed
+            self.stats['last_seconds'] = round(elapsed, 2)
+        print(f"✅ 버킷 업로드 완료: {self.store.uri(name)} ({elapsed:.1f}초)")
+        return self.store.uri(name)
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats)
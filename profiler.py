@@ -0,0 +1,185 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+class SamplingProfiler:
+    def __init__(self, interval=0.01):
+        """모든 스레드의 호출 스택을 주기적으로 수집하는 저부하 샘플링 프로파일러"""
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return False
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = time.time()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.sample_loop, daemon=True, name="profiler")
+        self.thread.start()
+        return True
+
+    def sample_loop(self):
+        own_id = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        """수집 중지 후 스택별 샘플 수 반환"""
+        if not self.running:
+            return None
+        self.stop_event.set()
+        self.thread.join()
+        return dict(self.stacks)
+
+    def write_report(self, path):
+        """접힌 스택(flamegraph/speedscope 호환)과 요약 파일 저장"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        # 함수별 자기 시간(스택 맨 위)/누적 시간 요약
+        own = Counter()
+        total = Counter()
+        threads = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            threads[frames[0]] += count
+            own[frames[-1]] += count
+            for name in set(frames[1:]):
+                total[name] += count
+        summary_path = os.path.splitext(path)[0] + "_summary.txt"
+        elapsed = time.time() - self.started_at
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(f"수집 시간: {elapsed:.1f}초, 샘플 {self.samples}회 (간격 {self.interval * 1000:.0f}ms)\n\n")
+            f.write("[스레드별 샘플]\n")
+            for name, count in threads.most_common():
+                f.write(f"{count:8d}  {name}\n")
+            f.write("\n[자기 시간 상위 30]\n")
+            for name, count in own.most_common(30):
+                f.write(f"{count:8d}  {name}\n")
+            f.write("\n[누적 시간 상위 30]\n")
+            for name, count in total.most_common(30):
+                f.write(f"{count:8d}  {name}\n")
+        return summary_path
+
+class ProfilingControls:
+    def __init__(self, output_dir="profiles", interval_ms=10, trace_frames=10, top_count=30):
+        """실행 중인 앱의 CPU 샘플링/메모리 스냅샷 제어 (GUI 숨김 메뉴, 헤드리스 명령 공용)"""
+        self.output_dir = output_dir
+        self.cpu = SamplingProfiler(interval_ms / 1000.0)
+        self.trace_frames = trace_frames
+        self.top_count = top_count
+        self.last_snapshot = None
+        self.last_label = None
+
+    @classmethod
+    def from_settings(cls, settings_manager):
+        """app_settings.json의 profiling 항목으로 생성"""
+        config = settings_manager.get_setting("profiling", {}) if settings_manager else {}
+        return cls(output_dir=config.get("output_dir", "profiles"),
+                   interval_ms=config.get("interval_ms", 10),
+                   trace_frames=config.get("trace_frames", 10),
+                   top_count=config.get("top_count", 30))
+
+    def make_path(self, prefix, extension):
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}.{extension}")
+
+    def start_cpu(self):
+        if not self.cpu.start():
+            return "이미 CPU 프로파일링 중입니다"
+        return f"🔬 CPU 프로파일링 시작 (간격 {self.cpu.interval * 1000:.0f}ms)"
+
+    def stop_cpu(self):
+        """CPU 프로파일링 중지 후 결과 파일 경로 안내"""
+        if self.cpu.stop() is None:
+            return "CPU 프로파일링 중이 아닙니다"
+        path = self.make_path("cpu", "folded")
+        summary_path = self.cpu.write_report(path)
+        return f"✅ CPU 프로파일 저장: {path}, {summary_path}"
+
+    def snapshot_memory(self, label=""):
+        """tracemalloc 스냅샷 저장, 이전 스냅샷이 있으면 할당 증가 상위 목록도 저장
+
+        추적 중이 아니면 추적을 시작하고 기준 스냅샷을 남깁니다 (시작 이후 할당만 기록됨).
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self.last_snapshot = None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")))
+        label = label or time.strftime('%H%M%S')
+        path = self.make_path(f"mem_{label}", "snapshot")
+        snapshot.dump(path)
+
+        lines = [f"스냅샷: {label} (추적 메모리 {tracemalloc.get_traced_memory()[0] / 1024 / 1024:.1f}MB)\n"]
+        if self.last_snapshot is not None:
+            lines.append(f"\n[{self.last_label} → {label} 할당 증가 상위 {self.top_count}]\n")
+            for stat in snapshot.compare_to(self.last_snapshot, 'lineno')[:self.top_count]:
+                lines.append(f"{stat}\n")
+        lines.append(f"\n[현재 할당 상위 {self.top_count}]\n")
+        for stat in snapshot.statistics('lineno')[:self.top_count]:
+            lines.append(f"{stat}\n")
+        report_path = os.path.splitext(path)[0] + ".txt"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+
+        self.last_snapshot = snapshot
+        self.last_label = label
+        return f"✅ 메모리 스냅샷 저장: {path}, {report_path}"
+
+    def stop_memory(self):
+        if not tracemalloc.is_tracing():
+            return "메모리 추적 중이 아닙니다"
+        tracemalloc.stop()
+        self.last_snapshot = None
+        return "⏹️ 메모리 추적 종료"
+
+    def status(self):
+        cpu = f"CPU 샘플링 중 ({self.cpu.samples}회)" if self.cpu.running else "CPU 샘플링 꺼짐"
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            memory = f"메모리 추적 중 ({current / 1024 / 1024:.1f}MB, 최대 {peak / 1024 / 1024:.1f}MB)"
+        else:
+            memory = "메모리 추적 꺼짐"
+        return f"{cpu}, {memory}, 출력 폴더 {os.path.abspath(self.output_dir)}"
+
+    def handle(self, arg):
+        """텍스트 명령 처리: cpu start|stop, mem snap [이름]|stop, status"""
+        parts = arg.split()
+        if parts[:2] == ["cpu", "start"]:
+            return self.start_cpu()
+        if parts[:2] == ["cpu", "stop"]:
+            return self.stop_cpu()
+        if parts[:2] == ["mem", "snap"]:
+            return self.snapshot_memory(parts[2] if len(parts) > 2 else "")
+        if parts[:2] == ["mem", "stop"]:
+            return self.stop_memory()
+        if not parts or parts[0] == "status":
+            return self.status()
+        return "사용법: profile cpu start|stop, profile mem snap [이름]|stop, profile status"
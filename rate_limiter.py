@@ -0,0 +1,265 @@
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 숫자가 작을수록 먼저 처리
+PRIORITIES = {
+    'interactive': 0,  # 사용자가 기다리는 작업 (받아쓰기, 셀 입력, 사용자가 연 목록)
+    'replay': 1,       # 기록된 세션/밀린 요청 재전송
+    'batch': 2,        # 보관소 일괄 재인식 등 대량 작업
+    'maintenance': 3   # 목록 새로고침 등 유지 작업
+}
+
+def effective_rank(entry, now, aging_seconds):
+    """대기 시간만큼 올라간 순위 (aging_seconds마다 한 단계씩, 하위 작업이 무한정 밀리지 않도록)"""
+    rank, queued_at, sequence, _ = entry
+    if aging_seconds:
+        rank = max(0.0, rank - (now - queued_at) / aging_seconds)
+    return rank, sequence
+
+class WaitStats:
+    def __init__(self, window=500):
+        """우선순위 등급별 대기 시간 통계 (최근 window건)"""
+        self.waits = {name: deque(maxlen=window) for name in PRIORITIES}
+        self.counts = {name: 0 for name in PRIORITIES}
+        self.max_wait = {name: 0.0 for name in PRIORITIES}
+
+    def record(self, priority, seconds):
+        self.waits[priority].append(seconds)
+        self.counts[priority] += 1
+        self.max_wait[priority] = max(self.max_wait[priority], seconds)
+
+    def get_stats(self):
+        stats = {}
+        for name, waits in self.waits.items():
+            ordered = sorted(waits)
+            stats[name] = {
+                'count': self.counts[name],
+                'avg_ms': round(sum(ordered) / len(ordered) * 1000, 1) if ordered else 0.0,
+                'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 1) if ordered else 0.0,
+                'max_ms': round(self.max_wait[name] * 1000, 1)
+            }
+        return stats
+
+class PrioritySlots:
+    def __init__(self, slots=10, reserved=2, aging_seconds=10):
+        """동시 연결 수를 우선순위 등급별로 나눠 쓰는 세마포어
+
+        reserved개 연결은 interactive 작업(또는 오래 기다려 순위가 올라간 작업)만 사용할 수 있습니다."""
+        self.slots = slots
+        self.reserved = max(0, min(reserved, slots - 1))
+        self.aging_seconds = aging_seconds
+        self.condition = threading.Condition()
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.in_use = {name: 0 for name in PRIORITIES}
+        self.wait_stats = WaitStats()
+
+    def acquire(self, priority='interactive'):
+        entry = (PRIORITIES[priority], time.monotonic(), next(self.sequence), priority)
+        with self.condition:
+            self.waiters.append(entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    head = min(self.waiters, key=lambda e: effective_rank(e, now, self.aging_seconds))
+                    if head == entry:
+                        rank, _ = effective_rank(entry, now, self.aging_seconds)
+                        limit = self.slots if rank == 0 else self.slots - self.reserved
+                        if sum(self.in_use.values()) < limit:
+                            self.in_use[priority] += 1
+                            self.wait_stats.record(priority, now - entry[1])
+                            return
+                    # 대기 중 순위가 올라갈 수 있으므로 주기적으로 다시 확인
+                    self.condition.wait(1.0 if self.aging_seconds else None)
+            finally:
+                self.waiters.remove(entry)
+                self.condition.notify_all()
+
+    def release(self, priority='interactive'):
+        with self.condition:
+            self.in_use[priority] -= 1
+            self.condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority='interactive'):
+        """with 블록 동안 연결 하나 사용"""
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def get_status(self):
+        with self.condition:
+            waiting = {name: 0 for name in PRIORITIES}
+            for entry in self.waiters:
+                waiting[entry[3]] += 1
+            return {'slots': self.slots, 'reserved': self.reserved, 'in_use': dict(self.in_use),
+                    'waiting': waiting, 'wait': self.wait_stats.get_stats()}
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        """분당 허용량 기반 토큰 버킷 (최대 1분 분량까지 누적)"""
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.refill_per_second = per_minute / 60.0
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0  # 429 응답 후 대기 종료 시각
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, reserve=0.0):
+        """토큰 하나를 얻기까지 남은 시간(초), 0이면 바로 사용 가능 (reserve개는 남겨 두어야 할 때)"""
+        self.refill()
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1 + reserve:
+            return 0.0
+        return (1 + reserve - self.tokens) / self.refill_per_second
+
+    def take(self):
+        self.tokens -= 1
+
+def get_retry_after(error):
+    """429 오류이면 Retry-After(초, 없으면 0)를, 아니면 None 반환"""
+    response = getattr(error, 'response', None)
+    if response is None or getattr(response, 'status_code', None) != 429:
+        return None
+    try:
+        return float(response.headers.get('Retry-After', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+class QuotaScheduler:
+    def __init__(self, read_per_minute=60, write_per_minute=60, drive_per_minute=60,
+                 max_retries=5, max_backoff=64, interactive_reserve=0.2, aging_seconds=10):
+        """Sheets/Drive API 호출을 읽기/쓰기/드라이브 버킷으로 제한하는 스케줄러
+
+        버킷마다 interactive_reserve 비율의 토큰은 interactive 작업 몫으로 남겨 두고,
+        하위 등급 작업은 aging_seconds마다 한 단계씩 순위가 올라 무한정 밀리지 않습니다."""
+        self.buckets = {
+            'read': TokenBucket(read_per_minute),
+            'write': TokenBucket(write_per_minute),
+            'drive': TokenBucket(drive_per_minute)
+        }
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.interactive_reserve = interactive_reserve
+        self.aging_seconds = aging_seconds
+
+        self.condition = threading.Condition()
+        self.waiters = {kind: [] for kind in self.buckets}  # (등급, 대기 시작, 순번, 이름)
+        self.sequence = itertools.count()
+        self.wait_stats = {kind: WaitStats() for kind in self.buckets}
+
+        # 통계
+        self.calls = {kind: 0 for kind in self.buckets}
+        self.throttled = {kind: 0 for kind in self.buckets}
+        self.recorder = None  # 세션 기록기 (선택)
+
+    @classmethod
+    def from_settings(cls, settings_manager):
+        """app_settings.json의 sheets_quota 항목으로 스케줄러 생성"""
+        config = settings_manager.get_setting("sheets_quota", {}) if settings_manager else {}
+        return cls(read_per_minute=config.get("read_per_minute", 60),
+                   write_per_minute=config.get("write_per_minute", 60),
+                   drive_per_minute=config.get("drive_per_minute", 60),
+                   max_retries=config.get("max_retries", 5),
+                   max_backoff=config.get("max_backoff", 64),
+                   interactive_reserve=config.get("interactive_reserve", 0.2),
+                   aging_seconds=config.get("aging_seconds", 10))
+
+    def acquire(self, kind, priority='interactive'):
+        """토큰 하나를 얻을 때까지 대기 (높은 우선순위 대기자가 먼저 토큰을 받음)"""
+        bucket = self.buckets[kind]
+        entry = (PRIORITIES[priority], time.monotonic(), next(self.sequence), priority)
+        waiters = self.waiters[kind]
+        with self.condition:
+            waiters.append(entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    head = min(waiters, key=lambda e: effective_rank(e, now, self.aging_seconds))
+                    if head == entry:
+                        rank, _ = effective_rank(entry, now, self.aging_seconds)
+                        reserve = 0.0 if rank == 0 else bucket.capacity * self.interactive_reserve
+                        wait = bucket.wait_time(reserve)
+                        if wait == 0:
+                            bucket.take()
+                            self.wait_stats[kind].record(priority, now - entry[1])
+                            return
+                        if rank > 0 and self.aging_seconds:
+                            wait = min(wait, 1.0)  # 순위가 올라가면 남겨 둔 몫도 쓸 수 있음
+                    else:
+                        # 앞선 대기자가 토큰을 받을 때까지 대기 (순위 변동 확인용으로 주기적으로 깨어남)
+                        wait = 1.0 if self.aging_seconds else None
+                    self.condition.wait(wait)
+            finally:
+                waiters.remove(entry)
+                self.condition.notify_all()
+
+    def call(self, kind, func, *args, priority='interactive', **kwargs):
+        """할당량 내에서 API 호출, 429 응답이면 Retry-After 또는 지수 백오프 후 재시도"""
+        backoff = 1.0
+        for attempt in range(self.max_retries + 1):
+            self.acquire(kind, priority)
+            self.calls[kind] += 1
+            started = time.time()
+            try:
+                result = func(*args, **kwargs)
+                if self.recorder:
+                    self.recorder.record_sheets(kind, func, args, started, time.time() - started)
+                return result
+            except Exception as e:
+                if self.recorder:
+                    self.recorder.record_sheets(kind, func, args, started, time.time() - started, e)
+                retry_after = get_retry_after(e)
+                if retry_after is None or attempt == self.max_retries:
+                    raise
+                self.throttled[kind] += 1
+                delay = retry_after if retry_after > 0 else min(backoff, self.max_backoff)
+                backoff *= 2
+                print(f"⚠️ API 할당량 초과(429) - {delay:.1f}초 후 재시도 ({kind}, {attempt + 1}/{self.max_retries})")
+                with self.condition:
+                    bucket = self.buckets[kind]
+                    bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+                    bucket.tokens = min(bucket.tokens, 0)
+                    self.condition.notify_all()
+
+    def get_status(self):
+        """버킷별 남은 할당량 현황"""
+        status = {}
+        with self.condition:
+            for kind, bucket in self.buckets.items():
+                bucket.refill()
+                waiting = {name: 0 for name in PRIORITIES}
+                for entry in self.waiters[kind]:
+                    waiting[entry[3]] += 1
+                status[kind] = {
+                    'remaining': int(max(0, bucket.tokens)),
+                    'per_minute': int(bucket.capacity),
+                    'blocked_seconds': max(0.0, bucket.blocked_until - time.monotonic()),
+                    'waiting': waiting,
+                    'calls': self.calls[kind],
+                    'throttled': self.throttled[kind],
+                    'wait': self.wait_stats[kind].get_stats()
+                }
+        return status
+
+    def format_status(self):
+        """GUI 표시용 한 줄 요약"""
+        status = self.get_status()
+        parts = [f"{name} {status[kind]['remaining']}/{status[kind]['per_minute']}"
+                 for kind, name in (('read', '읽기'), ('write', '쓰기'), ('drive', '드라이브'))]
+        blocked = max(s['blocked_seconds'] for s in status.values())
+        text = "API 잔여: " + ", ".join(parts)
+        if blocked > 0:
+            text += f" (대기 {blocked:.0f}초)"
+        return text
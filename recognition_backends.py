@@ -0,0 +1,208 @@
+import threading
+import time
+import requests
+
+DEFAULT_API_URL = "https://voicetext-api-6qtb5op6hq-du.a.run.app"
+
+class RecognitionBackend:
+    def __init__(self, name, url, session, smoothing=0.3):
+        """인식 서버 하나 (지연 시간/오류율은 지수 이동 평균으로 추적)"""
+        self.name = name
+        self.url = url.rstrip("/")
+        self.session = session
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+
+        self.latency = None  # 인식 요청 평균 응답 시간(초), 아직 모르면 None
+        self.probe_latency = None  # 상태 확인 응답 시간 (인식 요청 기록이 없을 때만 사용)
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0  # 실패가 이어지면 이 시각까지 후순위
+
+        # 통계
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, elapsed, success, probe=False):
+        """요청 결과 반영 (상태 확인 결과는 지연 시간을 따로 기록)"""
+        with self.lock:
+            if not probe:
+                self.requests += 1
+            if success and probe:
+                # 상태 확인 성공만으로는 인식 실패 기록을 지우지 않음 (대기 시간이 지나면 실제 요청으로 확인)
+                self.probe_latency = elapsed
+            elif success:
+                self.latency = elapsed if self.latency is None else \
+                    self.latency + self.smoothing * (elapsed - self.latency)
+                self.error_rate *= (1 - self.smoothing)
+                self.consecutive_failures = 0
+                self.cooldown_until = 0.0
+            else:
+                if not probe:
+                    self.errors += 1
+                self.error_rate += self.smoothing * (1 - self.error_rate)
+                self.consecutive_failures += 1
+
+    def probe(self, timeout=10):
+        """상태 확인 (GET /), (걸린 시간, 성공 여부) 반환"""
+        started = time.time()
+        try:
+            response = self.session.get(f"{self.url}/", timeout=timeout)
+            success = response.status_code == 200
+        except requests.exceptions.RequestException:
+            success = False
+        return time.time() - started, success
+
+    @property
+    def healthy(self):
+        return time.time() >= self.cooldown_until
+
+    @property
+    def expected_latency(self):
+        if self.latency is not None:
+            return self.latency
+        return self.probe_latency if self.probe_latency is not None else 0.0
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'url': self.url,
+                'healthy': self.healthy,
+                'latency_ms': round(self.latency * 1000) if self.latency is not None else None,
+                'probe_latency_ms': round(self.probe_latency * 1000) if self.probe_latency is not None else None,
+                'error_rate': round(self.error_rate, 3),
+                'requests': self.requests,
+                'errors': self.errors,
+                'consecutive_failures': self.consecutive_failures,
+                'cooldown_seconds': round(max(0.0, self.cooldown_until - time.time()), 1)
+            }
+
+class BackendRouter:
+    def __init__(self, backends, session, failure_threshold=3, cooldown_seconds=30,
+                 error_penalty=2.0, probe_interval=30):
+        """여러 인식 서버 중 응답 시간과 오류율이 가장 좋은 서버로 요청을 보내는 라우터
+
+        점수는 평균 응답 시간(초) + 오류율 × error_penalty(초)이며, 점수가 같으면 설정 순서를 따릅니다.
+        실패하면 다음 서버로 넘기고,
+        연속 failure_threshold회 실패한 서버는 cooldown_seconds 동안 후순위로 둡니다.
+        backends: [(이름, URL), ...]
+        """
+        self.session = session
+        self.backends = [RecognitionBackend(name, url, session) for name, url in backends]
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.error_penalty = error_penalty
+        self.probe_interval = probe_interval
+
+        self.running = True
+        self.wakeup = threading.Event()
+        self.prober = None
+
+    @classmethod
+    def from_settings(cls, settings_manager, session, default_url=DEFAULT_API_URL):
+        """app_settings.json의 recognition_backends 항목으로 생성 (없으면 기본 서버 하나)
+
+        "recognition_backends": {"servers": [{"name": "서울", "url": "..."}, ...],
+                                 "cooldown_seconds": 30, "probe_interval": 30}
+        """
+        config = settings_manager.get_setting("recognition_backends", {}) if settings_manager else {}
+        servers = config.get("servers") or [{"name": "기본", "url": default_url}]
+        return cls([(server.get("name", server["url"]), server["url"]) for server in servers], session,
+                   failure_threshold=config.get("failure_threshold", 3),
+                   cooldown_seconds=config.get("cooldown_seconds", 30),
+                   error_penalty=config.get("error_penalty", 2.0),
+                   probe_interval=config.get("probe_interval", 30))
+
+    def score(self, backend):
+        """작을수록 우선 (실패하면 다음 서버로 다시 보내야 하므로 오류율만큼 시간을 더함)"""
+        return backend.expected_latency + self.error_penalty * backend.error_rate
+
+    def candidates(self):
+        """시도 순서: 정상 서버를 점수순으로, 대기 중인 서버는 설정 순서로 맨 뒤에"""
+        healthy = [b for b in self.backends if b.healthy]
+        cooling = [b for b in self.backends if not b.healthy]
+        return sorted(healthy, key=self.score) + cooling
+
+    def mark(self, backend, elapsed, success, probe=False):
+        """결과 반영, 연속 실패가 기준을 넘으면 대기 상태로 전환 (대기 중 실패하면 연장)"""
+        was_healthy = backend.healthy
+        backend.record(elapsed, success, probe)
+        if success and not was_healthy:
+            print(f"✅ 인식 서버 '{backend.name}' 복구")
+        # 상태 확인에 응답이 없으면 바로 대기 상태로
+        threshold = 1 if probe else self.failure_threshold
+        if not success and backend.consecutive_failures >= threshold:
+            backend.cooldown_until = time.time() + self.cooldown_seconds
+        if not success and was_healthy and not backend.healthy:
+            print(f"⚠️ 인식 서버 '{backend.name}' 연속 {backend.consecutive_failures}회 실패 - "
+                  f"{self.cooldown_seconds}초 동안 후순위")
+
+    def post(self, path, timeout=60, **kwargs):
+        """요청 전송, 네트워크 오류/시간 초과/5xx/429이면 다음 서버로 재시도
+
+        모든 서버가 실패하면 마지막 응답을 반환하거나 마지막 예외를 다시 발생시킵니다.
+        """
+        last_error = None
+        last_response = None
+        for backend in self.candidates():
+            started = time.time()
+            try:
+                response = self.session.post(f"{backend.url}{path}", timeout=timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self.mark(backend, time.time() - started, False)
+                print(f"⚠️ 인식 서버 '{backend.name}' 요청 실패: {str(e)[:60]}")
+                last_error = e
+                continue
+            if response.status_code >= 500 or response.status_code == 429:
+                self.mark(backend, time.time() - started, False)
+                print(f"⚠️ 인식 서버 '{backend.name}' 응답 오류: {response.status_code}")
+                last_response = response
+                continue
+            self.mark(backend, time.time() - started, True)
+            return response
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    def probe(self, backend, timeout=10):
+        """서버 하나 상태 확인 (응답이 없으면 바로 대기 상태로)"""
+        elapsed, success = backend.probe(timeout)
+        self.mark(backend, elapsed, success, probe=True)
+        return success
+
+    def probe_all(self, timeout=10):
+        """모든 서버 상태를 동시에 확인, 정상 서버가 하나라도 있으면 True"""
+        threads = [threading.Thread(target=self.probe, args=(backend, timeout), daemon=True)
+                   for backend in self.backends]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout + 1)
+        return self.available()
+
+    def available(self):
+        return any(backend.healthy for backend in self.backends)
+
+    def start_probing(self):
+        """백그라운드에서 주기적으로 상태 확인 (대기 중인 서버의 복구 감지)"""
+        if self.prober is None and self.probe_interval:
+            self.prober = threading.Thread(target=self.probe_loop, daemon=True, name="backend-prober")
+            self.prober.start()
+
+    def probe_loop(self):
+        while self.running:
+            self.wakeup.wait(self.probe_interval)
+            if not self.running:
+                break
+            for backend in self.backends:
+                self.probe(backend)
+
+    def get_stats(self):
+        """서버별 상태와 지연 시간 통계"""
+        order = [backend.name for backend in self.candidates()]
+        return {backend.name: dict(backend.get_stats(), rank=order.index(backend.name) + 1)
+                for backend in self.backends}
+
+    def close(self):
+        self.running = False
+        self.wakeup.set()
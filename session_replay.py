@@ -0,0 +1,370 @@
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+import numpy as np
+from standins import StandInTranscribeServer, StandInSheetsClient
+
+MAGIC = b"VREC1\n"
+RECORD_HEADER = struct.Struct("<II")  # (헤더 JSON 길이, 오디오 길이)
+WAV_HEADER_BYTES = 44
+
+def encode_audio(audio):
+    """WAV는 헤더 + 차분 부호화 PCM을, 그 외는 그대로 zlib 압축"""
+    audio = bytes(audio)
+    if audio[:4] == b"RIFF" and (len(audio) - WAV_HEADER_BYTES) % 2 == 0:
+        samples = np.frombuffer(audio, dtype=np.int16, offset=WAV_HEADER_BYTES)
+        delta = np.diff(samples, prepend=np.int16(0))
+        return "delta", audio[:WAV_HEADER_BYTES] + zlib.compress(delta.tobytes(), 6)
+    return "zlib", zlib.compress(audio, 6)
+
+def decode_audio(encoding, payload):
+    if encoding == "delta":
+        delta = np.frombuffer(zlib.decompress(payload[WAV_HEADER_BYTES:]), dtype=np.int16)
+        return payload[:WAV_HEADER_BYTES] + np.cumsum(delta, dtype=np.int16).tobytes()
+    return zlib.decompress(payload)
+
+def audio_digest(audio):
+    return hashlib.sha1(audio).hexdigest()
+
+def multipart_audio(body):
+    """multipart 요청 본문에서 audio 파트의 내용 (없으면 None)"""
+    boundary = body[:body.find(b"\r\n")]
+    if not boundary.startswith(b"--"):
+        return None
+    for part in body.split(boundary):
+        head, separator, content = part.partition(b"\r\n\r\n")
+        if separator and b'name="audio"' in head:
+            return content[:-2]  # 다음 경계 앞의 CRLF 제외
+    return None
+
+def to_json_value(value):
+    """기록용으로 JSON에 넣을 수 있는 값으로 변환 (객체는 이름만)"""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): to_json_value(v) for k, v in value.items()}
+    return f"<{type(value).__name__}>"
+
+class SessionRecorder:
+    def __init__(self, path):
+        """운영 세션(인식 요청 오디오/응답/지연 시간, 시트 API 호출)을 재생 파일 하나에 기록
+
+        기록은 백그라운드 스레드에서 압축해 추가하므로 녹음/저장 경로를 지연시키지 않고,
+        레코드마다 바로 파일에 쓰므로 프로그램이 비정상 종료되어도 그때까지의 기록은 남습니다.
+        """
+        self.path = path
+        self.started_at = time.time()
+        self.pending = queue.Queue()
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.stats = {'transcribe': 0, 'sheets': 0, 'bytes': 0}
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+        self.writer = threading.Thread(target=self.write_loop, daemon=True, name="session-recorder")
+        self.writer.start()
+        self.add({'type': 'session', 'started_at': self.started_at})
+        print(f"⏺️ 세션 기록 시작: {path}")
+
+    @classmethod
+    def from_settings(cls, settings_manager):
+        """app_settings.json의 session_recording 항목으로 생성 (사용 안 함이면 None)"""
+        config = settings_manager.get_setting("session_recording", {}) if settings_manager else {}
+        if not config.get("enabled", False):
+            return None
+        directory = config.get("directory", "sessions")
+        os.makedirs(directory, exist_ok=True)
+        return cls(os.path.join(directory, f"session_{datetime.now():%Y%m%d_%H%M%S}.rec"))
+
+    def attach(self, voice_processor, sheet_handler):
+        """처리기와 시트 핸들러에 기록기 연결"""
+        voice_processor.set_session_recorder(self)
+        sheet_handler.quota.recorder = self
+        if sheet_handler.spreadsheet:
+            self.add({'type': 'target', 'spreadsheet': sheet_handler.spreadsheet.title,
+                      'sheet': sheet_handler.sheet.title if sheet_handler.sheet else None})
+
+    def add(self, event, audio=None):
+        with self.lock:
+            self.sequence += 1
+            event['seq'] = self.sequence
+        event.setdefault('t', time.time() - self.started_at)
+        self.pending.put((event, audio))
+
+    def record_transcribe(self, audio, data, started, elapsed, response=None, error=None):
+        """인식 요청 한 건 기록 (보낸 오디오, 응답 상태/본문, 걸린 시간)"""
+        event = {'type': 'transcribe', 't': started - self.started_at, 'elapsed': elapsed,
+                 'data': to_json_value(data)}
+        if response is not None:
+            event['status'] = response.status_code
+            try:
+                event['response'] = response.json()
+            except ValueError:
+                event['response'] = {'text': response.text[:500]}
+        else:
+            event['error'] = str(error)[:200]
+        self.add(event, audio)
+        self.stats['transcribe'] += 1
+
+    def record_sheets(self, kind, func, args, started, elapsed, error=None):
+        """시트/드라이브 API 호출 한 건 기록"""
+        self.add({'type': 'sheets', 't': started - self.started_at, 'elapsed': elapsed, 'kind': kind,
+                  'op': getattr(func, '__name__', str(func)), 'args': to_json_value(list(args)),
+                  'error': str(error)[:200] if error else None})
+        self.stats['sheets'] += 1
+
+    def write_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            event, audio = item
+            try:
+                payload = b''
+                if audio is not None:
+                    event['audio_encoding'], payload = encode_audio(audio)
+                header = json.dumps(event, ensure_ascii=False).encode('utf-8')
+                self.file.write(RECORD_HEADER.pack(len(header), len(payload)) + header + payload)
+                self.file.flush()
+                self.stats['bytes'] += RECORD_HEADER.size + len(header) + len(payload)
+            except Exception as e:
+                print(f"세션 기록 오류: {e}")
+
+    def close(self):
+        """남은 기록을 쓰고 파일 닫기"""
+        self.pending.put(None)
+        self.writer.join(timeout=10)
+        self.file.close()
+        print(f"⏹️ 세션 기록 종료: {self.path} ({self.stats})")
+
+def read_session(path):
+    """재생 파일의 이벤트 목록 (오디오는 event['audio']에 복원)"""
+    events = []
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"세션 기록 파일이 아닙니다: {path}")
+        while True:
+            head = f.read(RECORD_HEADER.size)
+            if len(head) < RECORD_HEADER.size:
+                break
+            header_length, payload_length = RECORD_HEADER.unpack(head)
+            header = f.read(header_length)
+            payload = f.read(payload_length)
+            if len(header) < header_length or len(payload) < payload_length:
+                print("⚠️ 마지막 기록이 잘려 있어 무시합니다")
+                break
+            event = json.loads(header.decode('utf-8'))
+            if payload_length:
+                event['audio'] = decode_audio(event['audio_encoding'], payload)
+            events.append(event)
+    events.sort(key=lambda e: e['t'])
+    return events
+
+class ReplayTranscribeServer(StandInTranscribeServer):
+    def __init__(self, events, latency_scale=1.0):
+        """기록된 응답과 지연 시간을 그대로(또는 배율 적용해) 돌려주는 대역 인식 서버"""
+        super().__init__(latency_ms=0, jitter_ms=0)
+        self.latency_scale = latency_scale
+        self.recorded = deque(e for e in events if e['type'] == 'transcribe')
+        # 요청의 오디오 해시 -> 같은 오디오를 보낸 기록 (기록 순)
+        self.by_audio = {}
+        for event in self.recorded:
+            if event.get('audio'):
+                self.by_audio.setdefault(audio_digest(event['audio']), deque()).append(event)
+        self.used = set()
+        self.replay_lock = threading.Lock()
+        self.unmatched = 0
+
+    def take(self, events):
+        """아직 쓰지 않은 첫 기록 꺼내기 (없으면 None)"""
+        while events:
+            event = events.popleft()
+            if event['seq'] not in self.used:
+                self.used.add(event['seq'])
+                return event
+        return None
+
+    def handle_transcribe(self, path, body):
+        if not path.startswith("/transcribe"):
+            return 404, {'success': False, 'error': 'not found'}
+        audio = multipart_audio(body)
+        digest = audio_digest(audio) if audio is not None else None
+        with self.replay_lock:
+            self.requests += 1
+            self.audio_bytes += len(body)
+            # 같은 오디오를 보낸 기록을 해시로 찾고, 없으면 순서대로 사용
+            event = self.take(self.by_audio.get(digest, deque()))
+            if event is None:
+                self.unmatched += 1
+                event = self.take(self.recorded)
+        if event is None:
+            return 500, {'success': False, 'error': 'no recorded response'}
+        time.sleep(event['elapsed'] * self.latency_scale)
+        if 'status' not in event:
+            return 503, {'success': False, 'error': event.get('error', 'recorded failure')}
+        return event['status'], event.get('response', {})
+
+class ReplaySheetsClient(StandInSheetsClient):
+    def __init__(self, spreadsheets, events, latency_scale=1.0):
+        """호출 종류별로 기록된 지연 시간을 순서대로 재현하는 대역 시트 클라이언트"""
+        super().__init__(spreadsheets, latency_ms=0, per_minute_quota=0)
+        self.latency_scale = latency_scale
+        self.latencies = {}
+        for event in events:
+            if event['type'] == 'sheets' and not event.get('error'):
+                self.latencies.setdefault(event['kind'], deque()).append(event['elapsed'])
+
+    def api_call(self, kind):
+        super().api_call(kind)
+        with self.lock:
+            recorded = self.latencies.get(kind)
+            delay = recorded.popleft() if recorded else 0.0
+        time.sleep(delay * self.latency_scale)
+
+def column_letter(col):
+    letters = ""
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+class SessionReplayer:
+    def __init__(self, path, speed=1.0, latency_scale=1.0, workers=8):
+        """기록된 세션을 대역 서버/시트로 재생 (speed배 빠르게, 지연 시간은 latency_scale배)"""
+        self.path = path
+        self.speed = speed
+        self.latency_scale = latency_scale
+        self.workers = workers
+        self.events = read_session(path)
+
+    def build_spreadsheets(self):
+        """기록에 나온 스프레드시트/시트 이름으로 대역 구성"""
+        target = next((e for e in self.events if e['type'] == 'target'), None)
+        spreadsheet = target['spreadsheet'] if target else "음성기록"
+        sheet = (target or {}).get('sheet') or "시트1"
+        return {spreadsheet: [sheet]}, spreadsheet, sheet
+
+    def run(self):
+        """재생 후 원래 기록과 비교한 결과 반환"""
+        from main import GoogleSheetHandler
+        from speechtext import SimpleVoiceProcessor
+
+        spreadsheets, spreadsheet, sheet = self.build_spreadsheets()
+        server = ReplayTranscribeServer(self.events, self.latency_scale).start()
+        sheets_client = ReplaySheetsClient(spreadsheets, self.events, self.latency_scale)
+        voice_processor = SimpleVoiceProcessor(api_url=server.url)
+        sheet_handler = GoogleSheetHandler(gc=sheets_client)
+        sheet_handler.set_target_spreadsheet(spreadsheet)
+        sheet_handler.set_target_sheet(sheet)
+
+        results = []
+        results_lock = threading.Lock()
+
+        def replay_transcribe(event):
+            text, confidence, success = voice_processor.transcribe(event['audio'])
+            return success
+
+        def replay_write(event):
+            if event['op'] == 'update_cell':
+                row, col, text = event['args'][:3]
+                return sheet_handler.save_to_sheet(text, 0.0, f"{column_letter(col)}{row}")
+            sheet_handler.quota.call('write', sheet_handler.sheet.batch_update, event['args'][0])
+            return True
+
+        def replay(event):
+            started = time.time()
+            try:
+                success = (replay_transcribe if event['type'] == 'transcribe' else replay_write)(event)
+            except Exception as e:
+                print(f"❌ 재생 오류 (기록 {event['seq']}): {e}")
+                success = False
+            with results_lock:
+                results.append({'type': event['type'], 'seq': event['seq'], 'original': event['elapsed'],
+                                'replayed': time.time() - started, 'success': bool(success)})
+
+        # 기록된 시각에 맞춰(속도 배율 적용) 요청을 보내 원래의 동시성을 재현
+        schedule = [e for e in self.events if e['type'] == 'transcribe' and 'audio' in e] + \
+                   [e for e in self.events if e['type'] == 'sheets' and e['kind'] == 'write'
+                    and e['op'] in ('update_cell', 'batch_update') and not e.get('error')]
+        schedule.sort(key=lambda e: e['t'])
+        print(f"▶️ 세션 재생: {len(schedule)}건, {self.speed:g}배속, 지연 {self.latency_scale:g}배")
+        started = time.time()
+        futures = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for event in schedule:
+                wait = event['t'] / self.speed - (time.time() - started)
+                if wait > 0:
+                    time.sleep(wait)
+                futures[pool.submit(replay, event)] = event
+        wall = time.time() - started
+        server.stop()
+        # 결과를 남기지 못하고 끝난 재생도 실패로 보고
+        dropped = 0
+        for future, event in futures.items():
+            if future.exception() is not None:
+                print(f"❌ 재생 작업 실패 (기록 {event['seq']}): {future.exception()}")
+                dropped += 1
+        return self.summarize(results, wall, server.unmatched, dropped)
+
+    def summarize(self, results, wall, unmatched, dropped=0):
+        original_span = max((e['t'] + e.get('elapsed', 0) for e in self.events), default=0.0)
+        summary = {'events': len(results), 'original_seconds': round(original_span, 2),
+                   'replay_seconds': round(wall, 2), 'unmatched_audio': unmatched, 'dropped': dropped}
+        for kind in ('transcribe', 'sheets'):
+            rows = [r for r in results if r['type'] == kind]
+            if not rows:
+                continue
+            original = np.array([r['original'] for r in rows]) * 1000
+            replayed = np.array([r['replayed'] for r in rows]) * 1000
+            summary[kind] = {
+                'count': len(rows),
+                'failures': sum(1 for r in rows if not r['success']),
+                'original_p50_ms': round(float(np.percentile(original, 50))),
+                'original_p95_ms': round(float(np.percentile(original, 95))),
+                'replay_p50_ms': round(float(np.percentile(replayed, 50))),
+                'replay_p95_ms': round(float(np.percentile(replayed, 95)))
+            }
+        return summary
+
+def main():
+    """세션 기록 명령행: info / replay"""
+    parser = argparse.ArgumentParser(description="운영 세션 기록 조회 및 재생")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info")
+    info.add_argument("path")
+    replay = sub.add_parser("replay")
+    replay.add_argument("path")
+    replay.add_argument("--speed", type=float, default=1.0, help="재생 배속 (요청 간격을 나눔)")
+    replay.add_argument("--latency-scale", type=float, default=1.0, help="기록된 지연 시간 배율 (0이면 지연 없음)")
+    replay.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.command == "info":
+        events = read_session(args.path)
+        for event in events:
+            if event['type'] == 'transcribe':
+                result = event.get('response', {}).get('transcript', event.get('error', ''))
+                print(f"{event['t']:8.2f}s  인식  {event.get('status', '-')}  {event['elapsed'] * 1000:6.0f}ms  "
+                      f"{len(event.get('audio', b''))}B  {result}")
+            elif event['type'] == 'sheets':
+                print(f"{event['t']:8.2f}s  시트  {event['kind']:5s} {event['op']:15s} {event['elapsed'] * 1000:6.0f}ms"
+                      + (f"  ❌ {event['error']}" if event.get('error') else ""))
+        print(f"총 {len(events)}개 기록")
+        return
+
+    summary = SessionReplayer(args.path, args.speed, args.latency_scale, args.workers).run()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from rate_limiter import QuotaScheduler
+from sheet_writer import SheetBatchWriter
+
+class SheetMirror:
+    def __init__(self, sheet_handler, targets, flush_interval=0.5):
+        """인식 결과를 백업 스프레드시트에 동시에 복제하는 작성기 묶음
+
+        대상마다 별도의 일괄 작성기와 할당량을 두어, 느리거나 실패하는 백업 시트가
+        원본 시트 입력을 지연시키지 않습니다.
+        targets: [{"spreadsheet": 백업 이름, "sheet": 시트(없으면 원본과 같은 이름),
+                   "source": 원본 이름(없으면 모든 원본), "write_per_minute": 60}, ...]
+        """
+        self.targets = []
+        for target in targets:
+            quota = QuotaScheduler(read_per_minute=target.get("read_per_minute", 60),
+                                   write_per_minute=target.get("write_per_minute", 60),
+                                   drive_per_minute=target.get("drive_per_minute", 60))
+            writer = SheetBatchWriter(sheet_handler, flush_interval=flush_interval, quota=quota, primary=False)
+            self.targets.append((target, writer))
+        print(f"🪞 백업 시트 복제 사용: {[target['spreadsheet'] for target in targets]}")
+
+    @classmethod
+    def from_settings(cls, sheet_handler, settings_manager):
+        """app_settings.json의 sheet_mirrors 항목으로 생성 (대상이 없으면 None)"""
+        targets = settings_manager.get_setting("sheet_mirrors", []) if settings_manager else []
+        targets = [target for target in targets if target.get("spreadsheet")]
+        if not targets:
+            return None
+        return cls(sheet_handler, targets)
+
+    def submit(self, spreadsheet_title, sheet_title, cell, text, confidence=0.0):
+        """원본 입력 한 건을 해당하는 백업 대상마다 대기열에 추가 (즉시 반환)"""
+        for target, writer in self.targets:
+            source = target.get("source")
+            if source and source != spreadsheet_title:
+                continue
+            if target["spreadsheet"] == spreadsheet_title and not target.get("sheet"):
+                continue  # 자기 자신으로 복제하지 않음
+            writer.enqueue(target["spreadsheet"], target.get("sheet") or sheet_title, cell, text, confidence)
+
+    def get_stats(self):
+        """대상별 작성 통계 (대기 건수, 지연 시간, 실패 건수)"""
+        return {target["spreadsheet"] + "/" + (target.get("sheet") or "*"): writer.get_stats()
+                for target, writer in self.targets}
+
+    def close(self, timeout=5):
+        """남은 복제 요청을 전송하고 종료"""
+        for target, writer in self.targets:
+            writer.close(timeout)
@@ -0,0 +1,143 @@
+import threading
+import time
+import queue
+from datetime import datetime
+
+class SheetBatchWriter:
+    def __init__(self, sheet_handler, flush_interval=0.5, max_batch=50, quota=None, primary=True):
+        """여러 클라이언트의 셀 입력을 모아 워크시트별 batch_update로 전송하는 공유 작성기
+
+        quota를 주면 핸들러와 별도의 할당량으로 전송합니다 (백업 시트 작성기용).
+        primary가 False이면 백업 시트로 다시 복제하지 않고, 실패 시 로컬 파일에도 저장하지 않습니다.
+        """
+        self.sheet_handler = sheet_handler
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.quota = quota or sheet_handler.quota
+        self.primary = primary
+
+        self.pending = queue.Queue()
+        self.worksheet_cache = {}  # (스프레드시트, 시트) -> 워크시트 객체
+        self.cache_lock = threading.Lock()
+
+        # 통계
+        self.batches_sent = 0
+        self.cells_written = 0
+        self.fallback_count = 0
+        self.failed_count = 0
+        self.last_lag = 0.0  # 대기열 추가부터 입력 완료까지 걸린 시간(초)
+        self.max_lag = 0.0
+
+        self.running = True
+        self.worker = threading.Thread(target=self.flush_loop, daemon=True)
+        self.worker.start()
+
+    def enqueue(self, spreadsheet_title, sheet_title, cell, text, confidence=0.0, callback=None):
+        """셀 입력 요청을 대기열에 추가 (callback(성공여부)는 전송 후 호출)"""
+        mirror = getattr(self.sheet_handler, 'mirror', None)
+        if self.primary and mirror:
+            mirror.submit(spreadsheet_title, sheet_title, cell, text, confidence)
+        self.pending.put({
+            'spreadsheet': spreadsheet_title,
+            'sheet': sheet_title,
+            'cell': cell,
+            'text': text,
+            'confidence': confidence,
+            'callback': callback,
+            'queued_at': time.time()
+        })
+
+    def get_worksheet(self, spreadsheet_title, sheet_title):
+        """워크시트 객체 가져오기 (한 번 연 워크시트는 재사용)"""
+        key = (spreadsheet_title, sheet_title)
+        with self.cache_lock:
+            if key in self.worksheet_cache:
+                return self.worksheet_cache[key]
+
+        quota = self.quota
+        spreadsheet = quota.call('drive', self.sheet_handler.gc.open, spreadsheet_title)
+        worksheet = quota.call('read', spreadsheet.worksheet, sheet_title)
+        with self.cache_lock:
+            self.worksheet_cache[key] = worksheet
+        return worksheet
+
+    def flush_loop(self):
+        """대기열을 주기적으로 비우며 일괄 전송"""
+        while self.running or not self.pending.empty():
+            batch = []
+            try:
+                batch.append(self.pending.get(timeout=self.flush_interval))
+            except queue.Empty:
+                continue
+
+            # 짧은 시간 동안 추가 요청을 모아서 한 번에 전송
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self.flush(batch)
+
+    def flush(self, batch):
+        """워크시트별로 묶어서 batch_update 호출"""
+        groups = {}
+        for item in batch:
+            groups.setdefault((item['spreadsheet'], item['sheet']), []).append(item)
+
+        for (spreadsheet_title, sheet_title), items in groups.items():
+            try:
+                worksheet = self.get_worksheet(spreadsheet_title, sheet_title)
+                self.quota.call('write', worksheet.batch_update, [
+                    {'range': item['cell'], 'values': [[item['text']]]} for item in items
+                ])
+                self.batches_sent += 1
+                self.cells_written += len(items)
+                self.last_lag = time.time() - min(item['queued_at'] for item in items)
+                self.max_lag = max(self.max_lag, self.last_lag)
+                print(f"✅ 일괄 입력 완료: {spreadsheet_title}/{sheet_title} {len(items)}개 셀")
+                success = True
+            except Exception as e:
+                print(f"구글 시트 일괄 저장 오류 ({spreadsheet_title}/{sheet_title}): {e}")
+                # 워크시트 캐시 무효화 후 로컬 파일로 폴백 (백업 시트는 실패 건수만 기록)
+                with self.cache_lock:
+                    self.worksheet_cache.pop((spreadsheet_title, sheet_title), None)
+                if self.primary:
+                    for item in items:
+                        timestamp = datetime.fromtimestamp(item['queued_at']).strftime("%Y-%m-%d %H:%M:%S")
+                        self.sheet_handler.save_to_local_file(timestamp, item['text'], item['confidence'])
+                    self.fallback_count += len(items)
+                else:
+                    self.failed_count += len(items)
+                success = False
+
+            for item in items:
+                if item['callback']:
+                    try:
+                        item['callback'](success)
+                    except Exception as e:
+                        print(f"일괄 저장 콜백 오류: {e}")
+
+    def get_stats(self):
+        """작성기 통계 반환"""
+        with self.pending.mutex:
+            oldest = self.pending.queue[0]['queued_at'] if self.pending.queue else None
+        return {
+            'pending': self.pending.qsize(),
+            'batches_sent': self.batches_sent,
+            'cells_written': self.cells_written,
+            'fallback_count': self.fallback_count,
+            'failed_count': self.failed_count,
+            'lag_seconds': round(self.last_lag, 3),
+            'max_lag_seconds': round(self.max_lag, 3),
+            'oldest_pending_seconds': round(time.time() - oldest, 3) if oldest else 0.0
+        }
+
+    def close(self, timeout=5):
+        """남은 요청을 모두 전송하고 종료"""
+        self.running = False
+        self.worker.join(timeout)
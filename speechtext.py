@@ -1,17 +1,37 @@
-import io
-import wave
-import pyaudio
-import threading
 import os
+import pyaudio
 import requests
+from audio_utils import pcm_to_wav_bytes
+from audio_spool import AudioSpool
+from longform import LongFormTranscriber
+from audio_sources import open_source
+from recognition_backends import BackendRouter, DEFAULT_API_URL
+from rate_limiter import PrioritySlots
+from object_upload import ObjectUploader
+from upload_quality import QualityController
+import audio_calibration
+import time
 from datetime import datetime
 
 class SimpleVoiceProcessor:
-    def __init__(self):
+    def __init__(self, api_url=None, pool_size=10):
         """클로드간단버전 기반의 간단한 음성 처리기"""
         self.is_recording = False
-        self.recording_thread = None
         self.gui = None
+        self.engine = None
+        self.usage = None  # 음성 인식 사용량 회계
+        self.archive = None  # 녹음 원본 보관소 (선택)
+        self.capture_process = None  # 별도 프로세스 캡처 (선택)
+        self.capture_stats = {'overflows': 0, 'dropped_frames': 0}
+        self.audio_source = "mic"  # 오디오 입력 지정 (audio_sources.open_source 참고)
+        self.audio_source_speed = None
+        self.input_device_index = None  # 보정 결과로 정한 마이크 장치 번호 (없으면 기본 장치)
+        self.last_source_stats = {}
+        self.settings_manager = None
+        self.recorder = None  # 세션 기록기 (선택)
+        self.uploader = None  # 큰 오디오 버킷 직접 업로드 (선택)
+        self.quality = None  # 네트워크 상태에 따른 업로드 품질 조절 (선택)
+        self.longform = LongFormTranscriber(self)  # 긴 녹음 구간 분할 병렬 인식
         
         # 클로드간단버전과 동일한 설정
         self.RATE = 16000  # Google Cloud 권장 샘플링 레이트
@@ -20,8 +40,19 @@ class SimpleVoiceProcessor:
         self.CHANNELS = 1
         self.RECORD_SECONDS = 15  # 15초로 연장
         
-        # Cloud Run 서버 설정
-        self.api_url = "https://voicetext-api-6qtb5op6hq-du.a.run.app"
+        # Cloud Run 서버 설정 (api_url을 주면 해당 서버만 사용, 아니면 recognition_backends 설정)
+        self.api_url = api_url or DEFAULT_API_URL
+        self.fixed_api_url = api_url is not None
+        
+        # 연결 재사용을 위한 HTTP 세션 (게이트웨이 등 여러 스레드가 공유)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.router = BackendRouter([("기본", self.api_url)], self.session)
+        # 연결을 우선순위 등급별로 나눠 사용 (일괄 작업이 받아쓰기 연결을 모두 차지하지 않도록)
+        self.connections = PrioritySlots(pool_size, reserved=max(1, pool_size // 5))
+        
         self.setup_cloud_run_api()
         
     def setup_cloud_run_api(self):
@@ -29,33 +60,141 @@ class SimpleVoiceProcessor:
         try:
             print("🔗 Cloud Run 서버 연결 중...")
             
-            # 서버 연결 테스트
-            test_response = requests.get(f"{self.api_url}/", timeout=10)
-            if test_response.status_code == 200:
+            # 서버 연결 테스트 (여러 서버면 동시에 확인)
+            available = self.router.probe_all()
+            for name, stats in self.router.get_stats().items():
+                status = "✅" if stats['healthy'] else "❌"
+                print(f"{status} 인식 서버 '{name}': {stats['url']} ({stats['probe_latency_ms']}ms)")
+            if available:
                 print("✅ Cloud Run 서버 연결 성공!")
-                self.api_available = True
             else:
-                print(f"⚠️ Cloud Run 서버 응답 오류: {test_response.status_code}")
-                self.api_available = False
+                print("⚠️ 응답하는 Cloud Run 서버가 없습니다")
+            self.router.start_probing()
             
         except Exception as e:
             print(f"❌ Cloud Run 서버 연결 실패: {e}")
-            self.api_available = False
+    
+    @property
+    def api_available(self):
+        """응답하는 인식 서버가 있는지 (실패로 대기 중인 서버는 상태 확인 후 복구)"""
+        return self.router.available()
     
     def set_gui(self, gui):
         """GUI 참조 설정"""
         self.gui = gui
+    
+    def set_settings_manager(self, settings_manager):
+        """설정 관리자 설정 (녹음 시간, 장문 인식 설정 반영)"""
+        self.settings_manager = settings_manager
+        # 최대 녹음 시간 (0 또는 null이면 시간 제한 없는 장시간 녹음)
+        self.RECORD_SECONDS = settings_manager.get_setting("max_record_seconds", 15)
+        self.longform = LongFormTranscriber.from_settings(self, settings_manager)
+        self.set_audio_source(settings_manager.get_setting("audio_source", "mic"),
+                              settings_manager.get_setting("audio_source_speed"))
+        self.apply_device_calibration()
+        self.uploader = ObjectUploader.from_settings(settings_manager)
+        config = settings_manager.get_setting("recognition_connections", {})
+        if config:
+            self.connections = PrioritySlots(self.connections.slots, config.get("reserved", self.connections.reserved),
+                                             config.get("aging_seconds", 10))
+        # 인식 서버 여러 개가 설정되어 있으면 라우터 교체
+        if not self.fixed_api_url and settings_manager.get_setting("recognition_backends"):
+            self.router.close()
+            self.router = BackendRouter.from_settings(settings_manager, self.session)
+            self.setup_cloud_run_api()
+        self.quality = QualityController.from_settings(settings_manager, self.router)
+    
+    def set_audio_source(self, spec, speed=None):
+        """오디오 입력 변경 (mic, mic:장치번호, file:경로, pipe, tcp:호스트:포트, rtp:호스트:포트)"""
+        self.audio_source = spec or "mic"
+        self.audio_source_speed = speed
+        
+    def current_device_index(self):
+        """mic:장치번호로 지정된 장치 번호 (mic만 지정했으면 None)"""
+        kind, _, target = self.audio_source.partition(":")
+        return int(target) if kind == "mic" and target else None
+    
+    def mic_device_index(self):
+        """실제로 열 마이크 장치 번호 (mic:장치번호 지정이 보정 결과보다 우선)"""
+        index = self.current_device_index()
+        return self.input_device_index if index is None else index
+    
+    def apply_device_calibration(self):
+        """저장된 장치 보정값(청크 크기, 호스트 API) 적용"""
+        calibrated = self.settings_manager.get_setting("audio_devices", {}) if self.settings_manager else {}
+        if not calibrated or not self.audio_source.startswith("mic"):
+            return
+        try:
+            audio = pyaudio.PyAudio()
+            try:
+                devices = audio_calibration.list_input_devices(audio)
+                index = self.current_device_index()
+                if index is None:
+                    index = audio.get_default_input_device_info()['index']
+            finally:
+                audio.terminate()
+            current = next((d for d in devices if d['index'] == index), None)
+            if current is None:
+                return
+            name = next((key for key in calibrated if audio_calibration.same_device(key, current['name'])), None)
+            if name is None:
+                return
+            setting = calibrated[name]
+            self.CHUNK = setting['chunk']
+            device = audio_calibration.find_device(devices, name, setting.get('host_api'))
+            if device and self.current_device_index() is None:
+                self.input_device_index = device['index']
+            print(f"🎚️ 장치 보정값 적용: {name} (청크 {self.CHUNK}, {setting.get('host_api')})")
+        except Exception as e:
+            print(f"⚠️ 장치 보정값 적용 실패: {e}")
+    
+    def calibrate_audio(self, seconds=2.0, chunk_sizes=None):
+        """현재 마이크를 호스트 API/청크 크기별로 측정해 가장 좋은 설정을 저장하고 보고서 반환"""
+        if self.is_recording:
+            return "녹음 중에는 보정할 수 없습니다"
+        device_name, results, best = audio_calibration.calibrate(
+            device_index=self.current_device_index(), rate=self.RATE, channels=self.CHANNELS,
+            chunk_sizes=chunk_sizes or audio_calibration.DEFAULT_CHUNK_SIZES, seconds=seconds)
+        report = audio_calibration.format_report(device_name, results, best)
+        print(report)
+        if best and self.settings_manager:
+            calibrated = dict(self.settings_manager.get_setting("audio_devices", {}))
+            calibrated[device_name] = audio_calibration.to_setting(best)
+            self.settings_manager.set_setting("audio_devices", calibrated)
+            self.CHUNK = best['chunk']
+            if self.current_device_index() is None:
+                self.input_device_index = best['device_index']
+        return report
+    
+    def set_engine(self, engine):
+        """처리 엔진 설정"""
+        self.engine = engine
+    
+    def get_engine(self):
+        """처리 엔진 반환 (설정되지 않았으면 기본 엔진 생성)"""
+        if self.engine is None:
+            from engine import VoicePipelineEngine
+            self.engine = VoicePipelineEngine()
+        self.engine.start()
+        return self.engine
         
     def start_recording(self):
-        """녹음 시작"""
+        """녹음 시작 (녹음 작업을 처리 엔진에 제출)"""
         if self.is_recording:
             return
             
         self.is_recording = True
         
-        # 녹음 스레드 시작
-        self.recording_thread = threading.Thread(target=self.record_and_recognize, daemon=True)
-        self.recording_thread.start()
+        # 입력 대상은 녹음을 시작할 때 UI 스레드에서 정해 작업과 함께 전달 (결과 입력 시 위젯을 읽지 않음)
+        target = self.gui.reserve_target() if self.gui else None
+        job = {
+            'processor': self,
+            'sink': lambda text, confidence: self.display_result(text, confidence, target),
+            'on_error': lambda message: self.report_error(message, target)
+        }
+        if self.get_engine().submit(job) is None:
+            self.is_recording = False
+            self.report_error("❌ 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요", target)
         
     def stop_recording(self):
         """녹음 중지"""
@@ -67,147 +206,133 @@ class SimpleVoiceProcessor:
             self.gui.update_status("⏹️ 녹음 중지됨", "orange")
             self.gui.reset_buttons()
         
-    def record_and_recognize(self):
-        """클로드간단버전과 동일한 방식의 녹음 및 인식"""
-        try:
+    def capture_audio(self):
+        """마이크에서 녹음 (중지 요청 또는 최대 녹음 시간까지)
+
+        RECORD_SECONDS가 있으면 프레임 목록을, 없으면(무제한) AudioSpool을 반환
+        """
+        unlimited = not self.RECORD_SECONDS
+        if unlimited:
+            print("시간 제한 없이 녹음을 시작합니다 (스풀 파일 사용)...")
+        else:
             print(f"{self.RECORD_SECONDS}초간 녹음을 시작합니다...")
-            
-            # GUI 상태 업데이트
-            if self.gui:
-                self.gui.update_status("🎙️ 녹음 중...", "red")
-            
-            # 클로드간단버전과 동일한 녹음 설정
-            audio = pyaudio.PyAudio()
-            
-            stream = audio.open(format=self.FORMAT,
-                               channels=self.CHANNELS,
-                               rate=self.RATE,
-                               input=True,
-                               frames_per_buffer=self.CHUNK)
-            
-            frames = []
-            for i in range(0, int(self.RATE / self.CHUNK * self.RECORD_SECONDS)):
-                if not self.is_recording:
-                    print("사용자가 녹음을 중지했습니다.")
+        
+        # GUI 상태 업데이트
+        if self.gui:
+            self.gui.update_status("🎙️ 녹음 중...", "red")
+        
+        frames = []
+        spool = AudioSpool(rate=self.RATE, channels=self.CHANNELS) if unlimited else None
+        if (self.capture_process and self.capture_process.alive and self.audio_source.startswith("mic")
+                and self.current_device_index() in (None, self.capture_process.device_index)):
+            self.capture_from_process(frames, spool)
+        else:
+            self.capture_from_source(frames, spool)
+        
+        if spool:
+            print(f"녹음 완료: {spool.duration():.1f}초 (스풀 {spool.size}바이트)")
+        else:
+            print(f"녹음 완료: {len(frames)}개 청크")
+        
+        # GUI 상태 업데이트
+        if (frames or (spool and spool.size)) and self.gui:
+            self.gui.update_status("☁️ 음성 인식 중...", "blue")
+        return spool if spool else frames
+    
+    def capture_from_process(self, frames, spool):
+        """캡처 프로세스의 공유 메모리 링에서 읽기 (링의 뷰에서 스풀 또는 미리 잡은 버퍼로 바로 기록)"""
+        capture = self.capture_process
+        max_bytes = None if spool else int(self.RATE * self.RECORD_SECONDS) * 2 * self.CHANNELS
+        buffer = None if spool else bytearray(max_bytes)
+        received = 0
+        capture.begin()
+        try:
+            while self.is_recording and (max_bytes is None or received < max_bytes):
+                views, position = capture.read_views()
+                for view in views:
+                    block = view if max_bytes is None else view[:max_bytes - received]
+                    if spool:
+                        spool.append(block)
+                    else:
+                        buffer[received:received + len(block)] = block
+                    received += len(block)
+                    block.release()
+                    view.release()
+                capture.advance(position)
+                if not capture.alive:
+                    print("❌ 캡처 프로세스가 중단되었습니다")
                     break
-                    
-                try:
-                    data = stream.read(self.CHUNK, exception_on_overflow=False)
-                    frames.append(data)
-                except Exception as read_error:
-                    print(f"오디오 읽기 오류: {read_error}")
-                    continue
-            
-            stream.stop_stream()
-            stream.close()
-            audio.terminate()
-            
             if not self.is_recording:
-                # 사용자가 중지한 경우 - 수집된 데이터로 음성 인식 진행
                 print("사용자가 녹음을 중지했습니다. 수집된 데이터로 음성 인식을 진행합니다.")
-                if len(frames) > 0:
-                    # 수집된 데이터가 있으면 음성 인식 진행
-                    self.process_recorded_audio(frames, audio)
-                else:
-                    print("수집된 오디오 데이터가 없습니다.")
-                    if self.gui:
-                        self.gui.update_status("❌ 수집된 오디오 데이터가 없습니다", "red")
-                        self.gui.reset_buttons()
-                return
-            
-            if len(frames) == 0:
-                print("녹음된 데이터가 없습니다.")
-                if self.gui:
-                    self.gui.update_status("❌ 녹음된 데이터가 없습니다", "red")
-                    self.gui.reset_buttons()
-                return
-            
-            # 클로드간단버전과 동일한 WAV 파일 저장
-            filename = "simple_test.wav"
-            try:
-                wf = wave.open(filename, 'wb')
-                wf.setnchannels(self.CHANNELS)
-                wf.setsampwidth(audio.get_sample_size(self.FORMAT))
-                wf.setframerate(self.RATE)
-                wf.writeframes(b''.join(frames))
-                wf.close()
-                
-                print(f"녹음 완료: {filename}")
-                
-                # GUI 상태 업데이트
-                if self.gui:
-                    self.gui.update_status("☁️ 음성 인식 중...", "blue")
-                
-                # 클로드간단버전과 동일한 음성 인식 수행
-                self.speech_to_text_simple(filename)
-                
-            except Exception as wav_error:
-                print(f"WAV 파일 저장 오류: {wav_error}")
-                if self.gui:
-                    self.gui.update_status(f"❌ WAV 파일 저장 오류: {wav_error}", "red")
-                    self.gui.reset_buttons()
-                return
-            
-            # 임시 파일 삭제
-            try:
-                if os.path.exists(filename):
-                    os.remove(filename)
-                    print("임시 파일 삭제 완료")
-            except Exception as delete_error:
-                print(f"임시 파일 삭제 오류: {delete_error}")
-                
-        except Exception as e:
-            print(f"녹음 오류: {e}")
-            import traceback
-            traceback.print_exc()
+        finally:
+            overflows, dropped_frames = capture.end()
+            if buffer is not None and received:
+                del buffer[received:]
+                frames.append(buffer)
+        self.capture_stats['overflows'] += overflows
+        self.capture_stats['dropped_frames'] += dropped_frames
+        if overflows or dropped_frames:
+            message = f"⚠️ 녹음 중 입력 넘침 {overflows}회, 유실 {dropped_frames / self.RATE:.2f}초"
+            print(message)
             if self.gui:
-                self.gui.update_status(f"❌ 녹음 오류: {e}", "red")
-                self.gui.reset_buttons()
+                self.gui.update_status(message, "orange")
     
-    def process_recorded_audio(self, frames, audio):
-        """수집된 오디오 데이터 처리"""
+    def capture_from_source(self, frames, spool):
+        """오디오 입력(마이크, 파일, 파이프, 네트워크)에서 블록 단위로 읽기"""
+        spec = self.audio_source
+        if spec.startswith("mic") and self.mic_device_index() is not None:
+            spec = f"mic:{self.mic_device_index()}"
+        source = open_source(spec, self.RATE, self.CHANNELS, self.CHUNK, self.audio_source_speed)
+        max_bytes = None if spool else int(self.RATE * self.RECORD_SECONDS) * 2 * self.CHANNELS
+        received = 0
         try:
-            # 클로드간단버전과 동일한 WAV 파일 저장
-            filename = "simple_test.wav"
-            try:
-                wf = wave.open(filename, 'wb')
-                wf.setnchannels(self.CHANNELS)
-                wf.setsampwidth(audio.get_sample_size(self.FORMAT))
-                wf.setframerate(self.RATE)
-                wf.writeframes(b''.join(frames))
-                wf.close()
-                
-                print(f"녹음 완료: {filename}")
-                
-                # GUI 상태 업데이트
-                if self.gui:
-                    self.gui.update_status("☁️ 음성 인식 중...", "blue")
-                
-                # 클로드간단버전과 동일한 음성 인식 수행
-                self.speech_to_text_simple(filename)
-                
-            except Exception as wav_error:
-                print(f"WAV 파일 저장 오류: {wav_error}")
-                if self.gui:
-                    self.gui.update_status(f"❌ WAV 파일 저장 오류: {wav_error}", "red")
-                    self.gui.reset_buttons()
-                return
-            
-            # 임시 파일 삭제
-            try:
-                if os.path.exists(filename):
-                    os.remove(filename)
-                    print("임시 파일 삭제 완료")
-            except Exception as delete_error:
-                print(f"임시 파일 삭제 오류: {delete_error}")
-                
-        except Exception as e:
-            print(f"오디오 처리 오류: {e}")
-            import traceback
-            traceback.print_exc()
-            if self.gui:
-                self.gui.update_status(f"❌ 오디오 처리 오류: {e}", "red")
-                self.gui.reset_buttons()
+            while max_bytes is None or received < max_bytes:
+                if not self.is_recording:
+                    print("사용자가 녹음을 중지했습니다. 수집된 데이터로 음성 인식을 진행합니다.")
+                    break
+                block = source.read_block()
+                if block is None:
+                    print("오디오 입력이 끝났습니다.")
+                    break
+                if spool:
+                    spool.append(block)
+                else:
+                    frames.append(bytes(block))
+                received += len(block)
+        finally:
+            source.close()
+        self.last_source_stats = source.get_stats()
+        print(f"입력 처리량: {self.last_source_stats}")
+    
+    def transcribe_spool(self, spool):
+        """긴 녹음을 무음 기준 구간으로 나눠 병렬 인식, (텍스트, 신뢰도, 성공 여부) 반환
+
+        버킷 직접 업로드를 쓰고 녹음이 기준 크기 이상이면 통째로 올려 한 번에 인식하고,
+        업로드나 인식이 실패하면 구간별 인식으로 진행합니다."""
+        if self.uploader and self.uploader.should_upload(spool.size):
+            text, confidence, success = self.transcribe_uploaded_spool(spool)
+            if success:
+                return text, confidence, True
+            print("⚠️ 버킷 경로 인식 실패 - 구간별 인식으로 진행합니다")
+        result = self.longform.transcribe(spool)
+        for segment in result['segments']:
+            status = "✅" if segment['success'] else "❌"
+            print(f"  {status} 구간 {segment['index'] + 1} ({segment['start_seconds']:.0f}초~, "
+                  f"신뢰도 {segment['confidence']:.2f}, 시도 {segment['attempts']}회)")
+        if not result['text']:
+            return "[오류] 긴 녹음 인식 실패", 0.0, False
+        return result['text'], result['confidence'], result['success']
+    
+    def report_error(self, message, target=None):
+        """처리 오류를 GUI에 표시 (target을 주면 녹음 시작 때 정한 셀을 되돌림)
+
+        엔진 스레드에서 호출되므로 GUI 메서드는 UI 스레드로 넘겨 실행됩니다."""
+        self.is_recording = False
+        if self.gui:
+            self.gui.update_status(message, "red")
+            self.gui.reset_buttons()
+            if target:
+                self.gui.release_target(target)
     
     def speech_to_text_simple(self, audio_file):
         """Cloud Run 서버를 통한 음성 인식"""
@@ -218,50 +343,8 @@ class SimpleVoiceProcessor:
                 self.display_result(text, confidence)
                 return
             
-            # Cloud Run 서버로 HTTP 요청
-            try:
-                with open(audio_file, 'rb') as f:
-                    files = {'audio': f}
-                    data = {
-                        'language': 'ko-KR',
-                        'sample_rate': self.RATE,
-                        'encoding': 'LINEAR16'
-                    }
-                    
-                    print("☁️ Cloud Run 서버로 음성 인식 요청 중...")
-                    response = requests.post(
-                        f"{self.api_url}/transcribe",
-                        files=files,
-                        data=data,
-                        timeout=60
-                    )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get('success', False):
-                        text = result.get('transcript', '')
-                        confidence = result.get('confidence', 0.0)
-                        
-                        print(f"✅ 인식 완료: '{text}' (신뢰도: {confidence:.2f})")
-                        self.display_result(text, confidence)
-                    else:
-                        error_msg = result.get('error', '음성 인식 실패')
-                        print(f"❌ 서버 오류: {error_msg}")
-                        self.display_result(f"[서버 오류] {error_msg}", 0.0)
-                else:
-                    print(f"❌ HTTP 오류: {response.status_code}")
-                    print(f"응답 내용: {response.text}")
-                    self.display_result(f"[HTTP 오류] {response.status_code}", 0.0)
-                    
-            except requests.exceptions.Timeout:
-                print("❌ 요청 시간 초과")
-                self.display_result("[오류] 서버 응답 시간 초과", 0.0)
-            except requests.exceptions.RequestException as e:
-                print(f"❌ 네트워크 오류: {e}")
-                self.display_result(f"[네트워크 오류] {str(e)[:50]}...", 0.0)
-            except Exception as e:
-                print(f"❌ API 오류: {e}")
-                self.display_result(f"[API 오류] {str(e)[:50]}...", 0.0)
+            text, confidence, _ = self.transcribe(audio_file)
+            self.display_result(text, confidence)
             
         except Exception as e:
             print(f"❌ 음성 인식 오류: {e}")
@@ -270,8 +353,182 @@ class SimpleVoiceProcessor:
             if self.gui:
                 self.gui.reset_buttons()
     
-    def display_result(self, text, confidence):
-        """인식 결과 표시"""
+    def transcribe(self, audio, timeout=None, priority='interactive'):
+        """오디오(WAV 파일 경로 또는 WAV 바이트)를 인식해 (텍스트, 신뢰도, 성공 여부) 반환
+
+        priority는 rate_limiter.PRIORITIES의 등급 (일괄 재인식은 'batch' 등),
+        timeout을 주지 않으면 품질 조절기의 예상 시간(없으면 60초)으로 제한"""
+        text, confidence, success, _ = self.transcribe_detailed(audio, timeout, priority=priority)
+        return text, confidence, success
+    
+    def transcribe_detailed(self, audio, timeout=None, extra_data=None, utterances=1, priority='interactive'):
+        """인식 후 (텍스트, 신뢰도, 성공 여부, 서버 응답 딕셔너리) 반환"""
+        try:
+            if self.usage and self.usage.block_when_over_budget and self.usage.is_over_budget():
+                print("❌ 음성 인식 예산 초과로 요청을 보내지 않습니다")
+                return "[오류] 음성 인식 예산 초과", 0.0, False, {}
+            
+            if isinstance(audio, (bytes, bytearray, memoryview)):
+                filename, content = 'audio.wav', audio
+            else:
+                # 다른 서버로 재시도할 수 있도록 한 번 읽어서 전송
+                with open(audio, 'rb') as f:
+                    filename, content = os.path.basename(audio), f.read()
+            # 서버에 전달할 오디오 시간 (WAV 헤더 44바이트 제외)
+            audio_seconds = max(0, len(content) - 44) / (self.RATE * 2 * self.CHANNELS)
+            content_type = 'audio/wav'
+            
+            # 네트워크 상태에 맞춰 인코딩/샘플링 레이트와 제한 시간 결정
+            decision = self.quality.choose(audio_seconds) if self.quality else None
+            if decision:
+                encoded = self.quality.encode(content, decision)
+                if encoded:
+                    filename, content, content_type, fields = encoded
+                    extra_data = dict(extra_data or {}, **fields)
+                if timeout is None:
+                    timeout = decision['timeout']
+            if timeout is None:
+                timeout = 60
+            
+            started = time.time()
+            try:
+                uri = None
+                if self.uploader and self.uploader.should_upload(len(content)):
+                    # 큰 오디오는 버킷에 직접 올리고 서버에는 객체 URI만 전달 (요청 크기 제한 회피)
+                    try:
+                        uri = self.uploader.upload(content, content_type, filename.rsplit('.', 1)[-1])
+                    except Exception as e:
+                        print(f"⚠️ 버킷 업로드 실패 - 요청 본문으로 전송합니다: {str(e)[:60]}")
+                        started = time.time()  # 실패한 업로드 시간은 네트워크 추정에서 제외
+                if uri:
+                    response = self._post_transcribe(None, timeout, dict(extra_data or {}, audio_uri=uri), priority)
+                else:
+                    files = {'audio': (filename, bytes(content), content_type)}
+                    response = self._post_transcribe(files, timeout, extra_data, priority)
+            except Exception:
+                if decision:
+                    self.quality.record(decision, len(content), time.time() - started, False)
+                raise
+            if decision:
+                self.quality.record(decision, len(content), time.time() - started, response.status_code == 200)
+            
+            return self.read_transcribe_response(response, audio_seconds, utterances)
+                
+        except requests.exceptions.Timeout:
+            print("❌ 요청 시간 초과")
+            return "[오류] 서버 응답 시간 초과", 0.0, False, {}
+        except requests.exceptions.RequestException as e:
+            print(f"❌ 네트워크 오류: {e}")
+            return f"[네트워크 오류] {str(e)[:50]}...", 0.0, False, {}
+        except Exception as e:
+            print(f"❌ API 오류: {e}")
+            return f"[API 오류] {str(e)[:50]}...", 0.0, False, {}
+    
+    def read_transcribe_response(self, response, audio_seconds, utterances=1):
+        """/transcribe 응답을 (텍스트, 신뢰도, 성공 여부, 서버 응답 딕셔너리)로 변환"""
+        if response.status_code == 200:
+            result = response.json()
+            if self.usage:
+                self.usage.record(audio_seconds, utterances)
+            if result.get('success', False):
+                text = result.get('transcript', '')
+                confidence = result.get('confidence', 0.0)
+                
+                print(f"✅ 인식 완료: '{text}' (신뢰도: {confidence:.2f})")
+                return text, confidence, True, result
+            else:
+                error_msg = result.get('error', '음성 인식 실패')
+                print(f"❌ 서버 오류: {error_msg}")
+                return f"[서버 오류] {error_msg}", 0.0, False, result
+        else:
+            print(f"❌ HTTP 오류: {response.status_code}")
+            print(f"응답 내용: {response.text}")
+            return f"[HTTP 오류] {response.status_code}", 0.0, False, {}
+    
+    def transcribe_uploaded_spool(self, spool, priority='interactive'):
+        """긴 녹음을 버킷에 통째로 올려 객체 URI로 한 번에 인식, (텍스트, 신뢰도, 성공 여부) 반환"""
+        if self.usage and self.usage.block_when_over_budget and self.usage.is_over_budget():
+            print("❌ 음성 인식 예산 초과로 요청을 보내지 않습니다")
+            return "[오류] 음성 인식 예산 초과", 0.0, False
+        try:
+            uri = self.uploader.upload_spool(spool)
+        except Exception as e:
+            print(f"⚠️ 버킷 업로드 실패: {str(e)[:60]}")
+            return "[오류] 버킷 업로드 실패", 0.0, False
+        audio_seconds = spool.duration()
+        try:
+            # 서버가 긴 오디오를 비동기 인식으로 처리하므로 오디오 길이만큼 기다림
+            response = self._post_transcribe(None, max(60, audio_seconds), {'audio_uri': uri}, priority)
+            text, confidence, success, _ = self.read_transcribe_response(response, audio_seconds)
+            return text, confidence, success
+        except Exception as e:
+            print(f"❌ URI 인식 오류: {e}")
+            return f"[오류] {str(e)[:50]}...", 0.0, False
+    
+    def transcribe_packed(self, pcm_list, packer, timeout=None):
+        """짧은 발화 여러 개를 한 번에 인식, 발화별 (텍스트, 신뢰도) 목록 반환 (분리 불가 시 None)"""
+        pcm, boundaries = packer.pack(pcm_list)
+        wav = pcm_to_wav_bytes(pcm, self.RATE, self.CHANNELS, 2)
+        print(f"📦 발화 {len(pcm_list)}개를 한 번에 인식 요청 ({packer.duration(pcm):.1f}초)")
+        text, confidence, success, result = self.transcribe_detailed(
+            wav, timeout, {'enable_word_time_offsets': 'true'}, utterances=len(pcm_list))
+        if not success:
+            return [(text, 0.0)] * len(pcm_list)
+        
+        words = result.get('words')
+        if words is None:
+            # 서버가 단어 시간 정보를 지원하지 않으면 패킹 중단
+            print("⚠️ 서버가 단어 시간 정보를 반환하지 않아 발화 패킹을 비활성화합니다")
+            packer.supported = False
+            return None
+        return [(part, confidence) for part in packer.split(words, boundaries)]
+    
+    def _post_transcribe(self, files, timeout, extra_data=None, priority='interactive'):
+        """/transcribe 엔드포인트로 요청 전송 (우선순위 등급별 연결 몫 안에서, files가 None이면 audio_uri 요청)"""
+        data = {
+            'language': 'ko-KR',
+            'sample_rate': self.RATE,
+            'encoding': 'LINEAR16'
+        }  # 품질 조절기가 인코딩을 바꾸면 extra_data로 덮어씀
+        data.update(extra_data or {})
+        
+        print("☁️ Cloud Run 서버로 음성 인식 요청 중...")
+        sent_audio = files['audio'][1] if files else None
+        started = time.time()
+        try:
+            with self.connections.slot(priority):
+                response = self.router.post(
+                    "/transcribe",
+                    files=files,
+                    data=data,
+                    timeout=timeout
+                )
+        except Exception as e:
+            if self.recorder:
+                self.recorder.record_transcribe(sent_audio, data, started, time.time() - started, error=e)
+            raise
+        if self.recorder:
+            self.recorder.record_transcribe(sent_audio, data, started, time.time() - started, response)
+        return response
+    
+    def set_usage_accountant(self, usage):
+        """음성 인식 사용량 회계 모듈 설정"""
+        self.usage = usage
+    
+    def set_capture_process(self, capture_process):
+        """별도 프로세스 캡처 설정 (None이면 현재 프로세스에서 녹음)"""
+        self.capture_process = capture_process
+    
+    def set_session_recorder(self, recorder):
+        """세션 기록기 설정 (None이면 기록 안 함)"""
+        self.recorder = recorder
+    
+    def set_audio_archive(self, archive):
+        """녹음 원본 보관소 설정 (None이면 보관 안 함)"""
+        self.archive = archive
+    
+    def display_result(self, text, confidence, target=None):
+        """인식 결과 표시, 입력 대상(스프레드시트/시트/셀) 반환 (target은 녹음 시작 때 정한 대상)"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         confidence_text = f" (신뢰도: {confidence:.2f})" if confidence > 0 else ""
         result = f"[{timestamp}] {text}{confidence_text}"
@@ -279,9 +536,10 @@ class SimpleVoiceProcessor:
         
         # GUI가 있으면 GUI에도 표시
         if self.gui:
-            self.gui.display_result(text, confidence)
+            target = self.gui.display_result(text, confidence, target)
             # 음성 인식 완료 후 GUI 상태 초기화
             self.gui.reset_buttons()
+        return target
 
 def main():
     """테스트용 메인 함수"""
@@ -0,0 +1,279 @@
+import hashlib
+import hmac
+import json
+import os
+import random
+import socket
+import threading
+import time
+import urllib.parse
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StandInTranscribeServer:
+    def __init__(self, latency_ms=300, jitter_ms=100, error_rate=0.0, max_concurrent=None,
+                 host="127.0.0.1", port=0, object_store=None):
+        """Cloud Run /transcribe를 흉내 내는 로컬 대역 서버 (오프라인 테스트/부하 테스트용)
+
+        object_store(StandInObjectStore)를 주면 audio_uri로 보낸 요청은 저장소에서 오디오를 읽습니다."""
+        self.latency_ms = latency_ms
+        self.object_store = object_store
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        # Cloud Run 인스턴스의 동시 처리 한도 (초과 요청은 대기)
+        self.slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+        self.requests = 0
+        self.audio_bytes = 0
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self.send_json(200, {'status': 'ok'})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                status, payload = server.handle_transcribe(self.path, body)
+                self.send_json(status, payload)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_transcribe(self, path, body):
+        """인식 요청 처리 (지연/오류 흉내)"""
+        if not path.startswith("/transcribe"):
+            return 404, {'success': False, 'error': 'not found'}
+        if self.object_store and not body.startswith(b"--"):
+            # multipart가 아니면 audio_uri 폼 요청
+            fields = urllib.parse.parse_qs(body.decode('utf-8'))
+            try:
+                body = self.object_store.read(fields['audio_uri'][0])
+            except KeyError:
+                return 400, {'success': False, 'error': 'audio_uri not found'}
+        with self.lock:
+            self.requests += 1
+            self.audio_bytes += len(body)
+            number = self.requests
+
+        if self.slots:
+            self.slots.acquire()
+        try:
+            delay = max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000.0
+            time.sleep(delay)
+        finally:
+            if self.slots:
+                self.slots.release()
+
+        if random.random() < self.error_rate:
+            return 500, {'success': False, 'error': 'stand-in error'}
+        return 200, {'success': True, 'transcript': f"대역 인식 결과 {number}", 'confidence': 0.9}
+
+    def start(self):
+        """백그라운드 스레드에서 서버 시작"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class StandInResponse:
+    def __init__(self, status_code, retry_after=None):
+        """gspread APIError.response를 흉내 내는 응답 객체"""
+        self.status_code = status_code
+        self.headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+
+class StandInAPIError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"stand-in API error {status_code}")
+        self.response = StandInResponse(status_code, retry_after)
+
+class StandInWorksheet:
+    def __init__(self, client, spreadsheet, title):
+        self.client = client
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.cells = {}
+
+    def update_cell(self, row, col, value):
+        self.client.api_call('write')
+        self.cells[(row, col)] = value
+
+    def batch_update(self, data):
+        self.client.api_call('write')
+        for item in data:
+            self.cells[item['range']] = item['values'][0][0]
+
+class StandInSpreadsheet:
+    def __init__(self, client, title, sheet_titles):
+        self.client = client
+        self.title = title
+        self.id = f"standin-{title}"
+        self.sheets = [StandInWorksheet(client, self, name) for name in sheet_titles]
+
+    def worksheets(self):
+        self.client.api_call('read')
+        return list(self.sheets)
+
+    def worksheet(self, title):
+        self.client.api_call('read')
+        for sheet in self.sheets:
+            if sheet.title == title:
+                return sheet
+        raise StandInAPIError(404)
+
+class StandInSheetsClient:
+    def __init__(self, spreadsheets=None, latency_ms=80, per_minute_quota=60, error_rate=0.0):
+        """gspread 클라이언트를 흉내 내는 대역 (분당 할당량 초과 시 429 + Retry-After)"""
+        spreadsheets = spreadsheets or {"음성기록": ["시트1"]}
+        self.latency_ms = latency_ms
+        self.per_minute_quota = per_minute_quota
+        self.error_rate = error_rate
+        self.spreadsheets = [StandInSpreadsheet(self, title, sheets) for title, sheets in spreadsheets.items()]
+
+        self.calls = deque()  # 최근 1분간 호출 시각
+        self.lock = threading.Lock()
+        self.stats = {'read': 0, 'write': 0, 'drive': 0, 'throttled': 0, 'errors': 0}
+
+    def api_call(self, kind):
+        """API 호출 한 번 (지연, 할당량, 오류 흉내)"""
+        now = time.time()
+        with self.lock:
+            while self.calls and self.calls[0] < now - 60:
+                self.calls.popleft()
+            if self.per_minute_quota and len(self.calls) >= self.per_minute_quota:
+                self.stats['throttled'] += 1
+                retry_after = max(1, int(self.calls[0] + 60 - now) + 1)
+                raise StandInAPIError(429, retry_after)
+            self.calls.append(now)
+            self.stats[kind] += 1
+        time.sleep(self.latency_ms / 1000.0)
+        if random.random() < self.error_rate:
+            with self.lock:
+                self.stats['errors'] += 1
+            raise StandInAPIError(500)
+
+    def openall(self):
+        self.api_call('drive')
+        return list(self.spreadsheets)
+
+    def open(self, title):
+        self.api_call('drive')
+        for spreadsheet in self.spreadsheets:
+            if spreadsheet.title == title:
+                return spreadsheet
+        raise StandInAPIError(404)
+
+class StandInObjectStore:
+    def __init__(self, bucket="standin-bucket", fail_every=0, host="127.0.0.1", port=0):
+        """서명 URL 업로드를 받는 로컬 객체 저장소 대역 (GCSObjectStore와 같은 메서드 제공)
+
+        fail_every가 N이면 N번째 PUT마다 연결을 끊어 중단된 업로드를 흉내 냅니다."""
+        self.bucket = bucket
+        self.fail_every = fail_every
+        self.objects = {}
+        self.secret = os.urandom(16)
+        self.lock = threading.Lock()
+        self.puts = 0
+        self.rejected = 0
+
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_PUT(self):
+                parsed = urllib.parse.urlsplit(self.path)
+                name = urllib.parse.unquote(parsed.path[len("/o/"):])
+                signature = urllib.parse.parse_qs(parsed.query).get('signature', [''])[0]
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                status = store.handle_put(name, signature, body)
+                if status is None:
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    def sign(self, name):
+        return hmac.new(self.secret, name.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def handle_put(self, name, signature, body):
+        """PUT 처리: 서명이 맞으면 저장 (None이면 연결 끊기)"""
+        if not hmac.compare_digest(signature, self.sign(name)):
+            with self.lock:
+                self.rejected += 1
+            return 403
+        with self.lock:
+            self.puts += 1
+            if self.fail_every and self.puts % self.fail_every == 0:
+                return None
+            self.objects[name] = body
+        return 200
+
+    def signed_put_url(self, name, content_type=None):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/o/{urllib.parse.quote(name)}?signature={self.sign(name)}"
+
+    def list_sizes(self, prefix):
+        with self.lock:
+            return {name: len(data) for name, data in self.objects.items() if name.startswith(prefix)}
+
+    def compose(self, names, name, content_type=None):
+        with self.lock:
+            self.objects[name] = b''.join(self.objects[source] for source in names)
+
+    def delete(self, names):
+        with self.lock:
+            for name in names:
+                self.objects.pop(name, None)
+
+    def uri(self, name):
+        return f"gs://{self.bucket}/{name}"
+
+    def read(self, uri):
+        """gs:// URI의 객체 내용 (대역 인식 서버/테스트에서 확인용)"""
+        name = uri[len(f"gs://{self.bucket}/"):]
+        with self.lock:
+            return self.objects[name]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,123 @@
+import contextlib
+import csv
+import io
+import threading
+import time
+from types import SimpleNamespace
+import numpy as np
+import audio_archive
+from audio_archive import AudioArchive, retranscribe
+
+class ChunkedAudio:
+    def __init__(self, pcm, chunk_bytes):
+        """iter_views로 여러 조각을 내주는 AudioSpool 대역 (보관 후 close 여부 기록)"""
+        self.pcm = pcm
+        self.chunk_bytes = chunk_bytes
+        self.closed = False
+
+    def iter_views(self):
+        view = memoryview(self.pcm)
+        for start in range(0, len(self.pcm), self.chunk_bytes):
+            yield view[start:start + self.chunk_bytes]
+
+    def close(self):
+        self.closed = True
+
+def make_pcm(index, seconds=0.5):
+    rng = np.random.default_rng(index)
+    tone = np.sin(np.arange(int(16000 * seconds)) * (0.01 + index * 0.003)) * 12000
+    return (tone + rng.standard_normal(len(tone)) * 300).astype(np.int16).tobytes()
+
+def wait_archived(archive, count):
+    deadline = time.time() + 10
+    while archive.get_stats()['archived'] < count and time.time() < deadline:
+        time.sleep(0.01)
+    assert archive.get_stats()['archived'] == count
+
+def test_clips_round_trip_with_one_seek(tmp_path, monkeypatch):
+    """여러 세그먼트에 나눠 보관한 클립 k를 seek 한 번으로 읽으면 원래 PCM 그대로"""
+    archive = AudioArchive(directory=str(tmp_path), segment_bytes=20000)
+    pcms = [make_pcm(index) for index in range(6)]
+    spool = ChunkedAudio(pcms[3], chunk_bytes=4000)  # 조각 경계를 넘는 차분도 이어짐
+    for index, pcm in enumerate(pcms):
+        audio = spool if index == 3 else pcm
+        assert archive.submit(audio, f"문장{index}", 0.9, {'spreadsheet': 's', 'sheet': 't', 'cell': f"A{index + 1}"})
+    wait_archived(archive, 6)
+    assert spool.closed
+
+    seeks = []
+    real_open = open
+
+    def counting_open(path, mode='r', *args, **kwargs):
+        f = real_open(path, mode, *args, **kwargs)
+        real_seek = f.seek
+        f.seek = lambda *a: (seeks.append(a), real_seek(*a))[1]
+        return f
+    monkeypatch.setattr(audio_archive, "open", counting_open, raising=False)
+    try:
+        clips = archive.query(spreadsheet='s')
+        assert [clip['cell'] for clip in clips] == [f"A{index + 1}" for index in range(6)]
+        assert len({clip['segment'] for clip in clips}) > 1
+        for k in (0, 3, 5):
+            seeks.clear()
+            assert archive.read_clip(clips[k]['id']) == pcms[k]
+            assert len(seeks) == 1
+        stats = archive.get_stats()
+        assert stats['raw_bytes'] == sum(len(pcm) for pcm in pcms)
+        assert 0 < stats['ratio'] < 1
+    finally:
+        archive.close()
+
+def test_full_queue_drops_clip_without_blocking(tmp_path, monkeypatch):
+    """기록이 밀려 대기열이 가득 차면 녹음 쪽을 막지 않고 클립을 버린 뒤 스풀을 닫음"""
+    release = threading.Event()
+    write_clip = AudioArchive.write_clip
+
+    def slow_write_clip(self, connection, audio, meta):
+        release.wait(5)
+        write_clip(self, connection, audio, meta)
+    monkeypatch.setattr(AudioArchive, "write_clip", slow_write_clip)
+    archive = AudioArchive(directory=str(tmp_path), queue_size=1)
+    try:
+        assert archive.submit(make_pcm(0), "첫째", 0.9)
+        deadline = time.time() + 5
+        while archive.pending.qsize() and time.time() < deadline:  # 기록 스레드가 첫 클립을 가져갈 때까지
+            time.sleep(0.01)
+        assert archive.submit(make_pcm(1), "둘째", 0.9)
+        spool = ChunkedAudio(make_pcm(2), chunk_bytes=1000)
+        started = time.time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert not archive.submit(spool, "셋째", 0.9)
+        assert time.time() - started < 0.1
+        assert spool.closed
+        assert archive.get_stats()['dropped'] == 1
+    finally:
+        release.set()
+        archive.close()
+    assert archive.stats['archived'] == 2
+
+def test_retranscribe_writes_old_and_new_text_in_clip_order(tmp_path):
+    """일괄 재인식은 보관된 PCM을 다시 인식해 기존/새 결과를 클립 순서대로 CSV에 씀"""
+    archive = AudioArchive(directory=str(tmp_path / "archive"))
+    pcms = [make_pcm(index, seconds=0.2 + index * 0.1) for index in range(5)]
+    for index, pcm in enumerate(pcms):
+        archive.submit(pcm, f"기존{index}", 0.5)
+    wait_archived(archive, 5)
+
+    def transcribe(wav, timeout=None, priority=None):
+        assert priority == 'batch'
+        index = pcms.index(wav[44:])
+        time.sleep(0.05 if index == 0 else 0)  # 앞의 클립이 늦게 끝나도 순서 유지
+        return f"새{index}", 0.95, True
+    voice_processor = SimpleNamespace(transcribe=transcribe, longform=SimpleNamespace(max_seconds=60))
+    output = tmp_path / "retranscribe.csv"
+    try:
+        clips = archive.query()
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert retranscribe(archive, voice_processor, clips, str(output), workers=3) == 5
+    finally:
+        archive.close()
+
+    with open(output, encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))[1:]
+    assert [(row[5], row[6], row[8]) for row in rows] == [(f"기존{i}", f"새{i}", "True") for i in range(5)]
@@ -0,0 +1,100 @@
+import struct
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import audio_sources
+from audio_sources import MAX_READ_ERRORS, NetworkSource, PyAudioSource, open_source
+
+class BrokenStream:
+    def __init__(self, failures):
+        """처음 failures번은 읽기 오류를 내는 PyAudio 스트림 대역"""
+        self.failures = failures
+        self.reads = 0
+
+    def read(self, frames, exception_on_overflow=True):
+        self.reads += 1
+        if self.reads <= self.failures:
+            raise OSError("Input overflowed")
+        return b'\x00\x00' * frames
+
+def test_mic_read_recovers_from_short_error_burst(monkeypatch):
+    """일시적인 읽기 오류는 재시도해서 블록을 돌려줌"""
+    monkeypatch.setattr(audio_sources, "READ_ERROR_DELAY", 0)
+    source = PyAudioSource(block_frames=4)
+    source.stream = BrokenStream(MAX_READ_ERRORS - 1)
+    assert source.read_raw() == b'\x00\x00' * 4
+    assert source.read_errors == MAX_READ_ERRORS - 1
+
+def test_mic_read_gives_up_after_consecutive_errors(monkeypatch):
+    """장치가 계속 오류를 내면 무한 재시도 대신 입력 종료(None)"""
+    monkeypatch.setattr(audio_sources, "READ_ERROR_DELAY", 0)
+    source = PyAudioSource(block_frames=4)
+    source.stream = BrokenStream(failures=10 ** 6)
+    assert source.read_raw() is None
+    assert source.stream.reads == MAX_READ_ERRORS
+
+def test_pipe_source_closes_file_it_opened(tmp_path):
+    """pipe:경로로 연 파일은 close()에서 닫힘"""
+    path = tmp_path / "audio.raw"
+    path.write_bytes(b'\x01\x00' * 10)
+    source = open_source(f"pipe:{path}", block_frames=4)
+    stream = source.stream
+    assert source.read_block() == b'\x01\x00' * 4
+    source.close()
+    assert stream.closed
+
+def test_mic_spec_selects_device(monkeypatch):
+    """mic:장치번호의 번호가 PyAudioSource의 device_index로 전달됨"""
+    monkeypatch.setattr(PyAudioSource, "open", lambda self: self)
+    assert open_source("mic:3").device_index == 3
+    assert open_source("mic").device_index is None
+
+def test_capture_process_uses_mic_spec_device():
+    """설정의 audio_source가 mic:장치번호면 캡처 프로세스도 그 장치를 염"""
+    pytest.importorskip("pyaudio")
+    import speechtext
+    from capture_process import CaptureProcess
+    processor = speechtext.SimpleVoiceProcessor.__new__(speechtext.SimpleVoiceProcessor)
+    processor.RATE, processor.CHANNELS, processor.CHUNK = 16000, 1, 1024
+    processor.input_device_index = 1  # 보정 결과보다 명시한 장치가 우선
+    processor.set_audio_source("mic:3")
+    settings = SimpleNamespace(get_setting=lambda key, default=None: {'enabled': True})
+    assert CaptureProcess.from_settings(processor, settings).device_index == 3
+
+def rtp_packet(sequence, payload, payload_type=0):
+    return bytes([0x80, payload_type]) + struct.pack('!HII', sequence, sequence * 160, 1234) + payload
+
+def rtp_source():
+    return NetworkSource(protocol="rtp", rate=16000)
+
+def test_rtp_short_loss_is_filled_with_silence():
+    """짧은 패킷 유실은 같은 길이의 무음으로 메움"""
+    source = rtp_source()
+    tone = b'\x10' * 160  # PCMU 20ms → 16kHz 320샘플
+    assert len(source.decode_rtp(rtp_packet(1, tone))) == 640
+    assert len(source.decode_rtp(rtp_packet(4, tone))) == 640 * 3
+    assert source.lost_packets == 2
+
+def test_rtp_sequence_jump_resyncs_without_fake_audio():
+    """송신측 재시작 등으로 순번이 크게 뛰면 무음을 넣지 않고 재동기화"""
+    source = rtp_source()
+    tone = b'\x10' * 160
+    source.decode_rtp(rtp_packet(100, tone))
+    assert len(source.decode_rtp(rtp_packet(100 + 0x7FFF, tone))) == 640
+    assert len(source.decode_rtp(rtp_packet(100 + 0x8000, tone))) == 640
+    # 순번이 크게 뒤로 가도 (재시작) 늦은 패킷으로 버리지 않고 이어 받음
+    assert len(source.decode_rtp(rtp_packet(7, tone))) == 640
+    assert len(source.decode_rtp(rtp_packet(8, tone))) == 640
+    assert source.resyncs == 2
+    assert source.lost_packets == 0
+    # 바로 직전 순번은 늦게 온 패킷
+    assert source.decode_rtp(rtp_packet(7, tone)) == b''
+    assert source.late_packets == 1
+
+def test_rtp_l16_stereo_is_downmixed():
+    """페이로드 10(L16 스테레오 44.1kHz)은 좌우 평균 모노로 변환"""
+    source = rtp_source()
+    frames = np.tile(np.array([1000, 3000], dtype='>i2'), 441)
+    samples = np.frombuffer(source.decode_rtp(rtp_packet(1, frames.tobytes(), payload_type=10)), dtype=np.int16)
+    assert len(samples) == 160  # 10ms (스테레오를 모노로 읽으면 두 배 길이가 됨)
+    assert np.all(samples == 2000)
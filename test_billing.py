@@ -0,0 +1,43 @@
+import contextlib
+import io
+import json
+from billing import UsageAccountant
+
+def make_accountant(tmp_path, save_seconds=3600):
+    return UsageAccountant(usage_file=str(tmp_path / "stt_usage.json"), save_seconds=save_seconds)
+
+def record(usage, audio_seconds):
+    with contextlib.redirect_stdout(io.StringIO()):
+        usage.record(audio_seconds)
+
+def test_usage_is_saved_on_close_not_per_request(tmp_path):
+    """요청마다 사용량 파일을 다시 쓰지 않고 종료 시 한 번에 저장"""
+    usage = make_accountant(tmp_path)
+    for _ in range(5):
+        record(usage, 3.0)
+    assert not (tmp_path / "stt_usage.json").exists()
+
+    usage.close()
+    saved = json.loads((tmp_path / "stt_usage.json").read_text(encoding='utf-8'))
+    month = next(iter(saved["months"].values()))
+    assert month["requests"] == 5
+    assert month["billed_seconds"] == 75
+
+    reloaded = make_accountant(tmp_path)
+    assert reloaded.get_summary()["month"]["requests"] == 5
+    reloaded.close()
+
+def test_usage_is_saved_periodically_only_when_changed(tmp_path):
+    """주기 저장은 사용량이 바뀐 경우에만 파일에 씀"""
+    usage = make_accountant(tmp_path, save_seconds=0.05)
+    try:
+        record(usage, 1.0)
+        usage.saver.join(0.3)
+        path = tmp_path / "stt_usage.json"
+        assert path.exists()
+        path.unlink()
+        usage.saver.join(0.2)
+        assert not path.exists()  # 바뀐 것이 없으면 다시 쓰지 않음
+    finally:
+        usage.close()
+    assert not (tmp_path / "stt_usage.json").exists()
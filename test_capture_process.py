@@ -0,0 +1,79 @@
+import contextlib
+import io
+import numpy as np
+import pytest
+from capture_process import READ_POS, WRITE_POS, CaptureProcess, write_ring
+
+def make_capture(ring_seconds=0.01):
+    """캡처 프로세스 없이 공유 메모리 링만 만든 CaptureProcess (16kHz 모노 0.01초 = 320바이트)"""
+    capture = CaptureProcess(rate=16000, channels=1, ring_seconds=ring_seconds)
+    capture.open_ring()
+    return capture
+
+def pcm(start, size):
+    return (np.arange(start, start + size, dtype=np.int64) % 251).astype(np.uint8).tobytes()
+
+def read_all(capture):
+    views, position = capture.read_views(timeout=0)
+    data = b"".join(bytes(view) for view in views)
+    for view in views:
+        view.release()
+    capture.advance(position)
+    return len(views), data
+
+def test_ring_wraps_around_without_losing_data():
+    """링 끝에 닿은 청크는 앞쪽으로 이어 쓰고, 읽을 때 두 개의 뷰로 원래 순서대로 돌려줌"""
+    capture = make_capture()
+    try:
+        capture.begin()
+        assert write_ring(capture.header, capture.ring, capture.capacity, pcm(0, 200))
+        assert read_all(capture) == (1, pcm(0, 200))
+        assert write_ring(capture.header, capture.ring, capture.capacity, pcm(200, 200))  # 320바이트 경계를 넘음
+        assert read_all(capture) == (2, pcm(200, 200))
+        assert capture.end() == (0, 0)
+    finally:
+        capture.stop()
+
+def test_full_ring_drops_new_chunk_and_reports_it():
+    """읽는 쪽이 밀려 링이 가득 차면 읽지 않은 데이터를 덮어쓰지 않고 새 청크를 버린 뒤 유실로 보고"""
+    capture = make_capture()
+    try:
+        capture.begin()
+        assert write_ring(capture.header, capture.ring, capture.capacity, pcm(0, 300))
+        assert not write_ring(capture.header, capture.ring, capture.capacity, pcm(300, 64))
+        assert read_all(capture) == (1, pcm(0, 300))
+        assert capture.end() == (0, 32)  # 64바이트 = 16비트 모노 32프레임
+        assert capture.get_stats()['dropped_frames'] == 32
+    finally:
+        capture.stop()
+
+def test_processor_copies_ring_views_straight_into_recording():
+    """녹음 버퍼는 링의 뷰에서 바로 채워지고, 경계를 넘은 구간과 넘침 유실도 그대로 반영"""
+    pytest.importorskip("pyaudio")
+    from speechtext import SimpleVoiceProcessor
+    capture = make_capture()
+    processor = SimpleVoiceProcessor.__new__(SimpleVoiceProcessor)
+    processor.capture_process = capture
+    processor.RATE, processor.CHANNELS, processor.RECORD_SECONDS = 16000, 1, 1
+    processor.is_recording = True
+    processor.gui = None
+    processor.capture_stats = {'overflows': 0, 'dropped_frames': 0}
+    begin = capture.begin
+
+    def begin_then_capture():
+        # 녹음 시작 직후 캡처 프로세스가 링 끝(250바이트)을 넘겨 쓰고, 마지막 청크는 넘침으로 버림
+        begin()
+        write_ring(capture.header, capture.ring, capture.capacity, pcm(0, 200))
+        write_ring(capture.header, capture.ring, capture.capacity, pcm(200, 64))
+        write_ring(capture.header, capture.ring, capture.capacity, pcm(264, 100))
+    capture.begin = begin_then_capture
+    try:
+        capture.header[WRITE_POS] = capture.header[READ_POS] = 250
+        frames = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.capture_from_process(frames, None)  # 프로세스가 없으므로 한 번 읽고 끝남
+        assert len(frames) == 1 and isinstance(frames[0], bytearray)
+        assert bytes(frames[0]) == pcm(0, 264)
+        assert processor.capture_stats == {'overflows': 0, 'dropped_frames': 50}
+    finally:
+        capture.stop()
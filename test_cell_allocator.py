@@ -0,0 +1,46 @@
+import threading
+import pytest
+from cell_allocator import CellAllocator, FileLockCoordinator
+
+def test_stations_sharing_a_cursor_file_never_get_the_same_row(tmp_path):
+    """같은 커서 파일을 쓰는 스테이션들이 동시에 셀을 받아도 행이 겹치지 않음"""
+    path = str(tmp_path / "cell_cursors.json")
+    cells = []
+    lock = threading.Lock()
+
+    def station():
+        allocator = CellAllocator(FileLockCoordinator(path), block_size=3)
+        for _ in range(20):
+            cell = allocator.next_cell("음성기록", "시트1", "A1")
+            with lock:
+                cells.append(cell)
+
+    threads = [threading.Thread(target=station) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert len(cells) == 80
+    assert len(set(cells)) == 80
+
+def test_lock_file_left_by_crashed_process_does_not_block(tmp_path):
+    """비정상 종료로 남은 잠금 파일은 운영체제 잠금이 없으므로 바로 사용"""
+    path = str(tmp_path / "cell_cursors.json")
+    with open(path + ".lock", 'w') as f:
+        f.write("12345")
+    coordinator = FileLockCoordinator(path, lock_timeout=0.5)
+    assert coordinator.lease("key", 5) == (1, 5)
+    assert coordinator.lease("key", 5) == (6, 10)
+
+def test_held_lock_times_out(tmp_path):
+    """다른 곳에서 잠금을 잡고 있으면 제한 시간 후 TimeoutError"""
+    path = str(tmp_path / "cell_cursors.json")
+    holder = FileLockCoordinator(path)
+    handle = holder.acquire_lock()
+    try:
+        waiter = FileLockCoordinator(path, lock_timeout=0.2)
+        with pytest.raises(TimeoutError):
+            waiter.lease("key", 1)
+    finally:
+        handle.close()
+    assert waiter.lease("key", 1) == (1, 1)
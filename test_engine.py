@@ -0,0 +1,199 @@
+import threading
+import time
+from audio_spool import AudioSpool
+from billing import UtterancePacker
+from engine import VoicePipelineEngine
+
+RATE = 16000
+
+class FakeProcessor:
+    def __init__(self, fail_packed=False):
+        """엔진이 사용하는 SimpleVoiceProcessor 인터페이스만 갖춘 테스트용 프로세서"""
+        self.RATE = RATE
+        self.CHANNELS = 1
+        self.api_available = True
+        self.archive = None
+        self.quality = None
+        self.fail_packed = fail_packed
+        self.release = threading.Event()  # 첫 요청을 붙잡아 뒤 작업이 큐에 쌓이게 함
+        self.calls = []
+
+    def transcribe(self, wav):
+        self.calls.append('single')
+        self.release.wait(5)
+        return "단일", 0.9, {}
+
+    def transcribe_packed(self, pcm_list, packer):
+        self.calls.append(('packed', len(pcm_list)))
+        if self.fail_packed:
+            raise RuntimeError("묶음 요청 실패")
+        return [(f"묶음{index}", 0.8) for index in range(len(pcm_list))]
+
+    def transcribe_spool(self, spool):
+        self.calls.append('spool')
+        return "긴 녹음", 0.7, {}
+
+def short_pcm(seconds=1.0):
+    return b'\x10\x00' * int(RATE * seconds)
+
+def make_spool(seconds=2.0):
+    spool = AudioSpool(rate=RATE)
+    spool.append(short_pcm(seconds))
+    return spool
+
+def start_engine():
+    engine = VoicePipelineEngine(concurrency={'encode': 1, 'transcribe': 1}, vad_threshold=None,
+                                 packer=UtterancePacker(rate=RATE))
+    engine.start()
+    return engine
+
+def wait_queued(engine, stage, count, timeout=5):
+    deadline = time.time() + timeout
+    while engine.get_stats()[stage]['queued'] < count:
+        assert time.time() < deadline, f"{stage} 큐에 작업이 쌓이지 않음"
+        time.sleep(0.01)
+
+def submit(engine, processor, errors, **job):
+    job.update(processor=processor, sink=lambda text, confidence: None, on_error=errors.append)
+    return engine.submit(job, block=True, timeout=5)
+
+def test_spool_behind_short_utterance_is_requeued():
+    """짧은 발화 뒤에 긴 녹음이 대기 중이면 묶지 않고 긴 녹음 경로로 처리"""
+    engine = start_engine()
+    processor = FakeProcessor()
+    errors = []
+    try:
+        first = submit(engine, processor, errors, pcm=short_pcm())
+        short = submit(engine, processor, errors, pcm=short_pcm())
+        spool = make_spool()
+        long = submit(engine, processor, errors, spool=spool)
+        wait_queued(engine, 'transcribe', 2)
+        processor.release.set()
+
+        assert first.result(5) == ("단일", 0.9)
+        assert short.result(5) == ("단일", 0.9)
+        assert long.result(5) == ("긴 녹음", 0.7)
+        assert errors == []
+        assert 'spool' in processor.calls
+        assert spool.file.closed
+    finally:
+        processor.release.set()
+        engine.stop(timeout=5)
+    assert engine.jobs == {}
+
+def test_packed_failure_finishes_every_job():
+    """묶음 요청이 실패하면 함께 꺼낸 작업까지 모두 오류 전달 후 종료 (큐 완료 집계 포함)"""
+    engine = start_engine()
+    processor = FakeProcessor(fail_packed=True)
+    errors = []
+    try:
+        first = submit(engine, processor, errors, pcm=short_pcm())
+        packed = [submit(engine, processor, errors, pcm=short_pcm()) for _ in range(3)]
+        wait_queued(engine, 'transcribe', 3)
+        processor.release.set()
+
+        assert first.result(5) == ("단일", 0.9)
+        for future in packed:
+            deadline = time.time() + 5
+            while not future.done():
+                assert time.time() < deadline, "묶음 작업이 끝나지 않음"
+                time.sleep(0.01)
+            assert future.cancelled()
+        assert ('packed', 3) in processor.calls
+        assert len(errors) == 3
+        assert engine.get_stats()['transcribe']['failed'] == 3
+    finally:
+        processor.release.set()
+        # 모든 task_done이 호출되어야 drain이 바로 끝남
+        started = time.time()
+        engine.stop(timeout=5)
+        assert time.time() - started < 3
+    assert engine.jobs == {}
+
+class FakeSettings:
+    def __init__(self, settings):
+        self.settings = settings
+
+    def get_setting(self, key, default=None):
+        return self.settings.get(key, default)
+
+def run_quiet_utterance(engine):
+    processor = FakeProcessor()
+    processor.release.set()
+    errors = []
+    engine.start()
+    try:
+        future = submit(engine, processor, errors, pcm=b'\x00\x00' * RATE)
+        while not future.done():
+            time.sleep(0.01)
+    finally:
+        engine.stop(timeout=5)
+    return future, errors
+
+def test_silence_trimming_is_opt_in():
+    """무음 제거는 설정에서 vad_threshold를 줄 때만 적용 (기본은 녹음 그대로 인식)"""
+    engine = VoicePipelineEngine.from_settings(FakeSettings({}))
+    assert engine.vad_threshold is None
+    future, errors = run_quiet_utterance(engine)
+    assert future.result() == ("단일", 0.9)
+    assert errors == []
+
+    engine = VoicePipelineEngine.from_settings(FakeSettings({'engine': {'vad_threshold': 300}}))
+    future, errors = run_quiet_utterance(engine)
+    assert future.cancelled()
+    assert errors == ["❌ 음성이 감지되지 않았습니다"]
+
+class OrderedProcessor(FakeProcessor):
+    def __init__(self, fail_first=False):
+        """첫 요청만 늦게(또는 실패로) 끝나는 프로세서 (뒤 요청이 먼저 끝남)"""
+        super().__init__()
+        self.fail_first = fail_first
+        self.count = 0
+
+    def transcribe(self, wav):
+        self.count += 1
+        if self.count == 1:
+            self.release.wait(5)
+            if self.fail_first:
+                raise RuntimeError("인식 실패")
+        return f"발화{wav[44:46].hex()}", 0.9, {}
+
+def run_in_order(processor, count=4):
+    engine = VoicePipelineEngine(concurrency={'encode': 1, 'transcribe': 3})
+    engine.start()
+    delivered, errors = [], []
+    try:
+        futures = []
+        for index in range(count):
+            job = {'processor': processor, 'pcm': bytes([index, 0]) * RATE,
+                   'sink': lambda text, confidence: delivered.append(text), 'on_error': errors.append}
+            futures.append(engine.submit(job, block=True, timeout=5))
+        deadline = time.time() + 5
+        while not all(future.done() for future in futures[1:]) and processor.count < count:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        time.sleep(0.1)  # 뒤 요청의 인식이 끝났어도 앞 결과가 없으면 전달되지 않아야 함
+        assert delivered == []
+        processor.release.set()
+        for future in futures:
+            deadline = time.time() + 5
+            while not future.done():
+                assert time.time() < deadline, "작업이 끝나지 않음"
+                time.sleep(0.01)
+    finally:
+        processor.release.set()
+        engine.stop(timeout=5)
+    assert engine.jobs == {} and engine.parked == {} and engine.order == {}
+    return delivered, errors
+
+def test_results_are_delivered_in_submission_order():
+    """인식이 끝난 순서와 관계없이 결과는 제출(녹음) 순서대로 전달"""
+    delivered, errors = run_in_order(OrderedProcessor())
+    assert delivered == ["발화0000", "발화0100", "발화0200", "발화0300"]
+    assert errors == []
+
+def test_failed_job_does_not_hold_back_later_results():
+    """앞선 작업이 실패해도 뒤 결과는 순서대로 전달"""
+    delivered, errors = run_in_order(OrderedProcessor(fail_first=True))
+    assert delivered == ["발화0100", "발화0200", "발화0300"]
+    assert len(errors) == 1
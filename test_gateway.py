@@ -0,0 +1,124 @@
+import http.client
+import os
+import socket
+import struct
+import threading
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+import pytest
+from gateway import WS_CLOSE_TOO_BIG, GatewayRequestHandler, TranscriptionGateway, build_gateway, unmask
+
+class CountingSettings:
+    def __init__(self, settings):
+        """set_setting(설정 파일 쓰기) 횟수를 세는 SettingsManager 대역"""
+        self.settings = settings
+        self.saves = 0
+
+    def get_setting(self, key, default=None):
+        return self.settings.get(key, default)
+
+    def set_setting(self, key, value):
+        self.settings[key] = value
+        self.saves += 1
+
+def make_gateway(settings, **options):
+    sheet_writer = SimpleNamespace(sheet_handler=SimpleNamespace(allocator=None))
+    return TranscriptionGateway(settings, None, sheet_writer, **options)
+
+def test_cell_cursor_is_saved_on_close_not_per_utterance():
+    """발화마다 설정 파일을 다시 쓰지 않고 종료 시 마지막 위치를 저장"""
+    settings = CountingSettings({'gateway_clients': {'seat01': {'spreadsheet': 's', 'sheet': 't', 'cell': 'B3'}}})
+    gateway = make_gateway(settings, cursor_save_seconds=3600)
+    assert [gateway.reserve_cell('seat01') for _ in range(5)] == ['B3', 'B4', 'B5', 'B6', 'B7']
+    assert settings.saves == 0
+
+    gateway.close()
+    assert settings.saves == 1
+    assert settings.settings['gateway_clients']['seat01']['cell'] == 'B8'
+    gateway.close()  # 바뀐 것이 없으면 다시 쓰지 않음
+    assert settings.saves == 1
+
+def test_cell_cursor_is_saved_periodically():
+    """주기 저장은 바뀐 경우에만 설정 파일에 씀"""
+    settings = CountingSettings({'gateway_clients': {'seat01': {'spreadsheet': 's', 'sheet': 't'}}})
+    gateway = make_gateway(settings, cursor_save_seconds=0.05)
+    try:
+        assert gateway.reserve_cell('seat01') == 'A1'
+        gateway.cursor_saver.join(0.3)
+        assert settings.saves == 1
+        assert settings.settings['gateway_clients']['seat01']['cell'] == 'A2'
+    finally:
+        gateway.close()
+    assert settings.saves == 1
+
+def test_gateway_service_applies_processor_settings(monkeypatch, tmp_path):
+    """게이트웨이 서비스의 인식 프로세서는 설정(녹음 시간 등)과 사용량 회계를 반영"""
+    pytest.importorskip("pyaudio")
+    from main import GoogleSheetHandler
+    from standins import StandInSheetsClient
+    monkeypatch.chdir(tmp_path)
+    settings = CountingSettings({'gateway_clients': {}, 'max_record_seconds': 40})
+    sheet_handler = GoogleSheetHandler(gc=StandInSheetsClient(latency_ms=0, per_minute_quota=0))
+    gateway = build_gateway(settings, max_concurrent=2, sheet_handler=sheet_handler)
+    try:
+        assert gateway.voice_processor.settings_manager is settings
+        assert gateway.voice_processor.RECORD_SECONDS == 40
+        assert gateway.voice_processor.usage is not None
+        assert gateway.sheet_writer.sheet_handler is sheet_handler
+    finally:
+        gateway.close()
+        gateway.sheet_writer.close()
+        gateway.voice_processor.usage.close()
+
+class TinyHandler(GatewayRequestHandler):
+    max_payload = 1024
+
+@pytest.fixture
+def gateway_server():
+    settings = CountingSettings({'gateway_clients': {}})
+    TinyHandler.gateway = make_gateway(settings, cursor_save_seconds=3600)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TinyHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+    TinyHandler.gateway.close()
+
+def test_unmask_matches_bytewise_xor():
+    """정수 XOR 마스크 해제가 바이트별 XOR과 같은 결과"""
+    payload = os.urandom(1001)
+    mask = os.urandom(4)
+    assert unmask(payload, mask) == bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    assert unmask(b'', mask) == b''
+
+def test_oversized_post_is_rejected_without_reading(gateway_server):
+    """최대 크기를 넘는 오디오는 본문을 읽지 않고 413"""
+    connection = http.client.HTTPConnection(*gateway_server, timeout=5)
+    connection.putrequest("POST", "/clients/seat01/audio")
+    connection.putheader("Content-Length", str(10 * 1024 * 1024))
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == 413
+    connection.close()
+
+def test_oversized_websocket_message_is_closed_with_1009(gateway_server):
+    """최대 크기를 넘는 WebSocket 메시지는 1009 닫기 프레임으로 끊음"""
+    sock = socket.create_connection(gateway_server, timeout=5)
+    try:
+        sock.sendall(b"GET /clients/seat01/ws HTTP/1.1\r\nHost: test\r\nUpgrade: websocket\r\n"
+                     b"Connection: Upgrade\r\nSec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n"
+                     b"Sec-WebSocket-Version: 13\r\n\r\n")
+        handshake = b''
+        while b'\r\n\r\n' not in handshake:
+            handshake += sock.recv(1024)
+        assert handshake.startswith(b"HTTP/1.1 101")
+        # 마스크된 바이너리 프레임 헤더만 보냄 (길이 10MB)
+        sock.sendall(bytes([0x82, 0x80 | 127]) + struct.pack(">Q", 10 * 1024 * 1024) + os.urandom(4))
+        frame = handshake.split(b'\r\n\r\n', 1)[1]
+        while len(frame) < 4:
+            frame += sock.recv(1024)
+        assert frame[0] == 0x88
+        assert struct.unpack(">H", frame[2:4])[0] == WS_CLOSE_TOO_BIG
+    finally:
+        sock.close()
@@ -0,0 +1,173 @@
+import threading
+import pytest
+from gui import SimpleVoiceGUI
+
+class UIThreadWidget:
+    def __init__(self, text=""):
+        """UI 스레드가 아닌 곳에서 다루면 기록하는 Tk 위젯 대역"""
+        self.text = text
+        self.options = {}
+        self.touched_off_thread = []
+
+    def check_thread(self, action):
+        if threading.current_thread() is not threading.main_thread():
+            self.touched_off_thread.append(action)
+
+    def config(self, **options):
+        self.check_thread('config')
+        self.options.update(options)
+        self.text = options.get('text', self.text)
+
+    def get(self):
+        self.check_thread('get')
+        return self.text
+
+    def set(self, value):
+        self.check_thread('set')
+        self.text = value
+
+    def delete(self, first, last=None):
+        self.check_thread('delete')
+        self.text = ""
+
+    def insert(self, index, text):
+        self.check_thread('insert')
+        self.text = text
+
+class FakeRoot:
+    def after(self, ms, func, *args):
+        return None
+
+    def after_cancel(self, after_id):
+        pass
+
+class FakeHistoryView(UIThreadWidget):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def append(self, text, confidence, spreadsheet, sheet, cell):
+        self.check_thread('append')
+        self.records.append((text, cell))
+
+class FakeSheetHandler:
+    def __init__(self):
+        self.allocator = None
+        self.saved = []
+
+    def save_to_sheet(self, text, confidence, cell):
+        self.saved.append((text, cell))
+
+class CountingSettings:
+    def __init__(self):
+        self.saved = []
+
+    def get_setting(self, key, default=None):
+        return default
+
+    def set_setting(self, key, value):
+        self.saved.append((key, value))
+
+def make_gui(cell="A5"):
+    gui = SimpleVoiceGUI.__new__(SimpleVoiceGUI)
+    gui.root = FakeRoot()
+    gui.is_recording = True
+    gui.ui_queue = __import__('queue').Queue()
+    gui.load_generation = {}
+    gui.cell_lock = threading.Lock()
+    gui.unsaved_cell = None
+    gui.blink_active = gui.timer_active = False
+    gui.blink_after_id = gui.timer_after_id = None
+    gui.status_label = UIThreadWidget()
+    gui.start_button = UIThreadWidget()
+    gui.stop_button = UIThreadWidget()
+    gui.timer_label = UIThreadWidget()
+    gui.current_cell_label = UIThreadWidget(cell)
+    gui.cell_address_entry = UIThreadWidget(cell)
+    gui.spreadsheet_var = UIThreadWidget("음성기록")
+    gui.sheet_var = UIThreadWidget("시트1")
+    gui.history_view = FakeHistoryView()
+    gui.sheet_handler = FakeSheetHandler()
+    gui.settings_manager = CountingSettings()
+    return gui
+
+def widgets(gui):
+    return [gui.status_label, gui.start_button, gui.stop_button, gui.timer_label, gui.current_cell_label,
+            gui.cell_address_entry, gui.spreadsheet_var, gui.sheet_var, gui.history_view]
+
+def run_in_worker(func):
+    errors = []
+
+    def run():
+        try:
+            func()
+        except Exception as e:
+            errors.append(e)
+    worker = threading.Thread(target=run)
+    worker.start()
+    worker.join(5)
+    assert not worker.is_alive(), "작업 스레드가 UI 스레드를 기다리며 멈춤"
+    assert errors == []
+
+def assert_only_ui_thread(gui):
+    assert [(w, w.touched_off_thread) for w in widgets(gui) if w.touched_off_thread] == []
+
+def test_result_from_engine_thread_touches_widgets_on_ui_thread_only():
+    """엔진 스레드에서 결과/상태를 전달해도 위젯은 UI 큐를 통해 UI 스레드에서만 변경"""
+    gui = make_gui()
+    target = gui.reserve_target()  # 녹음 시작 (UI 스레드)
+    assert target['cell'] == "A5" and gui.cell_address_entry.text == "A6"
+
+    # UI 스레드가 큐를 처리하지 않는 동안에도 엔진 스레드는 기다리지 않음 (종료 중 멈춤 방지)
+    run_in_worker(lambda: (gui.display_result("안녕하세요", 0.9, target), gui.reset_buttons(),
+                           gui.update_status("⏹️ 녹음 중지됨", "orange")))
+    assert_only_ui_thread(gui)
+    assert gui.sheet_handler.saved == [("안녕하세요", "A5")]
+    assert gui.history_view.records == []
+
+    gui.drain_ui_queue()
+    assert_only_ui_thread(gui)
+    assert gui.history_view.records == [("안녕하세요", "A5")]
+    assert gui.start_button.options['state'] == "normal"
+    assert gui.status_label.text == "⏹️ 녹음 중지됨"
+    assert gui.is_recording is False
+
+def test_failed_recording_gives_back_reserved_cell():
+    """녹음/인식이 실패하면 미리 옮긴 입력란을 정했던 셀로 되돌림"""
+    gui = make_gui()
+    target = gui.reserve_target()
+    run_in_worker(lambda: gui.release_target(target))
+    gui.drain_ui_queue()
+    assert_only_ui_thread(gui)
+    assert gui.cell_address_entry.text == "A5"
+
+def test_last_cell_is_saved_periodically_not_per_utterance():
+    """결과마다 설정 파일을 쓰지 않고 저장 주기(또는 종료 시)에 마지막 셀만 저장"""
+    gui = make_gui()
+    for _ in range(3):
+        target = gui.reserve_target()
+        run_in_worker(lambda: gui.display_result("문장", 0.8, target))
+    gui.drain_ui_queue()
+    assert [cell for _, cell in gui.sheet_handler.saved] == ["A5", "A6", "A7"]
+    assert gui.settings_manager.saved == []
+
+    gui.save_cell_cursor()
+    gui.save_cell_cursor()
+    assert gui.settings_manager.saved == [("last_cell", "A7")]
+
+def test_processor_routes_gui_calls_through_ui_thread():
+    """SimpleVoiceProcessor의 결과/오류 전달이 작업 스레드에서 위젯을 직접 다루지 않음"""
+    pytest.importorskip("pyaudio")
+    import speechtext
+    gui = make_gui()
+    processor = speechtext.SimpleVoiceProcessor.__new__(speechtext.SimpleVoiceProcessor)
+    processor.gui = gui
+    processor.is_recording = True
+    first, second = gui.reserve_target(), gui.reserve_target()
+    run_in_worker(lambda: (processor.display_result("첫 문장", 0.9, first),
+                           processor.report_error("❌ 음성이 감지되지 않았습니다", second)))
+    assert_only_ui_thread(gui)
+    gui.drain_ui_queue()
+    assert_only_ui_thread(gui)
+    assert gui.sheet_handler.saved == [("첫 문장", "A5")]
+    assert gui.cell_address_entry.text == "A6"  # 실패한 두 번째 녹음의 셀을 되돌림
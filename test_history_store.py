@@ -0,0 +1,28 @@
+from history_store import HistoryStore
+
+def test_stores_sharing_a_file_get_distinct_ids(tmp_path):
+    """같은 파일을 쓰는 저장소 두 개(예: GUI와 헤드리스)의 기록이 번호 충돌 없이 모두 저장됨"""
+    path = str(tmp_path / "history.db")
+    first = HistoryStore(path, flush_interval=0.05)
+    second = HistoryStore(path, flush_interval=0.05)
+    records = []
+    for index in range(20):
+        records.append(first.add(f"첫째 {index}"))
+        records.append(second.add(f"둘째 {index}"))
+    assert first.total == second.total == 20
+    first.close()
+    second.close()
+
+    ids = [record['id'] for record in records]
+    assert None not in ids
+    assert len(set(ids)) == len(ids)
+
+    reopened = HistoryStore(path)
+    try:
+        assert reopened.total == 40
+        page = reopened.fetch_page(0, 100)
+        assert sorted(r['text'] for r in page) == sorted(r['text'] for r in records)
+        assert [r['id'] for r in page] == sorted(ids)
+        assert len(reopened.fetch_page(30, 100)) == 10
+    finally:
+        reopened.close()
@@ -0,0 +1,84 @@
+import threading
+import numpy as np
+from longform import LongFormTranscriber, MemoryAudio, find_segments
+
+RATE = 16000
+
+def tone(seconds, level):
+    return np.full(int(RATE * seconds), level, dtype=np.int16).tobytes()
+
+def silence(seconds):
+    return tone(seconds, 0)
+
+def assert_contiguous(segments, size):
+    assert segments[0][0] == 0 and segments[-1][1] == size
+    assert all(end == next_start for (_, end), (next_start, _) in zip(segments, segments[1:]))
+    assert all(end > start for start, end in segments)
+
+def test_segments_cut_in_silence_after_target():
+    """target 이후의 무음 가운데에서 자름"""
+    audio = MemoryAudio(tone(10, 2000) + silence(0.6) + tone(10, 2000))
+    segments = find_segments(audio, target_seconds=8, max_seconds=15)
+    assert len(segments) == 2
+    assert_contiguous(segments, audio.size)
+    cut_seconds = segments[0][1] / (RATE * 2)
+    assert 10 < cut_seconds < 10.6
+
+def test_segments_without_silence_stay_under_max():
+    """무음이 없으면 max_seconds 안의 가장 조용한 지점에서 자름"""
+    audio = MemoryAudio(tone(40, 2000))
+    segments = find_segments(audio, target_seconds=8, max_seconds=10)
+    assert_contiguous(segments, audio.size)
+    assert all((end - start) / (RATE * 2) <= 10 for start, end in segments)
+
+def test_tiny_target_still_terminates():
+    """구간 길이가 프레임보다 짧게 설정되어도 멈추지 않고 끝까지 나눔"""
+    audio = MemoryAudio(tone(1, 2000) + silence(1))
+    for target, maximum in ((0.01, 0.02), (0.0, 0.0), (0.05, 0.01)):
+        result = []
+        worker = threading.Thread(target=lambda: result.append(find_segments(audio, target, maximum)), daemon=True)
+        worker.start()
+        worker.join(5)
+        assert not worker.is_alive(), f"target {target}, max {maximum}에서 무한 반복"
+        assert_contiguous(result[0], audio.size)
+
+class LevelProcessor:
+    def __init__(self, fail_once=()):
+        """구간 오디오의 진폭으로 텍스트를 만드는 인식기 대역 (fail_once 구간은 첫 시도 실패)"""
+        self.fail_once = set(fail_once)
+        self.lock = threading.Lock()
+
+    def transcribe(self, wav, timeout=None, priority='interactive'):
+        samples = np.frombuffer(wav[44:], dtype=np.int16)
+        level = int(samples.max())
+        with self.lock:
+            if level in self.fail_once:
+                self.fail_once.discard(level)
+                return "[오류] 실패", 0.0, False
+        return f"문장{level}", 0.8, True
+
+def test_segments_are_reassembled_in_order_with_retry():
+    """구간을 병렬로 인식해도 원래 순서대로 이어 붙이고, 실패한 구간만 다시 시도"""
+    levels = [1000, 2000, 3000, 4000]
+    pcm = b''.join(tone(6, level) + silence(0.6) for level in levels)
+    transcriber = LongFormTranscriber(LevelProcessor(fail_once={2000}), target_seconds=5, max_seconds=8)
+    result = transcriber.transcribe(MemoryAudio(pcm))
+    assert result['text'] == "문장1000 문장2000 문장3000 문장4000"
+    assert result['success']
+    assert [segment['attempts'] for segment in result['segments']] == [1, 2, 1, 1]
+
+class FakeSettings:
+    def __init__(self, settings):
+        self.settings = settings
+
+    def get_setting(self, key, default=None):
+        return self.settings.get(key, default)
+
+def test_invalid_segment_settings_fall_back_to_defaults():
+    """잘못된 구간 길이 설정은 기본값으로"""
+    transcriber = LongFormTranscriber.from_settings(None, FakeSettings({'longform': {'target_seconds': 0.01,
+                                                                                     'max_seconds': 0.02}}))
+    assert (transcriber.target_seconds, transcriber.max_seconds) == (45, 55)
+    transcriber = LongFormTranscriber.from_settings(None, FakeSettings({'longform': {'target_seconds': 20,
+                                                                                     'max_seconds': 30}}))
+    assert (transcriber.target_seconds, transcriber.max_seconds) == (20, 30)
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+import audio_sources
+from audio_sources import MAX_READ_ERRORS
+from multi_station import MultiStationManager
+
+class CountingSettings:
+    def __init__(self, settings):
+        """set_setting(설정 파일 쓰기) 횟수를 세는 SettingsManager 대역"""
+        self.settings = settings
+        self.saves = 0
+
+    def get_setting(self, key, default=None):
+        return self.settings.get(key, default)
+
+    def set_setting(self, key, value):
+        self.settings[key] = value
+        self.saves += 1
+
+class DeadStream:
+    def __init__(self):
+        """읽을 때마다 오류를 내는 (연결이 끊긴) 장치 스트림 대역"""
+        self.reads = 0
+
+    def read(self, frames, exception_on_overflow=True):
+        self.reads += 1
+        raise OSError("Device unavailable")
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+def make_manager(cursor_save_seconds=3600):
+    settings = CountingSettings({'stations': [
+        {'name': 'seat01', 'device_index': 1, 'channel': 0, 'spreadsheet': 's', 'sheet': 't', 'cell': 'B3'},
+        {'name': 'seat02', 'device_index': 2, 'channel': 0, 'spreadsheet': 's', 'sheet': 't'}]})
+    written = []
+    sheet_writer = SimpleNamespace(sheet_handler=SimpleNamespace(allocator=None),
+                                   enqueue=lambda *args: written.append(args))
+    voice_processor = SimpleNamespace(RATE=16000, CHUNK=256)
+    manager = MultiStationManager(settings, voice_processor, sheet_writer, engine=None,
+                                  cursor_save_seconds=cursor_save_seconds)
+    return manager, settings, written
+
+def test_station_cursors_are_saved_on_close_not_per_utterance():
+    """발화마다 설정 파일을 다시 쓰지 않고 종료 시 스테이션별 다음 셀을 저장"""
+    manager, settings, written = make_manager()
+    for _ in range(3):
+        manager.stations['seat01'].deliver("문장", 0.9)
+    manager.stations['seat02'].deliver("문장", 0.9)
+    assert [args[2] for args in written] == ['B3', 'B4', 'B5', 'A1']
+    assert settings.saves == 0
+
+    manager.close()
+    assert settings.saves == 1
+    assert [config['cell'] for config in settings.settings['stations']] == ['B6', 'A2']
+    manager.close()  # 바뀐 것이 없으면 다시 쓰지 않음
+    assert settings.saves == 1
+
+def test_station_cursors_are_saved_periodically():
+    """주기 저장은 셀 위치가 바뀐 경우에만 설정 파일에 씀"""
+    manager, settings, written = make_manager(cursor_save_seconds=0.05)
+    try:
+        manager.stations['seat02'].deliver("문장", 0.9)
+        manager.cursor_saver.join(0.3)
+        assert settings.saves == 1
+        assert settings.settings['stations'][1]['cell'] == 'A2'
+    finally:
+        manager.close()
+    assert settings.saves == 1
+
+def test_dead_device_stops_capture_and_is_reported(monkeypatch):
+    """장치 읽기 오류가 계속되면 무한 재시도 대신 캡처를 끝내고 보고서에 사유 표시"""
+    monkeypatch.setattr(audio_sources, "READ_ERROR_DELAY", 0)
+    manager, settings, written = make_manager()
+    capture = manager.captures[0]
+    stream = DeadStream()
+
+    def open_dead_device():
+        capture.source.stream = stream
+        return capture.source
+    monkeypatch.setattr(capture.source, "open", open_dead_device)
+    capture.run()
+    manager.close()
+
+    assert stream.reads == MAX_READ_ERRORS
+    report = manager.get_report()['seat01']
+    assert report['read_errors'] == MAX_READ_ERRORS
+    assert report['capture_error']
+
+def test_device_open_failure_is_reported(monkeypatch):
+    """장치 열기 실패는 스레드가 조용히 죽지 않고 장치별로 보고서에 표시"""
+    manager, settings, written = make_manager()
+    capture = manager.captures[1]
+
+    def fail_open():
+        raise OSError("Invalid device index")
+    monkeypatch.setattr(capture.source, "open", fail_open)
+    capture.run()
+    manager.close()
+
+    report = manager.get_report()
+    assert "Invalid device index" in report['seat02']['capture_error']
+    assert report['seat01']['capture_error'] is None
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import os
+import pytest
+from audio_spool import AudioSpool
+from audio_utils import pcm_to_wav_bytes
+from object_upload import ObjectUploader
+from standins import StandInObjectStore, StandInTranscribeServer
+
+@pytest.fixture
+def store():
+    store = StandInObjectStore().start()
+    yield store
+    store.stop()
+
+@pytest.fixture
+def server(store):
+    server = StandInTranscribeServer(latency_ms=5, jitter_ms=0, object_store=store).start()
+    yield server
+    server.stop()
+
+def make_uploader(store, **options):
+    options.setdefault('threshold_bytes', 64 * 1024)
+    options.setdefault('chunk_bytes', 32 * 1024)
+    return ObjectUploader(store, **options)
+
+def make_processor(server, uploader):
+    """대역 서버에 연결한 SimpleVoiceProcessor (PyAudio가 없으면 건너뜀)"""
+    pytest.importorskip("pyaudio")
+    import speechtext
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor = speechtext.SimpleVoiceProcessor(api_url=server.url)
+    processor.uploader = uploader
+    return processor
+
+def test_interrupted_upload_resumes(store):
+    """중단된 업로드를 같은 오디오로 다시 시도하면 남은 조각만 올림"""
+    data = os.urandom(10 * 32 * 1024 + 123)
+    uploader = make_uploader(store, max_retries=0)
+    store.fail_every = 3
+    with pytest.raises(Exception):
+        uploader.upload(data)
+    stored_parts = len(store.list_sizes("uploads/"))
+    assert stored_parts > 0
+
+    store.fail_every = 0
+    uri = uploader.upload(data)
+    assert store.read(uri) == data
+    stats = uploader.get_stats()
+    assert stats['resumed_parts'] == stored_parts
+    assert stats['failures'] == 1
+    # 합친 뒤에는 조각이 남지 않음
+    assert list(store.list_sizes("uploads/")) == [uri.split("/", 3)[3]]
+
+def test_spool_upload_is_wav_of_recording(store):
+    """스풀 녹음은 WAV 헤더를 붙여 조각 단위로 올림"""
+    pcm = os.urandom(5 * 32 * 1024)
+    spool = AudioSpool(segment_bytes=64 * 1024)
+    try:
+        spool.append(pcm)
+        uri = make_uploader(store).upload_spool(spool)
+    finally:
+        spool.close()
+    assert store.read(uri) == pcm_to_wav_bytes(pcm)
+
+def test_failed_upload_falls_back_to_inline_request(store, server):
+    """버킷 업로드가 실패하면 요청 본문으로 보내 인식"""
+    processor = make_processor(server, make_uploader(store, max_retries=0))
+    store.fail_every = 1
+    wav = pcm_to_wav_bytes(os.urandom(128 * 1024))
+    text, confidence, success = processor.transcribe(wav)
+    assert success
+    assert server.requests == 1
+    assert server.audio_bytes > len(wav)  # multipart 요청 본문으로 전달됨
+
+def test_long_recording_goes_through_bucket(store, server):
+    """기준 크기 이상의 긴 녹음은 통째로 올려 URI로 한 번에 인식"""
+    processor = make_processor(server, make_uploader(store))
+    spool = AudioSpool()
+    try:
+        spool.append(os.urandom(256 * 1024))
+        text, confidence, success = processor.transcribe_spool(spool)
+    finally:
+        spool.close()
+    assert success
+    assert server.requests == 1
+    assert store.list_sizes("uploads/")
@@ -0,0 +1,138 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+import rate_limiter
+from rate_limiter import PrioritySlots, QuotaScheduler
+
+class FakeClock:
+    def __init__(self):
+        """테스트에서 직접 앞으로 돌리는 time.monotonic 대역"""
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=clock, time=time.time))
+    return clock
+
+def wait_until(condition):
+    deadline = time.time() + 5
+    while not condition() and time.time() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+def start_waiter(acquire, priority, acquired):
+    """acquire(priority)가 끝나면 acquired에 등급 이름을 남기는 대기 스레드"""
+    def run():
+        acquire(priority)
+        acquired.append(priority)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def waiting(limiter, priority, kind=None):
+    status = limiter.get_status()
+    return (status[kind] if kind else status)['waiting'][priority]
+
+def wake(limiter):
+    """시계를 돌린 뒤 대기자가 순위를 다시 계산하도록 깨움"""
+    with limiter.condition:
+        limiter.condition.notify_all()
+
+def test_interactive_overtakes_earlier_batch_waiter(clock):
+    """먼저 기다리던 batch보다 나중에 온 interactive가 빈 연결을 먼저 받음"""
+    slots = PrioritySlots(slots=1, reserved=0, aging_seconds=10)
+    acquired = []
+    slots.acquire('interactive')
+    batch = start_waiter(slots.acquire, 'batch', acquired)
+    wait_until(lambda: waiting(slots, 'batch') == 1)
+    interactive = start_waiter(slots.acquire, 'interactive', acquired)
+    wait_until(lambda: waiting(slots, 'interactive') == 1)
+
+    slots.release('interactive')
+    interactive.join(5)
+    assert acquired == ['interactive']
+    slots.release('interactive')
+    batch.join(5)
+    assert acquired == ['interactive', 'batch']
+    assert slots.get_status()['in_use']['batch'] == 1
+
+def test_batch_never_takes_reserved_slots(clock):
+    """batch는 예약 연결을 쓰지 못하고, 예약 연결은 interactive가 바로 사용"""
+    slots = PrioritySlots(slots=3, reserved=1, aging_seconds=10)
+    acquired = []
+    slots.acquire('batch')
+    slots.acquire('batch')
+    third = start_waiter(slots.acquire, 'batch', acquired)
+    wait_until(lambda: waiting(slots, 'batch') == 1)
+    wake(slots)  # 시계가 멈춰 있으므로 다시 확인해도 순위는 그대로
+    third.join(0.1)
+    assert acquired == [] and third.is_alive()
+
+    slots.acquire('interactive')  # 예약 연결
+    assert slots.get_status()['in_use'] == {'interactive': 1, 'replay': 0, 'batch': 2, 'maintenance': 0}
+    slots.release('interactive')
+    third.join(0.1)
+    assert acquired == []  # 예약 연결이 비어도 batch는 기다림
+    slots.release('batch')
+    third.join(5)
+    assert acquired == ['batch']
+
+def test_aged_batch_waiter_eventually_uses_reserved_slot(clock):
+    """오래 기다린 batch는 순위가 올라 예약 연결도 사용"""
+    slots = PrioritySlots(slots=2, reserved=1, aging_seconds=10)
+    acquired = []
+    slots.acquire('interactive')
+    batch = start_waiter(slots.acquire, 'batch', acquired)
+    wait_until(lambda: waiting(slots, 'batch') == 1)
+    clock.now += 15  # 한 단계 반 상승: 아직 interactive 순위가 아님
+    wake(slots)
+    batch.join(0.1)
+    assert acquired == []
+    clock.now += 10
+    wake(slots)
+    batch.join(5)
+    assert acquired == ['batch']
+    assert slots.get_status()['wait']['batch']['max_ms'] == 25000.0
+
+def make_scheduler(per_minute=10):
+    """쓰기 버킷 분당 per_minute개, 그중 20%는 interactive 몫 (리필은 사실상 멈춤)"""
+    scheduler = QuotaScheduler(write_per_minute=per_minute, interactive_reserve=0.2, aging_seconds=10)
+    scheduler.buckets['write'].refill_per_second = 1e-6
+    return scheduler
+
+def test_quota_batch_leaves_interactive_reserve(clock):
+    """batch는 버킷의 interactive 몫을 남기고 멈추며, interactive는 남은 몫을 바로 사용"""
+    scheduler = make_scheduler()
+    for _ in range(8):
+        scheduler.acquire('write', 'batch')
+    acquired = []
+    batch = start_waiter(lambda priority: scheduler.acquire('write', priority), 'batch', acquired)
+    wait_until(lambda: waiting(scheduler, 'batch', 'write') == 1)
+    batch.join(0.1)
+    assert acquired == []
+
+    scheduler.acquire('write', 'interactive')
+    scheduler.acquire('write', 'interactive')
+    assert scheduler.get_status()['write']['remaining'] == 0
+
+    # 토큰이 하나 생기면 먼저 기다리던 batch가 아니라 나중에 온 interactive가 받음
+    interactive = start_waiter(lambda priority: scheduler.acquire('write', priority), 'interactive', acquired)
+    wait_until(lambda: waiting(scheduler, 'interactive', 'write') == 1)
+    with scheduler.condition:
+        scheduler.buckets['write'].tokens = 1.0
+        scheduler.condition.notify_all()
+    interactive.join(5)
+    assert acquired == ['interactive']
+    assert batch.is_alive()
+
+    clock.now += 25  # 오래 기다린 batch는 interactive 순위가 되어 남겨 둔 몫도 사용
+    with scheduler.condition:
+        scheduler.buckets['write'].tokens = 1.0
+        scheduler.condition.notify_all()
+    batch.join(5)
+    assert acquired == ['interactive', 'batch']
@@ -0,0 +1,59 @@
+import time
+import pytest
+import requests
+from recognition_backends import BackendRouter
+from standins import StandInTranscribeServer
+
+@pytest.fixture
+def servers():
+    failing = StandInTranscribeServer(latency_ms=1, jitter_ms=0, error_rate=1.0).start()
+    healthy = StandInTranscribeServer(latency_ms=1, jitter_ms=0).start()
+    yield failing, healthy
+    failing.stop()
+    healthy.stop()
+
+def post(router):
+    return router.post("/transcribe", data={'language': 'ko-KR'}, files={'audio': ('a.wav', b'RIFF', 'audio/wav')},
+                       timeout=5)
+
+def test_failover_and_cooldown(servers):
+    """5xx를 내는 서버는 다음 서버로 넘기고, 실패가 이어지면 대기 시간 동안 후순위로 둠"""
+    failing, healthy = servers
+    router = BackendRouter([("주", failing.url), ("예비", healthy.url)], requests.Session(),
+                           failure_threshold=1, cooldown_seconds=0.5, probe_interval=0)
+    assert post(router).status_code == 200
+    assert (failing.requests, healthy.requests) == (1, 1)
+    assert not router.backends[0].healthy
+
+    # 대기 중에는 예비 서버로 바로 보냄
+    for _ in range(3):
+        assert post(router).status_code == 200
+    assert (failing.requests, healthy.requests) == (1, 4)
+    assert router.get_stats()["예비"]['rank'] == 1
+
+    # 대기 시간이 지나면 주 서버도 다시 후보 (예비 서버가 실패하면 주 서버로)
+    time.sleep(0.6)
+    assert router.backends[0].healthy
+    failing.error_rate = 0.0
+    healthy.error_rate = 1.0
+    assert post(router).status_code == 200
+    assert failing.requests == 2
+    assert router.backends[0].get_stats()['consecutive_failures'] == 0
+
+def test_unreachable_server_is_skipped(servers):
+    """연결할 수 없는 서버는 네트워크 오류로 보고 다음 서버로"""
+    _, healthy = servers
+    dead = StandInTranscribeServer()
+    dead_url = dead.url
+    dead.httpd.server_close()
+    router = BackendRouter([("끊김", dead_url), ("정상", healthy.url)], requests.Session(),
+                           failure_threshold=1, cooldown_seconds=30, probe_interval=0)
+    assert post(router).status_code == 200
+    assert not router.backends[0].healthy
+    assert router.backends[0].get_stats()['errors'] == 1
+
+def test_all_servers_failing_returns_last_response(servers):
+    """모든 서버가 5xx면 마지막 응답을 그대로 반환"""
+    failing, _ = servers
+    router = BackendRouter([("주", failing.url)], requests.Session(), probe_interval=0)
+    assert post(router).status_code == 500
@@ -0,0 +1,88 @@
+import contextlib
+import io
+import time
+import numpy as np
+import pytest
+import requests
+from audio_utils import pcm_to_wav_bytes
+from session_replay import ReplayTranscribeServer, SessionRecorder, SessionReplayer, read_session
+from standins import StandInSheetsClient, StandInTranscribeServer
+
+class RecordedResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+def make_wav(index, seconds=0.5):
+    rng = np.random.default_rng(index)
+    return pcm_to_wav_bytes((rng.standard_normal(int(16000 * seconds)) * 2000).astype(np.int16).tobytes())
+
+def test_recording_round_trip(tmp_path):
+    """기록 파일에서 보낸 오디오(차분 압축)와 응답, 시트 호출을 그대로 복원"""
+    path = str(tmp_path / "session.rec")
+    recorder = SessionRecorder(path)
+    wavs = [make_wav(index) for index in range(3)]
+    for index, wav in enumerate(wavs):
+        recorder.record_transcribe(wav, {'language': 'ko-KR'}, time.time(), 0.1 * index,
+                                   RecordedResponse(200, {'success': True, 'transcript': f"문장{index}"}))
+    recorder.record_sheets('write', StandInSheetsClient.open, ("A1", "문장0"), time.time(), 0.05)
+    recorder.close()
+
+    events = read_session(path)
+    transcribes = [e for e in events if e['type'] == 'transcribe']
+    assert [e['audio'] for e in transcribes] == wavs
+    assert [e['response']['transcript'] for e in transcribes] == ["문장0", "문장1", "문장2"]
+    assert [e['op'] for e in events if e['type'] == 'sheets'] == ['open']
+
+def test_replay_server_matches_audio_by_hash():
+    """재생 서버는 요청 오디오의 해시로 기록을 찾아 순서가 바뀌어도 같은 응답을 돌려줌"""
+    wavs = [make_wav(index) for index in range(5)]
+    events = [{'type': 'transcribe', 'seq': index + 1, 't': float(index), 'elapsed': 0.0, 'audio': wav,
+               'status': 200, 'response': {'success': True, 'transcript': f"기록{index}"}}
+              for index, wav in enumerate(wavs)]
+    server = ReplayTranscribeServer(events, latency_scale=0).start()
+    try:
+        for index in reversed(range(5)):
+            response = requests.post(server.url + "/transcribe", files={'audio': ('audio.wav', wavs[index])},
+                                     data={'language': 'ko-KR'}, timeout=5)
+            assert response.json()['transcript'] == f"기록{index}"
+        assert server.unmatched == 0
+        response = requests.post(server.url + "/transcribe", files={'audio': ('audio.wav', make_wav(99))}, timeout=5)
+        assert response.status_code == 500  # 남은 기록 없음
+        assert server.unmatched == 1
+    finally:
+        server.stop()
+
+def test_record_then_replay_against_standins(tmp_path):
+    """운영처럼 기록한 세션을 대역 서버/시트로 재생하면 모든 요청이 같은 오디오 기록과 맞음"""
+    pytest.importorskip("pyaudio")
+    from main import GoogleSheetHandler
+    from speechtext import SimpleVoiceProcessor
+    path = str(tmp_path / "session.rec")
+    server = StandInTranscribeServer(latency_ms=20, jitter_ms=0).start()
+    recorder = SessionRecorder(path)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor = SimpleVoiceProcessor(api_url=server.url)
+            sheet_handler = GoogleSheetHandler(gc=StandInSheetsClient(latency_ms=0, per_minute_quota=0))
+            sheet_handler.set_target_sheet("시트1")
+            recorder.attach(processor, sheet_handler)
+            for index in range(4):
+                text, confidence, success = processor.transcribe(make_wav(index))
+                assert success
+                assert sheet_handler.save_to_sheet(text, confidence, f"A{index + 1}")
+    finally:
+        recorder.close()
+        server.stop()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = SessionReplayer(path, speed=20, latency_scale=0, workers=4).run()
+    assert summary['unmatched_audio'] == 0
+    assert summary['dropped'] == 0
+    assert summary['transcribe']['count'] == 4
+    assert summary['transcribe']['failures'] == 0
+    assert summary['sheets']['count'] == 4
+    assert summary['sheets']['failures'] == 0
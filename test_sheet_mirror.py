@@ -0,0 +1,93 @@
+import threading
+import time
+from types import SimpleNamespace
+from rate_limiter import QuotaScheduler
+from sheet_mirror import SheetMirror
+from sheet_writer import SheetBatchWriter
+from standins import StandInAPIError, StandInSheetsClient
+
+def make_handler(targets):
+    """원본 "음성기록"과 백업 대상 스프레드시트를 가진 대역 시트 핸들러 (폴백 저장 기록)"""
+    titles = {"음성기록": ["시트1"]}
+    titles.update({target["spreadsheet"]: ["시트1"] for target in targets})
+    handler = SimpleNamespace(gc=StandInSheetsClient(titles, latency_ms=0, per_minute_quota=0),
+                              quota=QuotaScheduler(), mirror=None, fallbacks=[])
+    handler.save_to_local_file = lambda timestamp, text, confidence: handler.fallbacks.append(text)
+    handler.mirror = SheetMirror(handler, targets, flush_interval=0.05)
+    return handler
+
+def worksheet(handler, title):
+    return next(s for s in handler.gc.spreadsheets if s.title == title).sheets[0]
+
+def enqueue_and_wait(writer, cells, timeout=2):
+    """원본 작성기에 셀을 넣고 모든 콜백까지 걸린 시간과 성공 여부 반환"""
+    done = threading.Event()
+    results = []
+
+    def callback(success):
+        results.append(success)
+        if len(results) == len(cells):
+            done.set()
+    started = time.time()
+    for cell in cells:
+        writer.enqueue("음성기록", "시트1", cell, f"문장 {cell}", 0.9, callback)
+    assert done.wait(timeout)
+    return time.time() - started, results
+
+def test_slow_or_failing_mirror_never_delays_primary_write():
+    """멈춘 백업과 오류 나는 백업이 있어도 원본 입력은 바로 성공하고, 백업별 실패/지연이 통계에 남음"""
+    handler = make_handler([{"spreadsheet": "느린백업"}, {"spreadsheet": "고장백업"}])
+    unblock = threading.Event()
+    slow = worksheet(handler, "느린백업")
+    slow_update = slow.batch_update
+    slow.batch_update = lambda data: (unblock.wait(5), slow_update(data))
+
+    def broken_update(data):
+        raise StandInAPIError(500)
+    worksheet(handler, "고장백업").batch_update = broken_update
+    primary = SheetBatchWriter(handler, flush_interval=0.05)
+    try:
+        elapsed, results = enqueue_and_wait(primary, ["A1", "A2", "A3"])
+        assert results == [True, True, True]
+        assert elapsed < 1.0
+        assert worksheet(handler, "음성기록").cells == {"A1": "문장 A1", "A2": "문장 A2", "A3": "문장 A3"}
+        assert primary.get_stats()['fallback_count'] == 0 and handler.fallbacks == []
+
+        deadline = time.time() + 2
+        while handler.mirror.get_stats()["고장백업/*"]['failed_count'] < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        stats = handler.mirror.get_stats()
+        assert stats["고장백업/*"]['failed_count'] == 3
+        assert stats["느린백업/*"]['cells_written'] == 0  # 아직 전송 중
+        time.sleep(0.3)
+    finally:
+        unblock.set()
+        handler.mirror.close()
+        primary.close()
+    stats = handler.mirror.get_stats()
+    assert worksheet(handler, "느린백업").cells == worksheet(handler, "음성기록").cells
+    assert stats["느린백업/*"]['max_lag_seconds'] >= 0.3
+    assert primary.get_stats()['max_lag_seconds'] < 1.0
+    assert handler.fallbacks == []  # 백업 실패는 로컬 폴백으로 이어지지 않음
+
+def test_mirror_quota_is_separate_from_primary():
+    """백업 대상의 분당 할당량이 바닥나도 원본 작성기는 자기 할당량으로 계속 입력"""
+    handler = make_handler([{"spreadsheet": "백업", "write_per_minute": 1}])
+    primary = SheetBatchWriter(handler, flush_interval=0.05)
+    mirror_quota = handler.mirror.targets[0][1].quota
+    try:
+        for round_cells in (["A1"], ["A2"], ["A3"]):
+            elapsed, results = enqueue_and_wait(primary, round_cells)
+            assert results == [True] and elapsed < 1.0
+        assert worksheet(handler, "음성기록").cells == {"A1": "문장 A1", "A2": "문장 A2", "A3": "문장 A3"}
+
+        deadline = time.time() + 2
+        while not sum(mirror_quota.get_status()['write']['waiting'].values()) and time.time() < deadline:
+            time.sleep(0.01)
+        assert sum(mirror_quota.get_status()['write']['waiting'].values()) == 1  # 다음 분을 기다리는 중
+        assert worksheet(handler, "백업").cells == {"A1": "문장 A1"}
+        assert handler.quota.get_status()['write']['calls'] == 3
+        assert handler.mirror.get_stats()["백업/*"]['cells_written'] == 1
+    finally:
+        handler.mirror.close(timeout=0.1)  # 할당량을 기다리는 백업 전송은 남겨 두고 종료
+        primary.close()
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import time
+import numpy as np
+import pytest
+from audio_sources import ulaw_to_linear
+from audio_utils import pcm_to_wav_bytes
+from standins import StandInTranscribeServer
+from upload_quality import QUALITY_LEVELS, QualityController, linear_to_ulaw
+
+def feed(controller, bytes_per_second, count, rtt=0.05, processing_ratio=0.05):
+    """대역폭이 bytes_per_second인 네트워크에서 count개 요청을 보낸 것처럼 결과 기록, 마지막 결정 반환"""
+    for index in range(count):
+        audio_seconds = 3.0 + index % 3
+        decision = controller.choose(audio_seconds)
+        sent = audio_seconds * decision['level']['bytes_per_second']
+        elapsed = 2 * rtt + sent / bytes_per_second + audio_seconds * processing_ratio
+        controller.record(decision, sent, elapsed, True)
+    return controller.choose(3.0)
+
+def test_quality_follows_measured_uplink():
+    """느린 회선에서는 품질을 낮추고, 다시 빨라지면 원래 품질로 돌아옴"""
+    controller = QualityController(target_latency=1.0)
+    assert feed(controller, 4_000_000, 6)['level']['name'] == 'linear16-16k'
+    slow = feed(controller, 60_000, 20)
+    assert slow['level']['name'] != 'linear16-16k'
+    assert slow['predicted'] <= controller.target_latency
+    assert slow['timeout'] < 60
+    uplink_kbps = controller.get_stats()['estimate']['uplink_kbps']
+    assert 400 < uplink_kbps < 600  # 실제 480kbps
+    assert feed(controller, 4_000_000, 10)['level']['name'] == 'linear16-16k'
+    stats = controller.get_stats()
+    assert stats['requests'] == 36
+    assert stats['decisions']['linear16-16k'] < 36
+
+def test_batch_size_shrinks_on_slow_uplink():
+    """느린 회선에서는 묶음 전체가 목표 시간 안에 들어오도록 묶음 크기를 줄임"""
+    controller = QualityController(target_latency=1.0)
+    feed(controller, 4_000_000, 6)
+    fast = controller.batch_size(8, 1.0)
+    feed(controller, 60_000, 10)
+    assert controller.batch_size(8, 1.0) < fast
+
+def test_encoding_levels():
+    """μ-law 변환은 원본에 가깝고, 16kHz 모노가 아니면 원본 그대로 보냄"""
+    samples = (np.sin(np.arange(16000) / 5) * 20000).astype(np.int16)
+    decoded = ulaw_to_linear(linear_to_ulaw(samples)).astype(int)
+    assert np.max(np.abs(decoded - samples)) / 20000 < 0.05
+
+    controller = QualityController()
+    wav = pcm_to_wav_bytes(samples.tobytes())
+    decision = {'level': QUALITY_LEVELS[2]}
+    filename, content, content_type, fields = controller.encode(wav, decision)
+    assert (content_type, len(content)) == ('audio/basic', 8000)
+    assert fields == {'encoding': 'MULAW', 'sample_rate': 8000}
+
+    decision = {'level': QUALITY_LEVELS[1]}
+    assert controller.encode(pcm_to_wav_bytes(samples.tobytes(), rate=8000), decision) is None
+    assert decision['level'] is QUALITY_LEVELS[0]
+
+class ThrottledServer(StandInTranscribeServer):
+    bytes_per_second = 4_000_000
+
+    def handle_transcribe(self, path, body):
+        """받은 크기에 비례해 늦게 응답 (느린 상향 회선 흉내)"""
+        time.sleep(len(body) / self.bytes_per_second)
+        return super().handle_transcribe(path, body)
+
+def test_processor_lowers_quality_on_slow_server():
+    """인식 요청의 실제 응답 시간으로 추정해 느린 회선에서는 낮은 품질로 전송"""
+    pytest.importorskip("pyaudio")
+    import speechtext
+    server = ThrottledServer(latency_ms=10, jitter_ms=0).start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor = speechtext.SimpleVoiceProcessor(api_url=server.url)
+        processor.quality = QualityController(processor.router, target_latency=0.5)
+        rng = np.random.default_rng(0)
+        server.bytes_per_second = 150_000
+        for index in range(8):
+            pcm = (rng.standard_normal(int(16000 * (1 + index % 2))) * 3000).astype(np.int16).tobytes()
+            assert processor.transcribe(pcm_to_wav_bytes(pcm))[2]
+        stats = processor.quality.get_stats()
+        assert stats['level'] != 'linear16-16k'
+        assert stats['decisions']['linear16-16k'] < 8
+    finally:
+        server.stop()
@@ -0,0 +1,230 @@
+import json
+import threading
+import time
+from collections import deque
+import numpy as np
+from audio_utils import pcm_to_wav_bytes, wav_bytes_to_pcm
+
+# 품질이 높은 순서 (bytes_per_second는 업로드 크기 추정용)
+QUALITY_LEVELS = [
+    {'name': 'linear16-16k', 'encoding': 'LINEAR16', 'rate': 16000, 'bytes_per_second': 32000},
+    {'name': 'mulaw-16k', 'encoding': 'MULAW', 'rate': 16000, 'bytes_per_second': 16000},
+    {'name': 'mulaw-8k', 'encoding': 'MULAW', 'rate': 8000, 'bytes_per_second': 8000},
+]
+
+RECENCY_HALF_LIFE = 4  # 추정 가중치가 절반이 되는 요청 수
+MAX_THROUGHPUT = 125e6  # 추정 상한 (1Gbps, 업로드 시간이 거의 0인 요청으로 값이 튀지 않도록)
+ULAW_BIAS = 0x84
+ULAW_CLIP = 32635
+
+def linear_to_ulaw(samples):
+    """16비트 PCM 샘플을 G.711 μ-law 바이트로 변환"""
+    values = samples.astype(np.int32)
+    sign = (values < 0).astype(np.int32)
+    magnitude = np.minimum(np.abs(values), ULAW_CLIP) + ULAW_BIAS
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~((sign << 7) | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+def downsample_half(samples):
+    """샘플링 레이트를 절반으로 (인접 샘플 평균으로 간단한 저역 통과 후 추림)"""
+    count = len(samples) // 2 * 2
+    return samples[:count].astype(np.int32).reshape(-1, 2).mean(axis=1).astype(np.int16)
+
+def encode_audio(wav, level):
+    """16kHz 모노 WAV를 품질 단계에 맞게 변환, (파일 이름, 내용, MIME 형식) 반환 (변환할 수 없으면 None)"""
+    pcm, rate, channels = wav_bytes_to_pcm(wav)
+    if rate != 16000 or channels != 1:
+        return None
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    if level['rate'] == 8000:
+        samples = downsample_half(samples)
+    if level['encoding'] == 'MULAW':
+        return 'audio.ulaw', linear_to_ulaw(samples), 'audio/basic'
+    return 'audio.wav', pcm_to_wav_bytes(samples.tobytes(), level['rate'], 1, 2), 'audio/wav'
+
+class QualityController:
+    def __init__(self, router=None, target_latency=3.0, levels=None, window=20, processing_ratio=0.1,
+                 upgrade_margin=0.8, log_file=None):
+        """최근 인식 요청으로 상향 대역폭/왕복 시간을 추정해 업로드 품질·묶음 크기·제한 시간을 정하는 조절기
+
+        녹음 종료부터 결과까지의 예상 시간(왕복 + 업로드 + 서버 처리)이 target_latency(초) 안에
+        들어오는 가장 높은 품질을 고르고, 결정과 실제 결과를 log_file에 한 줄씩 남깁니다.
+        """
+        self.router = router
+        self.target_latency = target_latency
+        self.levels = [level for level in QUALITY_LEVELS if levels is None or level['name'] in levels] \
+            or QUALITY_LEVELS[:1]
+        self.processing_ratio = processing_ratio  # 추정 전 기본값: 오디오 1초당 서버 처리 시간(초)
+        self.upgrade_margin = upgrade_margin  # 품질을 올릴 때는 목표보다 여유가 있어야 함 (잦은 전환 방지)
+        self.log_file = log_file
+
+        self.samples = deque(maxlen=window)  # (보낸 바이트, 오디오 초, 걸린 시간)
+        self.lock = threading.Lock()
+        self.current = 0  # 현재 품질 단계 번호
+        self.last_batch_size = None
+
+        # 통계
+        self.decisions = {level['name']: 0 for level in self.levels}
+        self.over_target = 0
+        self.requests = 0
+
+    @classmethod
+    def from_settings(cls, settings_manager, router=None):
+        """app_settings.json의 upload_quality 항목으로 생성 (꺼져 있으면 None)"""
+        config = settings_manager.get_setting("upload_quality", {}) if settings_manager else {}
+        if not config.get("enabled"):
+            return None
+        print(f"📶 업로드 품질 자동 조절 사용 (목표 {config.get('target_latency_ms', 3000)}ms)")
+        return cls(router,
+                   target_latency=config.get("target_latency_ms", 3000) / 1000.0,
+                   levels=config.get("levels"),
+                   window=config.get("window", 20),
+                   processing_ratio=config.get("processing_ratio", 0.1),
+                   log_file=config.get("log_file", "quality_decisions.jsonl"))
+
+    def rtt(self):
+        """왕복 시간(초): 가장 우선인 인식 서버의 상태 확인 응답 시간"""
+        if self.router:
+            backend = self.router.candidates()[0]
+            if backend.probe_latency is not None:
+                return backend.probe_latency
+        with self.lock:
+            return min((elapsed for _, _, elapsed in self.samples), default=0.3) / 2
+
+    def estimate(self):
+        """(왕복 시간, 상향 대역폭 바이트/초 또는 None, 오디오 1초당 서버 처리 시간) 추정
+
+        걸린 시간 - 왕복 시간 = 보낸 바이트 / 대역폭 + 오디오 초 × 처리 비율 로 보고 최근 요청일수록
+        큰 가중치로 맞춥니다. 품질 단계가 바뀌며 바이트/오디오 비율이 달라져야 두 값을 나눌 수 있으므로,
+        그렇지 않으면 처리 비율은 이전 추정치(없으면 기본값)를 씁니다. 처리 비율은 어떤 요청의
+        실제 걸린 시간도 넘을 수 없으므로 그 값으로 상한을 둡니다.
+        """
+        rtt = self.rtt()
+        with self.lock:
+            samples = list(self.samples)
+        if len(samples) < 3:
+            return rtt, None, self.processing_ratio
+        sent = np.array([s[0] for s in samples], dtype=float)
+        audio = np.maximum(np.array([s[1] for s in samples], dtype=float), 1e-3)
+        remaining = np.maximum(np.array([s[2] for s in samples]) - rtt, 0.0)
+        weights = 0.5 ** (np.arange(len(samples))[::-1] / RECENCY_HALF_LIFE)
+
+        ratio = self.processing_ratio
+        design = np.column_stack([sent / 1e5, audio])
+        if np.linalg.cond(design) < 50:
+            scale = np.sqrt(weights)
+            (per_100kb, fitted), *_ = np.linalg.lstsq(design * scale[:, None], remaining * scale, rcond=None)
+            if per_100kb > 0 and fitted >= 0:
+                ratio = float(fitted)
+        ratio = min(ratio, float(np.min(remaining / audio)))
+        self.processing_ratio = ratio
+        upload_seconds = np.maximum(remaining - audio * ratio, 1e-3)
+        throughput = float((weights * sent).sum() / (weights * upload_seconds).sum())
+        return rtt, min(MAX_THROUGHPUT, throughput), ratio
+
+    def upload_time(self, level, audio_seconds, estimate):
+        throughput = estimate[1]
+        return audio_seconds * level['bytes_per_second'] / throughput if throughput else 0.0
+
+    def predict(self, level, audio_seconds, estimate):
+        """품질 단계로 보냈을 때 예상되는 결과까지의 시간(초)"""
+        rtt, _, ratio = estimate
+        return rtt + self.upload_time(level, audio_seconds, estimate) + audio_seconds * ratio
+
+    def choose(self, audio_seconds):
+        """요청 하나의 품질 결정 (단계, 예상 시간, 제한 시간, 추정값)"""
+        estimate = self.estimate()
+        rtt, _, ratio = estimate
+        # 품질로 줄일 수 있는 것은 업로드 시간뿐이므로, 왕복/서버 처리만으로 목표를 넘는 긴 녹음에도
+        # 업로드에는 목표의 1/4을 허용 (품질을 불필요하게 낮추지 않도록)
+        budget = max(self.target_latency - rtt - audio_seconds * ratio, self.target_latency / 4)
+        chosen = len(self.levels) - 1
+        for index, level in enumerate(self.levels):
+            limit = budget * (self.upgrade_margin if index < self.current else 1.0)
+            if self.upload_time(level, audio_seconds, estimate) <= limit:
+                chosen = index
+                break
+        level = self.levels[chosen]
+        predicted = self.predict(level, audio_seconds, estimate)
+        if chosen != self.current:
+            print(f"📶 업로드 품질 변경: {self.levels[self.current]['name']} → {level['name']} "
+                  f"(예상 {predicted * 1000:.0f}ms, 목표 {self.target_latency * 1000:.0f}ms)")
+            self.current = chosen
+        # 추정이 없으면 기존과 같은 60초, 있으면 예상 시간의 여러 배로 제한
+        timeout = 60 if estimate[1] is None else min(120, max(15, predicted * 4 + 5))
+        return {'level': level, 'predicted': predicted, 'timeout': timeout, 'estimate': estimate,
+                'audio_seconds': audio_seconds}
+
+    def encode(self, wav, decision):
+        """결정한 품질로 변환, (파일 이름, 내용, MIME 형식, 요청 파라미터) 반환 (변환할 수 없으면 None)"""
+        level = decision['level']
+        if level is QUALITY_LEVELS[0]:
+            return None
+        try:
+            encoded = encode_audio(wav, level)
+        except Exception as e:
+            print(f"⚠️ 오디오 변환 실패, 원본으로 전송: {e}")
+            encoded = None
+        if encoded is None:
+            decision['level'] = QUALITY_LEVELS[0]  # 원본 그대로 보냄을 기록
+            return None
+        return encoded + ({'encoding': level['encoding'], 'sample_rate': level['rate']},)
+
+    def batch_size(self, max_utterances, utterance_seconds):
+        """짧은 발화를 몇 개까지 묶어 보낼지 (묶음 전체의 예상 시간이 목표 안에 들어오는 최대 개수)"""
+        estimate = self.estimate()
+        level = self.levels[self.current]
+        size = 1
+        for count in range(max_utterances, 1, -1):
+            if self.predict(level, utterance_seconds * count, estimate) <= self.target_latency:
+                size = count
+                break
+        if size != self.last_batch_size:
+            self.last_batch_size = size
+            self.log({'event': 'batch_size', 'batch_size': size, 'utterance_seconds': round(utterance_seconds, 2),
+                      'level': level['name'], 'estimate': self.format_estimate(estimate)})
+        return size
+
+    def record(self, decision, sent_bytes, elapsed, success):
+        """요청 결과 반영 및 결정 기록"""
+        with self.lock:
+            self.requests += 1
+            name = decision['level']['name']
+            self.decisions[name] = self.decisions.get(name, 0) + 1
+            if elapsed > self.target_latency:
+                self.over_target += 1
+            if success:
+                self.samples.append((sent_bytes, decision['audio_seconds'], elapsed))
+        self.log({'event': 'request', 'level': decision['level']['name'],
+                  'encoding': decision['level']['encoding'], 'sample_rate': decision['level']['rate'],
+                  'bitrate_kbps': decision['level']['bytes_per_second'] * 8 / 1000,
+                  'audio_seconds': round(decision['audio_seconds'], 2), 'sent_bytes': sent_bytes,
+                  'estimate': self.format_estimate(decision['estimate']),
+                  'predicted_ms': round(decision['predicted'] * 1000), 'timeout': round(decision['timeout'], 1),
+                  'target_ms': round(self.target_latency * 1000), 'actual_ms': round(elapsed * 1000),
+                  'success': success})
+
+    def format_estimate(self, estimate):
+        rtt, throughput, ratio = estimate
+        return {'rtt_ms': round(rtt * 1000), 'uplink_kbps': round(throughput * 8 / 1000) if throughput else None,
+                'processing_ratio': round(ratio, 3)}
+
+    def log(self, entry):
+        """결정 기록 파일에 JSON 한 줄 추가"""
+        if not self.log_file:
+            return
+        entry = dict(time=time.strftime("%Y-%m-%d %H:%M:%S"), **entry)
+        try:
+            with self.lock, open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"⚠️ 품질 결정 기록 실패: {e}")
+
+    def get_stats(self):
+        estimate = self.estimate()
+        with self.lock:
+            return {'level': self.levels[self.current]['name'], 'estimate': self.format_estimate(estimate),
+                    'target_ms': round(self.target_latency * 1000), 'requests': self.requests,
+                    'over_target': self.over_target, 'decisions': dict(self.decisions),
+                    'batch_size': self.last_batch_size}